@@ -0,0 +1,30 @@
+"""progresso das importacoes por bytes
+
+Revision ID: 9a3f6d1c2e84
+Revises: c71e4a9d2b58
+Create Date: 2026-10-18 23:05:41.274019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3f6d1c2e84'
+down_revision: Union[str, None] = 'c71e4a9d2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('importacoes', sa.Column('tamanho_bibtex', sa.Integer(), nullable=True))
+    op.add_column('importacoes', sa.Column('bytes_lidos', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('importacoes', 'bytes_lidos')
+    op.drop_column('importacoes', 'tamanho_bibtex')
@@ -0,0 +1,82 @@
+"""indices consultas frequentes
+
+Revision ID: a6c1e3f7b250
+Revises: f2b9d4c6e871
+Create Date: 2026-10-18 16:40:12.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c1e3f7b250'
+down_revision: Union[str, None] = 'f2b9d4c6e871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Cópia congelada dos triggers do FTS de b7e2c91d4a10, para a migração não
+# depender do código da app. O SQLite os apaga junto com 'artigos' quando
+# batch_alter_table recria a tabela.
+_COLUNAS_FTS = "titulo, autores, nome_evento, booktitle, publisher"
+_NOVOS_FTS = "new.titulo, new.autores, new.nome_evento, new.booktitle, new.publisher"
+_ANTIGOS_FTS = "old.titulo, old.autores, old.nome_evento, old.booktitle, old.publisher"
+_TRIGGERS_FTS = [
+    f"CREATE TRIGGER IF NOT EXISTS artigos_fts_ai AFTER INSERT ON artigos BEGIN "
+    f"INSERT INTO artigos_fts(rowid, {_COLUNAS_FTS}) VALUES (new.id, {_NOVOS_FTS}); END",
+    f"CREATE TRIGGER IF NOT EXISTS artigos_fts_ad AFTER DELETE ON artigos BEGIN "
+    f"INSERT INTO artigos_fts(artigos_fts, rowid, {_COLUNAS_FTS}) VALUES ('delete', old.id, {_ANTIGOS_FTS}); END",
+    f"CREATE TRIGGER IF NOT EXISTS artigos_fts_au AFTER UPDATE ON artigos BEGIN "
+    f"INSERT INTO artigos_fts(artigos_fts, rowid, {_COLUNAS_FTS}) VALUES ('delete', old.id, {_ANTIGOS_FTS}); "
+    f"INSERT INTO artigos_fts(rowid, {_COLUNAS_FTS}) VALUES (new.id, {_NOVOS_FTS}); END",
+]
+
+# (tabela, coluna) que passam a ter índice único
+_UNICOS = [('eventos', 'nome'), ('usuarios', 'email'), ('subscribers', 'email')]
+
+
+def _checar_duplicados(tabela: str, colunas: Sequence[str]) -> None:
+    """Falha com uma mensagem clara em vez do erro genérico do CREATE UNIQUE INDEX."""
+    lista = ", ".join(colunas)
+    # NULL não conflita num índice único do SQLite, então não entra na checagem
+    nao_nulos = " AND ".join(f"{c} IS NOT NULL" for c in colunas)
+    repetidos = op.get_bind().execute(sa.text(
+        f"SELECT {lista}, COUNT(*) FROM {tabela} WHERE {nao_nulos} GROUP BY {lista} HAVING COUNT(*) > 1 LIMIT 5"
+    )).all()
+    if repetidos:
+        valores = ", ".join(repr(tuple(linha[:-1]) if len(colunas) > 1 else linha[0]) for linha in repetidos)
+        raise RuntimeError(f"Valores repetidos em {tabela}({lista}): {valores}; corrija antes de migrar")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for tabela, coluna in _UNICOS:
+        _checar_duplicados(tabela, [coluna])
+    _checar_duplicados('artigos', ['id_edicao', 'titulo'])
+    for tabela, coluna in _UNICOS:
+        op.create_index(op.f(f'ix_{tabela}_{coluna}'), tabela, [coluna], unique=True)
+    # Buscas por nome sem diferenciar maiúsculas (página do evento/edição)
+    op.create_index('ix_eventos_nome_lower', 'eventos', [sa.text('lower(nome)')], unique=False)
+    op.create_index('ix_edicoes_id_evento_ano', 'edicoes', ['id_evento', 'ano'], unique=False)
+    # Único: dois cadastros simultâneos do mesmo título na edição passam pela checagem da rota
+    op.create_index('ix_artigos_id_edicao_titulo', 'artigos', ['id_edicao', 'titulo'], unique=True)
+    # FOREIGN KEY exige recriar 'artigos' no SQLite; os triggers do FTS somem junto
+    with op.batch_alter_table('artigos') as batch_op:
+        batch_op.create_foreign_key('fk_artigos_id_edicao_edicoes', 'edicoes', ['id_edicao'], ['id'])
+    for sql in _TRIGGERS_FTS:
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('artigos') as batch_op:
+        batch_op.drop_constraint('fk_artigos_id_edicao_edicoes', type_='foreignkey')
+    for sql in _TRIGGERS_FTS:
+        op.execute(sql)
+    op.drop_index('ix_artigos_id_edicao_titulo', table_name='artigos')
+    op.drop_index('ix_edicoes_id_evento_ano', table_name='edicoes')
+    op.drop_index('ix_eventos_nome_lower', table_name='eventos')
+    for tabela, coluna in reversed(_UNICOS):
+        op.drop_index(op.f(f'ix_{tabela}_{coluna}'), table_name=tabela)
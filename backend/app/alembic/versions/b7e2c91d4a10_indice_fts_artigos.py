@@ -0,0 +1,57 @@
+"""indice fts artigos
+
+Revision ID: b7e2c91d4a10
+Revises: 4d4d21a5308c
+Create Date: 2026-10-18 10:40:12.512301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c91d4a10'
+down_revision: Union[str, None] = '4d4d21a5308c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUNAS = "titulo, autores, nome_evento, booktitle, publisher"
+NOVOS = "new.titulo, new.autores, new.nome_evento, new.booktitle, new.publisher"
+ANTIGOS = "old.titulo, old.autores, old.nome_evento, old.booktitle, old.publisher"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tabela virtual FTS5 com conteúdo externo: o texto fica só em 'artigos',
+    # o índice guarda apenas os tokens. remove_diacritics faz 'joao' casar com 'João'.
+    op.execute(
+        f"CREATE VIRTUAL TABLE artigos_fts USING fts5({COLUNAS}, "
+        "content='artigos', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    # Triggers mantêm o índice em sincronia com qualquer escrita em 'artigos'
+    # (criação, edição, remoção e importação BibTeX).
+    op.execute(
+        f"CREATE TRIGGER artigos_fts_ai AFTER INSERT ON artigos BEGIN "
+        f"INSERT INTO artigos_fts(rowid, {COLUNAS}) VALUES (new.id, {NOVOS}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER artigos_fts_ad AFTER DELETE ON artigos BEGIN "
+        f"INSERT INTO artigos_fts(artigos_fts, rowid, {COLUNAS}) VALUES ('delete', old.id, {ANTIGOS}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER artigos_fts_au AFTER UPDATE ON artigos BEGIN "
+        f"INSERT INTO artigos_fts(artigos_fts, rowid, {COLUNAS}) VALUES ('delete', old.id, {ANTIGOS}); "
+        f"INSERT INTO artigos_fts(rowid, {COLUNAS}) VALUES (new.id, {NOVOS}); END"
+    )
+    # Indexa os artigos já existentes
+    op.execute("INSERT INTO artigos_fts(artigos_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS artigos_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS artigos_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS artigos_fts_ai")
+    op.execute("DROP TABLE IF EXISTS artigos_fts")
@@ -0,0 +1,40 @@
+"""versoes tabelas
+
+Revision ID: b83d5f0e6a19
+Revises: a6c1e3f7b250
+Create Date: 2026-10-18 18:05:37.214906
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83d5f0e6a19'
+down_revision: Union[str, None] = 'a6c1e3f7b250'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    versoes = op.create_table('versoes_tabelas',
+    sa.Column('tabela', sa.String(), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('tabela')
+    )
+    # Começa em 1: ETags emitidos antes desta migração não existem, então não há colisão
+    agora = datetime.now(timezone.utc).replace(tzinfo=None)
+    op.bulk_insert(versoes, [
+        {'tabela': tabela, 'versao': 1, 'atualizado_em': agora}
+        for tabela in ('artigos', 'eventos', 'edicoes')
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('versoes_tabelas')
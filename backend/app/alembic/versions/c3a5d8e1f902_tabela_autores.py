@@ -0,0 +1,83 @@
+"""tabela autores
+
+Revision ID: c3a5d8e1f902
+Revises: b7e2c91d4a10
+Create Date: 2026-10-18 11:22:47.190334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a5d8e1f902'
+down_revision: Union[str, None] = 'b7e2c91d4a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TAMANHO_LOTE = 500
+
+
+def _slug(nome: str) -> str:
+    # cópia de autores.slug_autor, congelada aqui para a migração não depender do código da app
+    return '-'.join(nome.replace('-', ' ').split()).lower()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('autores',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('nome', sa.String(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_autores_slug'), 'autores', ['slug'], unique=True)
+    op.create_table('artigo_autor',
+    sa.Column('id_artigo', sa.Integer(), nullable=False),
+    sa.Column('id_autor', sa.Integer(), nullable=False),
+    sa.Column('posicao', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['id_artigo'], ['artigos.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['id_autor'], ['autores.id'], ),
+    sa.PrimaryKeyConstraint('id_artigo', 'id_autor')
+    )
+    op.create_index(op.f('ix_artigo_autor_id_autor'), 'artigo_autor', ['id_autor'], unique=False)
+
+    # Backfill em lotes de TAMANHO_LOTE artigos, paginando pelo id
+    conn = op.get_bind()
+    autores = sa.table('autores', sa.column('id', sa.Integer), sa.column('nome', sa.String), sa.column('slug', sa.String))
+    artigo_autor = sa.table('artigo_autor', sa.column('id_artigo', sa.Integer), sa.column('id_autor', sa.Integer), sa.column('posicao', sa.Integer))
+    ids_por_slug = {}
+    ultimo_id = 0
+    while True:
+        lote = conn.execute(
+            sa.text("SELECT id, autores FROM artigos WHERE id > :ultimo ORDER BY id LIMIT :limite"),
+            {"ultimo": ultimo_id, "limite": TAMANHO_LOTE},
+        ).fetchall()
+        if not lote:
+            break
+        ultimo_id = lote[-1][0]
+
+        vinculos = []
+        for id_artigo, autores_str in lote:
+            nomes = {}
+            for nome in (autores_str or '').split(' and '):
+                if nome.strip():
+                    nomes.setdefault(_slug(nome), nome.strip())
+            for posicao, (slug, nome) in enumerate(nomes.items()):
+                if slug not in ids_por_slug:
+                    ids_por_slug[slug] = conn.execute(
+                        autores.insert().values(nome=nome, slug=slug).returning(autores.c.id)
+                    ).scalar_one()
+                vinculos.append({"id_artigo": id_artigo, "id_autor": ids_por_slug[slug], "posicao": posicao})
+        if vinculos:
+            conn.execute(artigo_autor.insert(), vinculos)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_artigo_autor_id_autor'), table_name='artigo_autor')
+    op.drop_table('artigo_autor')
+    op.drop_index(op.f('ix_autores_slug'), table_name='autores')
+    op.drop_table('autores')
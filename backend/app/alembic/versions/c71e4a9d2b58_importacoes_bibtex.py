@@ -0,0 +1,60 @@
+"""importacoes bibtex
+
+Revision ID: c71e4a9d2b58
+Revises: b83d5f0e6a19
+Create Date: 2026-10-18 21:42:10.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71e4a9d2b58'
+down_revision: Union[str, None] = 'b83d5f0e6a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('importacoes',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=True),
+    sa.Column('arquivo', sa.String(), nullable=True),
+    sa.Column('total_entradas', sa.Integer(), nullable=True),
+    sa.Column('processadas', sa.Integer(), nullable=False),
+    sa.Column('cadastrados', sa.Integer(), nullable=False),
+    sa.Column('pulados', sa.Integer(), nullable=False),
+    sa.Column('notificacoes', sa.Integer(), nullable=False),
+    sa.Column('erro', sa.String(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('iniciado_em', sa.DateTime(), nullable=True),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+    sa.Column('concluido_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_importacoes_status', 'importacoes', ['status', 'id'], unique=False)
+    op.create_table('importacoes_pulados',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_importacao', sa.Integer(), nullable=False),
+    sa.Column('indice', sa.Integer(), nullable=False),
+    sa.Column('chave', sa.String(), nullable=True),
+    sa.Column('titulo', sa.String(), nullable=True),
+    sa.Column('motivo', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['id_importacao'], ['importacoes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_importacoes_pulados_importacao', 'importacoes_pulados', ['id_importacao', 'indice'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_importacoes_pulados_importacao', table_name='importacoes_pulados')
+    op.drop_table('importacoes_pulados')
+    op.drop_index('ix_importacoes_status', table_name='importacoes')
+    op.drop_table('importacoes')
@@ -0,0 +1,43 @@
+"""slug em subscribers
+
+Revision ID: d41f6b2a7c35
+Revises: c3a5d8e1f902
+Create Date: 2026-10-18 12:05:13.774120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f6b2a7c35'
+down_revision: Union[str, None] = 'c3a5d8e1f902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _slug(nome: str) -> str:
+    # cópia de autores.slug_autor, congelada aqui para a migração não depender do código da app
+    return '-'.join(nome.replace('-', ' ').split()).lower()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('subscribers', sa.Column('slug', sa.String(), nullable=True))
+    op.create_index(op.f('ix_subscribers_slug'), 'subscribers', ['slug'], unique=False)
+
+    conn = op.get_bind()
+    subscribers = conn.execute(sa.text("SELECT id, nome FROM subscribers")).fetchall()
+    if subscribers:
+        conn.execute(
+            sa.text("UPDATE subscribers SET slug = :slug WHERE id = :id"),
+            [{"id": id_sub, "slug": _slug(nome or '')} for id_sub, nome in subscribers],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_subscribers_slug'), table_name='subscribers')
+    op.drop_column('subscribers', 'slug')
@@ -0,0 +1,61 @@
+"""armazenamento pdf por conteudo
+
+Revision ID: f2b9d4c6e871
+Revises: e58c0a9f3b17
+Create Date: 2026-10-18 14:02:31.918245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b9d4c6e871'
+down_revision: Union[str, None] = 'e58c0a9f3b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Cópia congelada dos triggers do FTS de b7e2c91d4a10, para a migração não
+# depender do código da app. O SQLite os apaga junto com 'artigos' quando
+# batch_alter_table recria a tabela.
+_COLUNAS_FTS = "titulo, autores, nome_evento, booktitle, publisher"
+_NOVOS_FTS = "new.titulo, new.autores, new.nome_evento, new.booktitle, new.publisher"
+_ANTIGOS_FTS = "old.titulo, old.autores, old.nome_evento, old.booktitle, old.publisher"
+_TRIGGERS_FTS = [
+    f"CREATE TRIGGER IF NOT EXISTS artigos_fts_ai AFTER INSERT ON artigos BEGIN "
+    f"INSERT INTO artigos_fts(rowid, {_COLUNAS_FTS}) VALUES (new.id, {_NOVOS_FTS}); END",
+    f"CREATE TRIGGER IF NOT EXISTS artigos_fts_ad AFTER DELETE ON artigos BEGIN "
+    f"INSERT INTO artigos_fts(artigos_fts, rowid, {_COLUNAS_FTS}) VALUES ('delete', old.id, {_ANTIGOS_FTS}); END",
+    f"CREATE TRIGGER IF NOT EXISTS artigos_fts_au AFTER UPDATE ON artigos BEGIN "
+    f"INSERT INTO artigos_fts(artigos_fts, rowid, {_COLUNAS_FTS}) VALUES ('delete', old.id, {_ANTIGOS_FTS}); "
+    f"INSERT INTO artigos_fts(rowid, {_COLUNAS_FTS}) VALUES (new.id, {_NOVOS_FTS}); END",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pdf_blobs',
+    sa.Column('sha256', sa.String(), nullable=False),
+    sa.Column('caminho', sa.String(), nullable=False),
+    sa.Column('tamanho', sa.Integer(), nullable=False),
+    sa.Column('referencias', sa.Integer(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    # ADD COLUMN com REFERENCES direto: batch_alter_table recriaria 'artigos'
+    # e apagaria os triggers do índice FTS
+    op.execute("ALTER TABLE artigos ADD COLUMN sha256_pdf VARCHAR REFERENCES pdf_blobs (sha256)")
+    op.create_index(op.f('ix_artigos_sha256_pdf'), 'artigos', ['sha256_pdf'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_artigos_sha256_pdf'), table_name='artigos')
+    # O SQLite não remove coluna com FOREIGN KEY: recria a tabela e, com ela, os triggers do FTS
+    with op.batch_alter_table('artigos') as batch_op:
+        batch_op.drop_column('sha256_pdf')
+    for sql in _TRIGGERS_FTS:
+        op.execute(sql)
+    op.drop_table('pdf_blobs')
@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterable, NamedTuple, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from models import PdfBlob
+
+logger = logging.getLogger(__name__)
+
+# Diretório base onde os PDFs são armazenados
+# ATENÇÃO: É recomendável usar variáveis de ambiente para o caminho em uma aplicação real.
+PDF_UPLOAD_DIR = "pdfs"
+os.makedirs(PDF_UPLOAD_DIR, exist_ok=True)
+
+# Tamanho do bloco usado ao copiar arquivos (memória constante, independente do tamanho do upload)
+TAMANHO_BLOCO = 1024 * 1024
+
+
+class BlobSalvo(NamedTuple):
+    sha256: str
+    caminho: str
+    tamanho: int
+    novo: bool  # False quando o conteúdo já existia no armazenamento
+
+
+def caminho_blob(sha256: str) -> str:
+    """Caminho do blob em árvore de 2 níveis: pdfs/ab/cd/abcd....pdf"""
+    return os.path.join(PDF_UPLOAD_DIR, sha256[:2], sha256[2:4], f"{sha256}.pdf")
+
+
+def _caminho_lapide(sha256: str) -> str:
+    """Para onde remover_se_orfao move o arquivo antes de apagá-lo."""
+    return caminho_blob(sha256) + ".removido"
+
+
+def salvar_blob(origem: BinaryIO) -> BlobSalvo:
+    """
+    Copia o stream para o armazenamento endereçado por conteúdo, calculando o
+    SHA-256 durante a cópia. Se o mesmo conteúdo já estiver salvo, o arquivo
+    existente é reaproveitado e a cópia temporária descartada.
+    Não registra referência no BD (ver registrar_referencias).
+    """
+    tmp_dir = os.path.join(PDF_UPLOAD_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    sha = hashlib.sha256()
+    tamanho = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as destino:
+            while True:
+                bloco = origem.read(TAMANHO_BLOCO)
+                if not bloco:
+                    break
+                sha.update(bloco)
+                destino.write(bloco)
+                tamanho += len(bloco)
+
+        digest = sha.hexdigest()
+        final_path = caminho_blob(digest)
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+            return BlobSalvo(digest, final_path, tamanho, False)
+
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(tmp_path, final_path)  # atômico: o blob nunca aparece pela metade
+        return BlobSalvo(digest, final_path, tamanho, True)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def registrar_referencias(session: Session, blobs: Iterable[BlobSalvo]) -> None:
+    """
+    Soma uma referência para cada blob recebido (repetidos contam várias vezes),
+    criando a linha em pdf_blobs quando necessário. Um único executemany (sem commit).
+    """
+    blobs = list(blobs)
+    if not blobs:
+        return
+    contagem = Counter(b.sha256 for b in blobs)
+    dados = {b.sha256: b for b in blobs}
+    agora = datetime.now(timezone.utc).replace(tzinfo=None)
+    stmt = sqlite_insert(PdfBlob)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PdfBlob.sha256],
+        set_={"referencias": PdfBlob.referencias + stmt.excluded.referencias},
+    )
+    session.execute(stmt, [
+        {"sha256": sha, "caminho": dados[sha].caminho, "tamanho": dados[sha].tamanho,
+         "referencias": n, "criado_em": agora}
+        for sha, n in contagem.items()
+    ])
+    # O upsert já segura o lock de escrita, então remover_se_orfao (que apaga
+    # sob o mesmo lock) não corre em paralelo daqui até o commit. Um blob
+    # reaproveitado (novo=False) pode ter sido apagado entre salvar_blob e este
+    # ponto: volta da lápide se ainda der, senão a transação não pode seguir.
+    for sha in contagem:
+        caminho = caminho_blob(sha)
+        if os.path.exists(caminho):
+            continue
+        try:
+            os.replace(_caminho_lapide(sha), caminho)
+        except FileNotFoundError:
+            raise RuntimeError(f"PDF {sha} foi removido durante o upload; envie o arquivo de novo")
+
+
+def liberar_referencia(session: Session, sha256: Optional[str]) -> None:
+    """Subtrai uma referência do blob; a linha some quando chega a zero (sem commit)."""
+    if not sha256:
+        return
+    blob = session.get(PdfBlob, sha256)
+    if blob is None:
+        return
+    blob.referencias -= 1
+    if blob.referencias <= 0:
+        session.delete(blob)
+
+
+def remover_se_orfao(session: Session, sha256: Optional[str]) -> None:
+    """
+    Apaga do disco o arquivo de um blob sem referências. Deve ser chamada
+    depois do commit (ou do rollback), para não apagar um arquivo ainda em uso;
+    faz o próprio commit.
+    A checagem e a retirada do arquivo acontecem com o lock de escrita do
+    banco, o mesmo que registrar_referencias segura ao somar referências: um
+    upload concorrente do mesmo conteúdo ou já commitou a referência (e o
+    arquivo fica) ou só chega lá depois e encontra o arquivo na lápide.
+    """
+    if not sha256:
+        return
+    caminho = caminho_blob(sha256)
+    lapide = _caminho_lapide(sha256)
+    try:
+        # Escrita (sem efeito na prática: a linha some ao chegar a zero) só para
+        # pegar o lock antes de reler a contagem
+        session.execute(delete(PdfBlob).where(PdfBlob.sha256 == sha256, PdfBlob.referencias <= 0))
+        if session.scalar(select(PdfBlob.referencias).where(PdfBlob.sha256 == sha256)) is not None:
+            session.rollback()
+            return
+        if os.path.exists(caminho):
+            os.replace(caminho, lapide)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.warning("Falha ao remover arquivo PDF %s: %s", caminho, e)
+        return
+    # Fora do lock: a lápide não está mais no caminho do blob
+    try:
+        os.remove(lapide)
+    except FileNotFoundError:
+        pass  # restaurada por registrar_referencias
+    except Exception as e:
+        logger.warning("Falha ao remover arquivo PDF %s: %s", lapide, e)
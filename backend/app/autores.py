@@ -0,0 +1,102 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from models import Artigo, Autor, ArtigoAutor, Subscriber
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def separar_autores(autores: str) -> List[str]:
+    """Separa a string de autores ('A and B and C') em uma lista de nomes."""
+    return [a.strip() for a in (autores or '').split(' and ') if a.strip()]
+
+
+def slug_autor(nome: str) -> str:
+    """
+    Chave normalizada de um autor: minúsculas, sem espaços repetidos e com '-'
+    no lugar dos espaços. 'Marco Tulio  Valente' e 'marco-tulio-valente'
+    geram a mesma chave 'marco-tulio-valente'.
+    """
+    return '-'.join(nome.replace('-', ' ').split()).lower()
+
+
+def autores_por_slug(session: Session, slugs: Iterable[str]) -> Dict[str, Autor]:
+    """Autores existentes de um conjunto de slugs, em uma única query. Retorna {slug: Autor}."""
+    slugs = set(slugs)
+    if not slugs:
+        return {}
+    return {a.slug: a for a in session.query(Autor).filter(Autor.slug.in_(slugs)).all()}
+
+
+def vincular_autores(session: Session, artigo: Artigo, autores_carregados: Optional[Dict[str, Autor]] = None) -> None:
+    """
+    Sincroniza artigo.autorias com a string artigo.autores: busca os autores
+    existentes em uma única query pelo slug, cria os que faltam e reaproveita
+    os vínculos que já existiam (sem commit).
+    `autores_carregados` permite reaproveitar autores_por_slug de um lote inteiro
+    (edição em lote); os autores criados aqui entram nesse mesmo dict.
+    """
+    nomes = {}
+    for nome in separar_autores(artigo.autores):
+        nomes.setdefault(slug_autor(nome), nome)
+
+    existentes = autores_carregados if autores_carregados is not None else autores_por_slug(session, nomes)
+
+    atuais = {v.autor.slug: v for v in artigo.autorias}
+    novas = []
+    for posicao, (slug, nome) in enumerate(nomes.items()):
+        vinculo = atuais.get(slug)
+        if vinculo:
+            vinculo.posicao = posicao
+        else:
+            autor = existentes.get(slug)
+            if not autor:
+                autor = existentes[slug] = Autor(nome, slug)
+                session.add(autor)
+            vinculo = ArtigoAutor(autor, posicao)
+        novas.append(vinculo)
+    artigo.autorias = novas
+
+
+def subscribers_por_autor(session: Session, slugs: Iterable[str]) -> Dict[str, List[Subscriber]]:
+    """
+    Busca, em uma única query pelo índice subscribers.slug, os assinantes de
+    um conjunto de autores. Retorna {slug: [Subscriber, ...]} só com os slugs que casaram.
+    Aceita o conjunto de autores de uma importação inteira de uma vez.
+    """
+    slugs = set(slugs)
+    if not slugs:
+        return {}
+    resultado: Dict[str, List[Subscriber]] = {}
+    for sub in session.query(Subscriber).filter(Subscriber.slug.in_(slugs)).all():
+        resultado.setdefault(sub.slug, []).append(sub)
+    return resultado
+
+
+def vincular_autores_em_lote(session: Session, artigos: Iterable[Tuple[int, str]]) -> None:
+    """
+    Versão em lote de vincular_autores para artigos recém-inseridos, recebendo
+    pares (id_artigo, string_de_autores). Usa uma query para os autores
+    existentes, um INSERT para os novos e um executemany para os vínculos.
+    """
+    vinculos_por_artigo = []
+    nomes_por_slug: Dict[str, str] = {}
+    for id_artigo, autores in artigos:
+        slugs = {}
+        for nome in separar_autores(autores):
+            slugs.setdefault(slug_autor(nome), nome)
+        vinculos_por_artigo.append((id_artigo, list(slugs)))
+        for slug, nome in slugs.items():
+            nomes_por_slug.setdefault(slug, nome)
+    if not nomes_por_slug:
+        return
+
+    ids_por_slug = dict(session.query(Autor.slug, Autor.id).filter(Autor.slug.in_(list(nomes_por_slug))).all())
+    novos = [{"nome": nome, "slug": slug} for slug, nome in nomes_por_slug.items() if slug not in ids_por_slug]
+    if novos:
+        for id_autor, slug in session.execute(insert(Autor).returning(Autor.id, Autor.slug), novos):
+            ids_por_slug[slug] = id_autor
+
+    session.execute(insert(ArtigoAutor), [
+        {"id_artigo": id_artigo, "id_autor": ids_por_slug[slug], "posicao": posicao}
+        for id_artigo, slugs in vinculos_por_artigo
+        for posicao, slug in enumerate(slugs)
+    ])
@@ -0,0 +1,84 @@
+import os
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from metricas import instrumentar_engine
+
+# Configuração das conexões com o SQLite, criada uma única vez na importação.
+# Os PRAGMAs são aplicados a cada nova conexão do pool (evento "connect").
+# instrumentar_engine alimenta as métricas de consultas (metricas.py, /metrics).
+ARQUIVO_BANCO = os.getenv("BANCO_ARQUIVO", "banco.db")
+
+PRAGMAS = {
+    # Primeiro: a troca para WAL abaixo também precisa esperar um lock ocupado
+    "busy_timeout": int(os.getenv("BANCO_BUSY_TIMEOUT_MS", "5000")),
+    # WAL: leitores não esperam o escritor (e vice-versa); fica gravado no arquivo
+    "journal_mode": "WAL",
+    # Seguro com WAL; só o último commit pode se perder numa queda de energia
+    "synchronous": "NORMAL",
+    # Negativo = KiB (aqui 64 MiB de cache de páginas por conexão)
+    "cache_size": -int(os.getenv("BANCO_CACHE_KIB", str(64 * 1024))),
+    "mmap_size": int(os.getenv("BANCO_MMAP_BYTES", str(256 * 1024 * 1024))),
+    # O SQLite só aplica FOREIGN KEY (e ON DELETE CASCADE) com este PRAGMA, por conexão.
+    # O Alembic usa um engine próprio, sem ele: batch_alter_table recria tabelas referenciadas
+    "foreign_keys": "ON",
+}
+
+
+def _aplicar_pragmas(somente_leitura: bool):
+    def aplicar(conexao_dbapi, _registro):
+        cursor = conexao_dbapi.cursor()
+        for nome, valor in PRAGMAS.items():
+            cursor.execute(f"PRAGMA {nome}={valor}")
+        if somente_leitura:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return aplicar
+
+
+# Síncrona: Alembic (via models) e worker de notificações
+db = create_engine(f"sqlite:///{ARQUIVO_BANCO}")
+event.listen(db, "connect", _aplicar_pragmas(False))
+instrumentar_engine(db, "sincrono")
+
+# Async, leitura e escrita: rotas que alteram dados
+db_async = create_async_engine(f"sqlite+aiosqlite:///{ARQUIVO_BANCO}")
+event.listen(db_async.sync_engine, "connect", _aplicar_pragmas(False))
+instrumentar_engine(db_async.sync_engine, "escrita")
+
+# Async, só leitura (PRAGMA query_only): rotas GET. Pool próprio, então uma
+# importação segurando o lock de escrita não ocupa as conexões dos leitores.
+db_leitura = create_async_engine(
+    f"sqlite+aiosqlite:///{ARQUIVO_BANCO}",
+    pool_size=int(os.getenv("BANCO_POOL_LEITURA", "8")),
+)
+event.listen(db_leitura.sync_engine, "connect", _aplicar_pragmas(True))
+instrumentar_engine(db_leitura.sync_engine, "leitura")
+
+# expire_on_commit=False: objetos continuam legíveis após o commit sem novo I/O
+# (lazy load implícito não é permitido em AsyncSession)
+SessaoAsync = async_sessionmaker(db_async, expire_on_commit=False)
+SessaoLeitura = async_sessionmaker(db_leitura, expire_on_commit=False)
+
+
+async def relatorio_pragmas() -> Dict[str, Dict[str, Any]]:
+    """Lê os PRAGMAs efetivos de uma conexão de cada pool async (checagem na inicialização)."""
+    relatorio = {}
+    for nome, engine in (("escrita", db_async), ("leitura", db_leitura)):
+        async with engine.connect() as conexao:
+            relatorio[nome] = {
+                pragma: (await conexao.exec_driver_sql(f"PRAGMA {pragma}")).scalar()
+                for pragma in [*PRAGMAS, "query_only"]
+            }
+    return relatorio
+
+
+async def verificar_pragmas() -> None:
+    """Registra no log os PRAGMAs em uso e avisa se o WAL não pôde ser ativado."""
+    for pool, valores in (await relatorio_pragmas()).items():
+        print(f"[BANCO] pool {pool}: " + ", ".join(f"{k}={v}" for k, v in valores.items()))
+        if str(valores["journal_mode"]).lower() != "wal":
+            print(f"AVISO: journal_mode={valores['journal_mode']} no pool {pool}; "
+                  "leitores podem esperar por escritas (sistema de arquivos sem suporte a WAL?)")
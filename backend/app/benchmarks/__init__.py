@@ -0,0 +1,8 @@
+"""
+Benchmarks da API. Rodar a partir de backend/app, por exemplo:
+    python -m benchmarks.serializacao
+    python -m benchmarks.cenarios --pasta /tmp/bench --gerar --saida antes.json
+    python -m benchmarks.bibtex --entradas 50000
+benchmarks.serializacao e benchmarks.bibtex aceitam --json; benchmarks.cenarios grava o JSON com
+--saida e benchmarks.comparar compara dois desses arquivos.
+"""
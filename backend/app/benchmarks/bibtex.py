@@ -0,0 +1,100 @@
+"""
+Compara a leitura de BibTeX antiga (texto inteiro decodificado e
+bibtexparser.loads, como em utils antes da mudança) com leitor_bibtex: no
+processo atual e com o pool de processos. Mede tempo e, com --memoria, o pico
+de memória alocada no processo principal (tracemalloc, numa segunda execução,
+porque ele deixa tudo mais lento) sobre um arquivo de benchmarks.catalogo.gerar_bibtex.
+
+Na pasta backend/app:
+    python -m benchmarks.bibtex --entradas 50000 --processos 4 [--memoria] [--json]
+O parser antigo leva ~2,6 ms por entrada (~2 min para 50 mil); --sem-antigo o pula.
+A assinatura (sha256 dos artigos na ordem) tem de ser igual entre as variantes.
+"""
+import argparse
+import hashlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import bibtexparser
+
+from benchmarks.catalogo import gerar_bibtex
+from leitor_bibtex import PoolBibtex, entrada_para_artigo, iterar_artigos
+from schemas import ArtigoSchema
+
+Artigos = Iterator[Tuple[Optional[ArtigoSchema], str]]
+
+
+def antigo(dados: bytes) -> Artigos:
+    # Mesma conversão para ArtigoSchema; muda só a leitura
+    return iter([entrada_para_artigo(e) for e in bibtexparser.loads(dados.decode("utf-8")).entries])
+
+
+def _consumir(artigos: Artigos) -> Tuple[int, str]:
+    """Percorre sem guardar (a memória medida é a da leitura) e resume numa assinatura."""
+    total, resumo = 0, hashlib.sha256()
+    for artigo, chave in artigos:
+        total += 1
+        resumo.update(chave.encode())
+        resumo.update(artigo.model_dump_json().encode() if artigo is not None else b"-")
+    return total, resumo.hexdigest()[:16]
+
+
+def _medir(funcao: Callable[[], Artigos], memoria: bool) -> Dict[str, Any]:
+    inicio = time.perf_counter()
+    total, assinatura = _consumir(funcao())
+    resultado: Dict[str, Any] = {"segundos": time.perf_counter() - inicio, "entradas": total, "assinatura": assinatura}
+    if memoria:
+        tracemalloc.start()
+        _consumir(funcao())
+        resultado["pico_mb"] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entradas", type=int, default=50_000)
+    parser.add_argument("--processos", type=int, default=4, help="tamanho do pool (1 pula a variante com pool)")
+    parser.add_argument("--memoria", action="store_true", help="mede também o pico de memória (tracemalloc)")
+    parser.add_argument("--sem-antigo", action="store_true", help="não roda o bibtexparser.loads")
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    dados, _ = gerar_bibtex("Simpósio de Benchmark", 2024, args.entradas, "bench")
+    print(f"{args.entradas} entradas, {len(dados) / 1024 / 1024:.1f} MB", file=sys.stderr)
+
+    variantes: Dict[str, Callable[[], Artigos]] = {}
+    if not args.sem_antigo:
+        variantes["bibtexparser"] = lambda: antigo(dados)
+    variantes["streaming"] = lambda: iterar_artigos(io.BytesIO(dados), pool=None)
+    pool = PoolBibtex(args.processos) if args.processos > 1 else None
+    if pool is not None:
+        # "frio" inclui subir os processos (spawn); "quente" reaproveita o pool
+        variantes[f"processos_{args.processos}_frio"] = lambda: iterar_artigos(io.BytesIO(dados), pool=pool, limiar=0)
+        variantes[f"processos_{args.processos}_quente"] = lambda: iterar_artigos(io.BytesIO(dados), pool=pool, limiar=0)
+
+    resultados = {}
+    try:
+        for nome, funcao in variantes.items():
+            resultados[nome] = _medir(funcao, args.memoria and not nome.endswith("_frio"))
+            r = resultados[nome]
+            pico = f"  pico {r['pico_mb']:8.2f} MB" if "pico_mb" in r else ""
+            print(f"  {nome:<22} {r['segundos']:8.2f} s  {r['segundos'] / r['entradas'] * 1e6:8.1f} us/entrada{pico}"
+                  f"  [{r['assinatura']}]", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.encerrar()
+
+    if len({r["assinatura"] for r in resultados.values()}) > 1:
+        print("Atenção: as variantes produziram artigos diferentes", file=sys.stderr)
+    if args.json:
+        print(json.dumps({"entradas": args.entradas, "bytes": len(dados), "resultados": resultados},
+                         indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
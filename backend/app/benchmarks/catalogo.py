@@ -0,0 +1,234 @@
+"""
+Gerador de catálogo sintético para os benchmarks.
+
+Cria um banco SQLite de rascunho (schema do banco.db versionado + migrações, igual ao de produção) com
+volumes configuráveis de eventos, edições, artigos, autores e assinantes, mais
+um usuário admin, e gera fixtures de importação (BibTeX + ZIP de PDFs) que
+casam com eventos/edições existentes. Tudo é determinístico pela semente.
+
+    python -m benchmarks.catalogo --arquivo /tmp/bench/banco.db --artigos 100000 \\
+        --eventos 5000 --edicoes 5000 --subscribers 50000
+
+Não importa banco.py/main.py: o arquivo do banco é escolhido aqui, e o
+executor dos cenários (benchmarks.cenarios) aponta BANCO_ARQUIVO para ele.
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import time
+import zipfile
+from typing import Dict, List, Tuple
+
+from alembic import command
+from alembic.config import Config
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, insert, inspect
+
+from autores import slug_autor
+from models import Artigo, ArtigoAutor, Autor, EdicaoEvento, Evento, Subscriber, Usuario
+
+PASTA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ADMIN_EMAIL = "admin@benchmark.example.com"
+ADMIN_SENHA = "benchmark"
+
+_PRENOMES = ["Ana", "Bruno", "Carla", "Davi", "Elisa", "Fábio", "Gabriel", "Helena", "Igor", "Julia",
+             "Karina", "Lucas", "Marina", "Nelson", "Olga", "Paulo", "Quitéria", "Rafael", "Sofia", "Tiago",
+             "Úrsula", "Vitor", "Wagner", "Xênia", "Yuri", "Zélia"]
+_SOBRENOMES = ["Silva", "Souza", "Costa", "Santos", "Oliveira", "Pereira", "Rodrigues", "Almeida", "Nascimento",
+               "Lima", "Araújo", "Fernandes", "Carvalho", "Gomes", "Martins", "Rocha", "Ribeiro", "Alves",
+               "Monteiro", "Mendes", "Barros", "Freitas", "Barbosa", "Pinto", "Moura", "Cavalcanti", "Dias",
+               "Castro", "Campos", "Cardoso"]
+# Vocabulário dos títulos; os cenários de busca sorteiam termos daqui
+VOCABULARIO = ["software", "teste", "requisitos", "arquitetura", "microsserviços", "refatoração", "código",
+               "qualidade", "manutenção", "evolução", "métricas", "modelos", "linguagem", "aprendizado",
+               "máquina", "dados", "segurança", "desempenho", "concorrência", "compiladores", "verificação",
+               "formal", "ágil", "processo", "empírico", "estudo", "mineração", "repositórios", "revisão",
+               "sistemática", "mutação", "cobertura", "falhas", "depuração", "documentação", "api",
+               "mobile", "android", "web", "nuvem", "devops", "integração", "contínua", "entrega",
+               "ecossistemas", "open", "source", "educação", "ensino", "usabilidade", "acessibilidade",
+               "blockchain", "contratos", "inteligentes", "energia", "sustentabilidade", "python", "java"]
+
+
+def migrar(arquivo: str) -> None:
+    """
+    Cria o schema do banco de rascunho. As migrações antigas não reconstroem
+    'artigos' a partir de um banco vazio, então parte-se de uma cópia do
+    banco.db versionado: migra até a head e apaga os dados.
+    """
+    shutil.copyfile(os.path.join(PASTA_APP, "banco.db"), arquivo)
+    config = Config(os.path.join(PASTA_APP, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PASTA_APP, "alembic"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{arquivo}")
+    command.upgrade(config, "head")
+    engine = create_engine(f"sqlite:///{arquivo}")
+    with engine.begin() as conexao:
+        for tabela in inspect(conexao).get_table_names():
+            if tabela not in ("alembic_version", "versoes_tabelas") and not tabela.startswith("artigos_fts"):
+                conexao.exec_driver_sql(f'DELETE FROM "{tabela}"')
+        conexao.exec_driver_sql("INSERT INTO artigos_fts(artigos_fts) VALUES ('rebuild')")
+    engine.dispose()
+
+
+def _nomes_autores(quantidade: int, rng: random.Random) -> List[str]:
+    nomes, vistos = [], set()
+    while len(nomes) < quantidade:
+        partes = [rng.choice(_PRENOMES), rng.choice(_SOBRENOMES), rng.choice(_SOBRENOMES)]
+        if len(vistos) > len(_PRENOMES) * len(_SOBRENOMES) ** 2 // 2:
+            partes.append(str(len(nomes)))  # esgotou as combinações: desambigua
+        nome = " ".join(partes)
+        if slug_autor(nome) not in vistos:
+            vistos.add(slug_autor(nome))
+            nomes.append(nome)
+    return nomes
+
+
+def titulo_aleatorio(rng: random.Random, sufixo: str = "") -> str:
+    palavras = rng.sample(VOCABULARIO, rng.randint(4, 9))
+    return " ".join(palavras).capitalize() + sufixo
+
+
+def gerar_catalogo(arquivo: str, artigos: int = 100_000, eventos: int = 5_000, edicoes: int = 5_000,
+                   subscribers: int = 50_000, autores: int = 0, semente: int = 42) -> Dict[str, int]:
+    """
+    Preenche `arquivo` (apagado antes, se existir) e retorna as contagens geradas.
+    `autores` = 0 usa artigos // 5. Cada edição pertence ao evento (i % eventos) e
+    os artigos são sorteados entre as edições.
+    """
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(arquivo + sufixo):
+            os.remove(arquivo + sufixo)
+    migrar(arquivo)
+    rng = random.Random(semente)
+    autores = autores or max(1, artigos // 5)
+    eventos, edicoes = max(1, eventos), max(1, edicoes)
+    rounds = int(os.getenv("BCRYPT_ROUNDS", "12"))  # mesmo custo de login da API
+
+    engine = create_engine(f"sqlite:///{arquivo}")
+    with engine.begin() as conexao:
+        conexao.exec_driver_sql("PRAGMA journal_mode=WAL")
+        conexao.execute(insert(Usuario), [{
+            "nome": "Admin Benchmark", "email": ADMIN_EMAIL, "admin": True,
+            "senha": CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(ADMIN_SENHA),
+        }])
+        conexao.execute(insert(Evento), [
+            {"id": i + 1, "nome": f"Simpósio Sintético {i:05d}", "sigla": f"SS{i}",
+             "descricao": "Evento gerado para benchmark", "site": None, "entidade_promotora": "SBC"}
+            for i in range(eventos)
+        ])
+        anos = []
+        linhas_edicoes = []
+        for i in range(edicoes):
+            ano = 2000 + (i // eventos) % 26
+            anos.append(ano)
+            linhas_edicoes.append({"id": i + 1, "ano": ano, "local": "Cidade Sintética", "id_evento": i % eventos + 1})
+        conexao.execute(insert(EdicaoEvento), linhas_edicoes)
+
+        nomes = _nomes_autores(autores, rng)
+        conexao.execute(insert(Autor), [{"id": i + 1, "nome": n, "slug": slug_autor(n)} for i, n in enumerate(nomes)])
+
+        # Em lotes, para não montar 100k dicts + vínculos de uma vez
+        lote = 10_000
+        for inicio in range(0, artigos, lote):
+            linhas_artigos, vinculos = [], []
+            for id_artigo in range(inicio + 1, min(artigos, inicio + lote) + 1):
+                edicao = rng.randrange(edicoes)
+                nome_evento = f"Simpósio Sintético {edicao % eventos:05d}"
+                ids_autores = rng.sample(range(autores), min(autores, rng.randint(1, 4)))
+                linhas_artigos.append({
+                    "id": id_artigo,
+                    "titulo": titulo_aleatorio(rng, f" {id_artigo}"),
+                    "autores": " and ".join(nomes[a] for a in ids_autores),
+                    "nome_evento": nome_evento,
+                    "ano": anos[edicao],
+                    "pagina_inicial": id_artigo % 300,
+                    "pagina_final": id_artigo % 300 + 12,
+                    "caminho_pdf": None,
+                    "booktitle": nome_evento,
+                    "publisher": "SBC",
+                    "location": "Cidade Sintética",
+                    "id_edicao": edicao + 1,
+                    "sha256_pdf": None,
+                })
+                vinculos.extend({"id_artigo": id_artigo, "id_autor": a + 1, "posicao": p}
+                                for p, a in enumerate(ids_autores))
+            conexao.execute(insert(Artigo), linhas_artigos)
+            conexao.execute(insert(ArtigoAutor), vinculos)
+
+        assinantes = []
+        for i in range(subscribers):
+            nome = nomes[rng.randrange(autores)]
+            assinantes.append({"nome": nome, "email": f"assinante{i}@benchmark.example.com", "slug": slug_autor(nome)})
+        if assinantes:
+            conexao.execute(insert(Subscriber), assinantes)
+        conexao.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return {"artigos": artigos, "eventos": eventos, "edicoes": edicoes, "autores": autores, "subscribers": subscribers}
+
+
+def gerar_bibtex(nome_evento: str, ano: int, quantidade: int, prefixo: str, semente: int = 7) -> Tuple[bytes, List[str]]:
+    """BibTeX com `quantidade` artigos novos para a edição (nome_evento, ano); retorna (bytes, chaves)."""
+    rng = random.Random(f"{semente}-{prefixo}")
+    entradas, chaves = [], []
+    for i in range(quantidade):
+        chave = f"{prefixo}-{i}"
+        autores = " and ".join(f"{rng.choice(_PRENOMES)} {rng.choice(_SOBRENOMES)}" for _ in range(rng.randint(1, 4)))
+        entradas.append(
+            f"@inproceedings{{{chave},\n"
+            f" author = {{{autores}}},\n"
+            f" title = {{{titulo_aleatorio(rng, f' {prefixo} {i}')}}},\n"
+            f" booktitle = {{{nome_evento}}},\n"
+            f" year = {{{ano}}},\n"
+            f" pages = {{{i + 1}--{i + 12}}},\n"
+            f" publisher = {{SBC}},\n"
+            f"}}\n"
+        )
+        chaves.append(chave)
+    return "\n".join(entradas).encode("utf-8"), chaves
+
+
+def pdf_sintetico(identificador: str) -> bytes:
+    """PDF mínimo e único por identificador (o armazenamento deduplica por conteúdo)."""
+    return b"%PDF-1.4\n% benchmark " + identificador.encode() + b"\n" + b"0" * 2048 + b"\n%%EOF\n"
+
+
+def gerar_zip_pdfs(chaves: List[str]) -> bytes:
+    """ZIP com um PDF por chave, no formato esperado por /artigo/artigo/importar-bibtex."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        for chave in chaves:
+            zip_ref.writestr(f"pdfs/{chave}.pdf", pdf_sintetico(chave))
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--arquivo", required=True, help="banco de rascunho (será recriado)")
+    parser.add_argument("--artigos", type=int, default=100_000)
+    parser.add_argument("--eventos", type=int, default=5_000)
+    parser.add_argument("--edicoes", type=int, default=5_000)
+    parser.add_argument("--subscribers", type=int, default=50_000)
+    parser.add_argument("--autores", type=int, default=0, help="0 = artigos // 5")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--fixture-importacao", type=int, default=200,
+                        help="também grava importacao.bib/importacao.zip ao lado do banco com N artigos (0 = não)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resumo = gerar_catalogo(args.arquivo, args.artigos, args.eventos, args.edicoes, args.subscribers,
+                            args.autores, args.semente)
+    print(f"Catálogo gerado em {time.perf_counter() - inicio:.1f}s: {resumo}")
+    if args.fixture_importacao:
+        pasta = os.path.dirname(os.path.abspath(args.arquivo))
+        bibtex, chaves = gerar_bibtex("Simpósio Sintético 00000", 2000, args.fixture_importacao, "fixture")
+        with open(os.path.join(pasta, "importacao.bib"), "wb") as arquivo:
+            arquivo.write(bibtex)
+        with open(os.path.join(pasta, "importacao.zip"), "wb") as arquivo:
+            arquivo.write(gerar_zip_pdfs(chaves))
+        print(f"Fixtures em {pasta}: importacao.bib, importacao.zip")
+
+
+if __name__ == "__main__":
+    main()
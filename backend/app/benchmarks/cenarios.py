@@ -0,0 +1,219 @@
+"""
+Cenários cronometrados contra a API em processo (ASGI, via httpx), sobre um
+catálogo sintético de benchmarks.catalogo: busca, página do autor, página da
+edição, login, criação de um artigo e importação BibTeX. O resultado sai em
+JSON para comparar commits (benchmarks.comparar).
+
+Na pasta backend/app:
+    python -m benchmarks.cenarios --pasta /tmp/bench --gerar --saida antes.json
+    ... (mudança) ...
+    python -m benchmarks.cenarios --pasta /tmp/bench --gerar --saida depois.json
+    python -m benchmarks.comparar antes.json depois.json
+
+--gerar recria o catálogo (use para comparações limpas; as escritas dos
+cenários ficam no banco). Sem --gerar, reaproveita <pasta>/banco.db.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+from urllib.parse import quote
+
+from dotenv import load_dotenv
+
+from benchmarks.catalogo import (ADMIN_EMAIL, ADMIN_SENHA, PASTA_APP, VOCABULARIO, gerar_bibtex,
+                                 gerar_catalogo, gerar_zip_pdfs, pdf_sintetico, titulo_aleatorio)
+
+CENARIOS = ["busca", "pagina_autor", "pagina_edicao", "login", "criar_artigo", "importar_bibtex"]
+# Cenários de escrita/bcrypt são bem mais lentos; rodam menos vezes
+_ESCRITA = {"login", "criar_artigo", "importar_bibtex"}
+
+
+def _amostras(arquivo: str, quantidade: int, semente: int) -> Dict[str, List[Any]]:
+    """Slugs de autores, edições (evento, ano) e termos de busca sorteados do catálogo."""
+    rng = random.Random(semente)
+    with sqlite3.connect(arquivo) as conexao:
+        autores = conexao.execute("SELECT max(id) FROM autores").fetchone()[0] or 0
+        edicoes = conexao.execute("SELECT max(id) FROM edicoes").fetchone()[0] or 0
+        ids_autores = [rng.randint(1, autores) for _ in range(quantidade)] if autores else []
+        ids_edicoes = [rng.randint(1, edicoes) for _ in range(quantidade)] if edicoes else []
+        slugs = dict(conexao.execute(
+            f"SELECT id, slug FROM autores WHERE id IN ({','.join('?' * len(ids_autores))})", ids_autores))
+        pares = {id_: (nome, ano) for id_, nome, ano in conexao.execute(
+            "SELECT ed.id, ev.nome, ed.ano FROM edicoes ed JOIN eventos ev ON ev.id = ed.id_evento "
+            f"WHERE ed.id IN ({','.join('?' * len(ids_edicoes))})", ids_edicoes)}
+    return {
+        "autores": [slugs[i] for i in ids_autores if i in slugs],
+        "edicoes": [pares[i] for i in ids_edicoes if i in pares],
+        "termos": [rng.choice(VOCABULARIO) for _ in range(quantidade)],
+    }
+
+
+def _contagens(arquivo: str) -> Dict[str, int]:
+    with sqlite3.connect(arquivo) as conexao:
+        return {tabela: conexao.execute(f"SELECT count(*) FROM {tabela}").fetchone()[0]
+                for tabela in ("artigos", "eventos", "edicoes", "autores", "subscribers")}
+
+
+def _commit_atual() -> Any:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PASTA_APP,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _resumo(tempos: List[float], status: Dict[str, int]) -> Dict[str, Any]:
+    ms = [t * 1000 for t in tempos]
+    return {
+        "n": len(ms),
+        "mediana_ms": statistics.median(ms),
+        "media_ms": statistics.fmean(ms),
+        "p95_ms": statistics.quantiles(ms, n=20)[18] if len(ms) >= 2 else ms[0],
+        "min_ms": min(ms),
+        "max_ms": max(ms),
+        "status": status,
+    }
+
+
+async def executar(args, arquivo: str) -> Dict[str, Any]:
+    import httpx
+    from main import app
+    from banco import db_async, db_leitura
+    from cache_respostas import cache_respostas
+    from importacoes import worker_importacoes
+
+    amostras = _amostras(arquivo, max(args.repeticoes, args.repeticoes_escrita) + args.aquecimento, args.semente)
+    rodada = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")  # títulos novos a cada execução
+    rng = random.Random(args.semente)
+    evento_importacao, ano_importacao = amostras["edicoes"][0]
+
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as cliente:
+        resposta = await cliente.post("/auth/login", json={"email": ADMIN_EMAIL, "senha": ADMIN_SENHA})
+        resposta.raise_for_status()
+        headers_admin = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+        def busca(i: int) -> Awaitable:
+            return cliente.get("/artigo/artigo/search", params={"q": amostras["termos"][i]})
+
+        def pagina_autor(i: int) -> Awaitable:
+            return cliente.get(f"/artigo/authors/{amostras['autores'][i]}")
+
+        def pagina_edicao(i: int) -> Awaitable:
+            nome, ano = amostras["edicoes"][i]
+            return cliente.get(f"/edicao/{quote(nome)}/{ano}")
+
+        def login(i: int) -> Awaitable:
+            return cliente.post("/auth/login", json={"email": ADMIN_EMAIL, "senha": ADMIN_SENHA})
+
+        def criar_artigo(i: int) -> Awaitable:
+            nome, ano = amostras["edicoes"][i]
+            return cliente.post("/artigo/artigo", headers=headers_admin, data={
+                "titulo": titulo_aleatorio(rng, f" {rodada} {i}"),
+                "autores": "Autora Benchmark and Outro Autor",
+                "nome_evento": nome,
+                "ano": str(ano),
+            }, files={"pdf_file": ("artigo.pdf", pdf_sintetico(f"{rodada}-{i}"), "application/pdf")})
+
+        async def importar_bibtex(i: int):
+            # Upload + processamento do job (sem lifespan não há worker rodando; drena a fila aqui)
+            bibtex, chaves = gerar_bibtex(evento_importacao, ano_importacao, args.artigos_importacao, f"{rodada}-{i}")
+            resposta = await cliente.post("/artigo/artigo/importar-bibtex", headers=headers_admin, files={
+                "bibtex_file": ("importacao.bib", bibtex, "text/plain"),
+                "pdf_zip_file": ("importacao.zip", gerar_zip_pdfs(chaves), "application/zip"),
+            })
+            await worker_importacoes.processar_pendentes()
+            return resposta
+
+        funcoes: Dict[str, Callable[[int], Awaitable]] = {
+            "busca": busca, "pagina_autor": pagina_autor, "pagina_edicao": pagina_edicao,
+            "login": login, "criar_artigo": criar_artigo, "importar_bibtex": importar_bibtex,
+        }
+        resultados = {}
+        for nome in args.cenarios:
+            repeticoes = args.repeticoes_escrita if nome in _ESCRITA else args.repeticoes
+            tempos, status = [], {}
+            for i in range(args.aquecimento + repeticoes):
+                inicio = time.perf_counter()
+                resposta = await funcoes[nome](i)
+                decorrido = time.perf_counter() - inicio
+                if i < args.aquecimento:
+                    continue
+                tempos.append(decorrido)
+                status[str(resposta.status_code)] = status.get(str(resposta.status_code), 0) + 1
+            resultados[nome] = _resumo(tempos, status)
+            print(f"  {nome:<16} mediana {resultados[nome]['mediana_ms']:9.2f} ms  "
+                  f"p95 {resultados[nome]['p95_ms']:9.2f} ms  {status}", file=sys.stderr)
+
+    # Sem isso as threads do aiosqlite seguram o processo aberto no fim
+    await db_async.dispose()
+    await db_leitura.dispose()
+    return {"cenarios": resultados, "cache_respostas": cache_respostas.estatisticas()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pasta", required=True, help="pasta de rascunho (banco, PDFs enviados)")
+    parser.add_argument("--gerar", action="store_true", help="recria o catálogo antes de medir")
+    parser.add_argument("--artigos", type=int, default=100_000)
+    parser.add_argument("--eventos", type=int, default=5_000)
+    parser.add_argument("--edicoes", type=int, default=5_000)
+    parser.add_argument("--subscribers", type=int, default=50_000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--cenarios", type=lambda v: v.split(","), default=CENARIOS,
+                        help=f"separados por vírgula (padrão: {','.join(CENARIOS)})")
+    parser.add_argument("--repeticoes", type=int, default=50, help="por cenário de leitura")
+    parser.add_argument("--repeticoes-escrita", type=int, default=5, help="login, criação e importação")
+    parser.add_argument("--aquecimento", type=int, default=2, help="requisições descartadas no início de cada cenário")
+    parser.add_argument("--artigos-importacao", type=int, default=200, help="entradas por BibTeX importado")
+    parser.add_argument("--sem-cache", action="store_true", help="desliga o cache de respostas (CACHE_RESPOSTAS_TTL=0)")
+    parser.add_argument("--saida", help="grava o JSON neste arquivo (além de imprimir)")
+    args = parser.parse_args()
+    invalidos = set(args.cenarios) - set(CENARIOS)
+    if invalidos:
+        parser.error(f"cenário(s) desconhecido(s): {', '.join(sorted(invalidos))}")
+
+    pasta = os.path.abspath(args.pasta)
+    os.makedirs(pasta, exist_ok=True)
+    arquivo = os.path.join(pasta, "banco.db")
+    if args.gerar or not os.path.exists(arquivo):
+        inicio = time.perf_counter()
+        gerar_catalogo(arquivo, args.artigos, args.eventos, args.edicoes, args.subscribers, semente=args.semente)
+        print(f"Catálogo gerado em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+
+    # Antes de importar main/banco: o banco e o cache são configurados na importação
+    os.environ["BANCO_ARQUIVO"] = arquivo
+    if args.sem_cache:
+        os.environ["CACHE_RESPOSTAS_TTL"] = "0"
+    sys.path.insert(0, PASTA_APP)
+    load_dotenv(os.path.join(PASTA_APP, ".env"))  # main.py procura o .env a partir do diretório atual
+    os.chdir(pasta)  # PDFs enviados vão para <pasta>/pdfs
+
+    medicao = asyncio.run(executar(args, arquivo))
+    resultado = {
+        "commit": _commit_atual(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "catalogo": _contagens(arquivo),
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("pasta", "saida")},
+        **medicao,
+    }
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as saida:
+            saida.write(texto + "\n")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
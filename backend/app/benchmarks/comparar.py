@@ -0,0 +1,32 @@
+"""
+Compara dois resultados de benchmarks.cenarios (mediana e p95 por cenário).
+
+    python -m benchmarks.comparar antes.json depois.json
+Razão < 1 = mais rápido depois.
+"""
+import json
+import sys
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    with open(sys.argv[1], encoding="utf-8") as arquivo:
+        antes = json.load(arquivo)
+    with open(sys.argv[2], encoding="utf-8") as arquivo:
+        depois = json.load(arquivo)
+    if antes.get("catalogo") != depois.get("catalogo"):
+        print(f"Atenção: catálogos diferentes ({antes.get('catalogo')} x {depois.get('catalogo')})\n")
+    print(f"{'cenário':<16} {'mediana antes':>14} {'depois':>10} {'razão':>7}   {'p95 antes':>10} {'depois':>10} {'razão':>7}")
+    for nome, a in antes["cenarios"].items():
+        d = depois["cenarios"].get(nome)
+        if d is None:
+            print(f"{nome:<16} (ausente em {sys.argv[2]})")
+            continue
+        print(f"{nome:<16} {a['mediana_ms']:12.2f}ms {d['mediana_ms']:8.2f}ms {d['mediana_ms'] / a['mediana_ms']:7.2f}"
+              f"   {a['p95_ms']:8.2f}ms {d['p95_ms']:8.2f}ms {d['p95_ms'] / a['p95_ms']:7.2f}")
+    print(f"\ncommits: {antes.get('commit')} -> {depois.get('commit')}")
+
+
+if __name__ == "__main__":
+    main()
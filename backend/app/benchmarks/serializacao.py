@@ -0,0 +1,121 @@
+"""
+Compara a serialização antiga das listas de artigos com a atual (serializacao.py):
+
+- orm_pydantic: objetos ORM validados um a um pelo ResponseArtigoSchema e
+  escritos com json.dumps (rotas com response_model=List[ResponseArtigoSchema]);
+- orm_dict: objetos ORM copiados para dicts com getattr, jsonable_encoder e
+  json.dumps (get_artigo / author_home antes da mudança);
+- tuplas_orjson: tuplas de colunas (COLUNAS_ARTIGO), linhas_para_dicts e RespostaJSON.
+
+Usa um banco SQLite temporário com N artigos sintéticos; não toca no banco.db.
+    python -m benchmarks.serializacao --linhas 1000 10000 50000 [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from models import Artigo, Base
+from schemas import ResponseArtigoSchema
+from serializacao import COLUNAS_ARTIGO, RespostaJSON, linhas_para_dicts
+
+
+def _popular(engine, n: int) -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as conexao:
+        conexao.execute(insert(Artigo), [
+            {
+                "titulo": f"Artigo sintético número {i} sobre engenharia de software",
+                "autores": f"Autor {i % 997} and Coautora {i % 389} and Terceiro Nome {i % 53}",
+                "nome_evento": f"Evento {i % 50}",
+                "ano": 2000 + i % 25,
+                "pagina_inicial": i % 300,
+                "pagina_final": i % 300 + 12,
+                "caminho_pdf": f"pdfs/{i:064x}.pdf",
+                "booktitle": f"Anais do Evento {i % 50}",
+                "publisher": "SBC",
+                "location": "Belo Horizonte/MG",
+                "id_edicao": i % 500 + 1,
+            }
+            for i in range(n)
+        ])
+
+
+def orm_pydantic(session: Session) -> bytes:
+    artigos = session.scalars(select(Artigo)).all()
+    dados = [ResponseArtigoSchema.model_validate(a).model_dump(mode="json") for a in artigos]
+    return JSONResponse(dados).body
+
+
+def orm_dict(session: Session) -> bytes:
+    artigos = session.scalars(select(Artigo)).all()
+    dados = [
+        {
+            'id': a.id, 'titulo': a.titulo, 'autores': a.autores, 'nome_evento': a.nome_evento,
+            'ano': a.ano, 'pagina_inicial': a.pagina_inicial, 'pagina_final': a.pagina_final,
+            'caminho_pdf': a.caminho_pdf, 'booktitle': getattr(a, 'booktitle', None),
+            'publisher': getattr(a, 'publisher', None), 'location': getattr(a, 'location', None),
+            'id_edicao': getattr(a, 'id_edicao', None),
+        }
+        for a in artigos
+    ]
+    return JSONResponse(jsonable_encoder(dados)).body
+
+
+def tuplas_orjson(session: Session) -> bytes:
+    linhas = session.execute(select(*COLUNAS_ARTIGO)).all()
+    return RespostaJSON(linhas_para_dicts(linhas)).body
+
+
+CENARIOS = [orm_pydantic, orm_dict, tuplas_orjson]
+
+
+def medir(engine, funcao, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        with Session(engine) as session:
+            inicio = time.perf_counter()
+            corpo = funcao(session)
+            tempos.append(time.perf_counter() - inicio)
+    return {"mediana_ms": statistics.median(tempos) * 1000, "min_ms": min(tempos) * 1000, "bytes": len(corpo)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    resultado = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in args.linhas:
+            engine = create_engine(f"sqlite:///{os.path.join(pasta, f'bench_{n}.db')}")
+            _popular(engine, n)
+            corpos = {f.__name__: f(Session(engine)) for f in CENARIOS}
+            # Os três caminhos precisam produzir o mesmo JSON
+            if len({json.dumps(json.loads(c), sort_keys=True) for c in corpos.values()}) != 1:
+                sys.exit(f"Saídas diferentes para {n} linhas")
+            resultado[n] = {f.__name__: medir(engine, f, args.repeticoes) for f in CENARIOS}
+            engine.dispose()
+
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+        return
+    for n, cenarios in resultado.items():
+        base = cenarios["orm_pydantic"]["mediana_ms"]
+        print(f"{n} artigos")
+        for nome, r in cenarios.items():
+            print(f"  {nome:<14} {r['mediana_ms']:9.1f} ms  (x{base / r['mediana_ms']:.1f})  {r['bytes']} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from sqlalchemy import Table, Column, Integer, String, MetaData, literal_column, text
+from typing import List, Optional
+
+# Índice FTS5 (tabela virtual 'artigos_fts', conteúdo externo em 'artigos').
+# A tabela e os triggers que a mantêm sincronizada são criados pela migração
+# 'b7e2c91d4a10_indice_fts_artigos'; por isso ela fica num MetaData separado,
+# fora do Base.metadata usado pelo autogenerate do Alembic.
+fts_metadata = MetaData()
+
+artigos_fts = Table(
+    "artigos_fts", fts_metadata,
+    Column("rowid", Integer, primary_key=True),
+    Column("titulo", String),
+    Column("autores", String),
+    Column("nome_evento", String),
+    Column("booktitle", String),
+    Column("publisher", String),
+)
+
+# Campos aceitos pela API -> colunas do índice
+CAMPOS_FTS = {
+    "titulo": ["titulo"],
+    "autor": ["autores"],
+    "evento": ["nome_evento", "booktitle"],
+    "publisher": ["publisher"],
+}
+
+# Pesos do BM25, na ordem das colunas da tabela virtual
+PESOS_BM25 = {"titulo": 10.0, "autores": 5.0, "nome_evento": 2.0, "booktitle": 1.0, "publisher": 1.0}
+
+rank_bm25 = literal_column(
+    "bm25(artigos_fts, {})".format(", ".join(str(p) for p in PESOS_BM25.values()))
+)
+
+
+def _termo_prefixo(termo: str) -> Optional[str]:
+    """Converte um termo digitado em uma consulta de prefixo FTS5 segura ("termo"*)."""
+    termo = termo.replace('"', ' ').strip()
+    if not termo:
+        return None
+    return f'"{termo}"*'
+
+
+def _filtro_colunas(colunas: List[str], expr: str) -> str:
+    if len(colunas) == 1:
+        return f"{colunas[0]} : ({expr})"
+    return "{" + " ".join(colunas) + "} : (" + expr + ")"
+
+
+def montar_consulta_fts(q: str, campos: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Monta a expressão MATCH do FTS5 a partir do texto digitado.
+    Cada palavra vira uma consulta de prefixo e todas precisam casar (AND).
+    `campos` restringe a busca às colunas desses campos (ex: ['titulo', 'autor']).
+    Termos no formato 'campo:valor' (ex: 'autor:valente') restringem só aquele termo.
+    Retorna None se não sobrar nenhum termo pesquisável.
+    """
+    livres = []
+    restritos = []
+    for palavra in q.split():
+        campo, sep, valor = palavra.partition(":")
+        if sep and campo.lower() in CAMPOS_FTS:
+            termo = _termo_prefixo(valor)
+            if termo:
+                restritos.append(_filtro_colunas(CAMPOS_FTS[campo.lower()], termo))
+            continue
+        termo = _termo_prefixo(palavra)
+        if termo:
+            livres.append(termo)
+
+    partes = []
+    if livres:
+        expr = " ".join(livres)
+        if campos:
+            colunas = [c for campo in campos for c in CAMPOS_FTS[campo]]
+            expr = _filtro_colunas(colunas, expr)
+        partes.append(expr)
+    partes.extend(restritos)
+
+    if not partes:
+        return None
+    return " AND ".join(f"({p})" for p in partes)
+
+
+def filtrar_por_fts(query, expr: str, coluna_id, ordenar: bool = True):
+    """
+    Aplica o índice FTS5 a uma query/select SQLAlchemy: junta com 'artigos_fts' pelo
+    rowid e ordena por relevância (BM25), usando o id como desempate.
+    Com ordenar=False a ordenação fica a cargo do chamador (ex: paginação por
+    chave sobre (rank_bm25, id)).
+    """
+    query = (
+        query.join(artigos_fts, artigos_fts.c.rowid == coluna_id)
+        .filter(text("artigos_fts MATCH :fts_expr").bindparams(fts_expr=expr))
+    )
+    if ordenar:
+        query = query.order_by(rank_bm25, coluna_id)
+    return query
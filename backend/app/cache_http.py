@@ -0,0 +1,43 @@
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request
+
+
+def http_date(timestamp: float) -> str:
+    """Formata um timestamp Unix no formato de data HTTP (Last-Modified)."""
+    return formatdate(timestamp, usegmt=True)
+
+
+def _etag_casa(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Comparação fraca (RFC 9110 13.1.2): ignora o prefixo W/
+    alvo = etag[2:] if etag.startswith("W/") else etag
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == alvo:
+            return True
+    return False
+
+
+def requisicao_nao_modificada(request: Request, etag: str, ultima_modificacao: Optional[float] = None) -> bool:
+    """
+    True quando a requisição condicional pode ser respondida com 304.
+    If-None-Match tem precedência; If-Modified-Since só é considerado sem ele.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_casa(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and ultima_modificacao is not None:
+        try:
+            desde = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # Datas HTTP têm resolução de segundos
+        return int(ultima_modificacao) <= int(desde)
+    return False
@@ -0,0 +1,238 @@
+import importlib
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, NamedTuple, Optional, Set
+
+from email.utils import parsedate_to_datetime
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from cache_http import requisicao_nao_modificada
+
+from serializacao import RespostaJSON
+
+# Tags de invalidação. Cada resposta guardada declara de quais entidades depende;
+# as rotas de escrita invalidam as tags do que alteraram (depois do commit).
+TAG_ARTIGOS = "artigos"      # listas de artigos (ex: /artigo/recentes)
+TAG_EVENTOS = "eventos"      # listas de eventos (ex: /evento/recentes)
+
+
+def tag_artigo(id_artigo) -> str:
+    return f"artigo:{id_artigo}"
+
+
+def tag_autor(slug: str) -> str:
+    return f"autor:{slug}"
+
+
+def tag_evento(id_evento) -> str:
+    return f"evento:{id_evento}"
+
+
+def tag_edicao(id_edicao) -> str:
+    return f"edicao:{id_edicao}"
+
+
+class EntradaCache(NamedTuple):
+    corpo: bytes                # resposta já serializada
+    headers: Dict[str, str]
+    media_type: str
+
+
+class BackendCache(ABC):
+    """
+    Onde as respostas ficam guardadas. BackendMemoria atende um processo;
+    para compartilhar entre workers, implemente esta interface (ex: sobre Redis)
+    e aponte CACHE_RESPOSTAS_BACKEND para 'modulo:Classe'.
+    """
+
+    @abstractmethod
+    def obter(self, chave: Hashable) -> Optional[EntradaCache]: ...
+
+    @abstractmethod
+    def guardar(self, chave: Hashable, entrada: EntradaCache, tags: Iterable[str], ttl: float) -> None: ...
+
+    @abstractmethod
+    def invalidar(self, tags: Iterable[str]) -> int:
+        """Remove as entradas marcadas com qualquer uma das tags; retorna quantas saíram."""
+
+    @abstractmethod
+    def limpar(self) -> None: ...
+
+    def tamanho(self) -> Dict[str, int]:
+        return {}
+
+
+class BackendMemoria(BackendCache):
+    """LRU em memória, limitado em número de entradas e em bytes, com índice tag -> chaves."""
+
+    def __init__(self, max_itens: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()  # chave -> (entrada, tags, expira_em)
+        self._por_tag: Dict[str, Set[Hashable]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remover(self, chave: Hashable) -> None:
+        entrada, tags, _ = self._itens.pop(chave)
+        self._bytes -= len(entrada.corpo)
+        for tag in tags:
+            chaves = self._por_tag.get(tag)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._por_tag[tag]
+
+    def obter(self, chave: Hashable) -> Optional[EntradaCache]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            if item[2] < time.monotonic():
+                self._remover(chave)
+                return None
+            self._itens.move_to_end(chave)
+            return item[0]
+
+    def guardar(self, chave: Hashable, entrada: EntradaCache, tags: Iterable[str], ttl: float) -> None:
+        tags = frozenset(tags)
+        with self._lock:
+            if chave in self._itens:
+                self._remover(chave)
+            self._itens[chave] = (entrada, tags, time.monotonic() + ttl)
+            self._bytes += len(entrada.corpo)
+            for tag in tags:
+                self._por_tag.setdefault(tag, set()).add(chave)
+            while self._itens and (len(self._itens) > self.max_itens or self._bytes > self.max_bytes):
+                self._remover(next(iter(self._itens)))
+
+    def invalidar(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            chaves = set()
+            for tag in tags:
+                chaves |= self._por_tag.get(tag, set())
+            for chave in chaves:
+                self._remover(chave)
+            return len(chaves)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self._por_tag.clear()
+            self._bytes = 0
+
+    def tamanho(self) -> Dict[str, int]:
+        with self._lock:
+            return {"itens": len(self._itens), "bytes": self._bytes,
+                    "max_itens": self.max_itens, "max_bytes": self.max_bytes}
+
+
+class CacheRespostas:
+    """
+    Cache de respostas JSON das rotas públicas de leitura, com métricas de acerto.
+
+    Uso numa rota:
+        entrada = cache_respostas.obter(chave)
+        if entrada: return cache_respostas.resposta(entrada)
+        geracao = cache_respostas.geracao()
+        ... consulta ...
+        return cache_respostas.responder(chave, dados, tags, geracao)
+
+    A geração evita guardar uma resposta lida antes de uma escrita e gravada
+    depois da invalidação correspondente: qualquer invalidação no meio a descarta.
+    """
+
+    def __init__(self, backend: BackendCache, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.classe_resposta = RespostaJSON
+        self._geracao = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+    def geracao(self) -> int:
+        return self._geracao
+
+    def obter(self, chave: Hashable) -> Optional[EntradaCache]:
+        entrada = self.backend.obter(chave) if self.ttl > 0 else None
+        with self._lock:
+            if entrada is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+        return entrada
+
+    def resposta(self, entrada: EntradaCache, request: Optional[Request] = None) -> Response:
+        """
+        Responde com o corpo guardado e os headers de quando ele foi montado
+        (o ETag é o da versão lida naquela hora). Se o cliente já tem esse ETag,
+        responde 304, mesmo que a versão da tabela tenha mudado por escritas em
+        outras entidades.
+        """
+        etag = entrada.headers.get("ETag")
+        if request is not None and etag:
+            ultima = entrada.headers.get("Last-Modified")
+            ultima = parsedate_to_datetime(ultima).timestamp() if ultima else None
+            if requisicao_nao_modificada(request, etag, ultima):
+                return Response(status_code=304, headers=entrada.headers)
+        return Response(content=entrada.corpo, media_type=entrada.media_type, headers=entrada.headers)
+
+    def responder(self, chave: Hashable, conteudo: Any, tags: Iterable[str], geracao: int,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+        """Serializa `conteudo` como a rota faria, guarda (se ninguém invalidou no meio) e responde."""
+        resposta = self.classe_resposta(content=conteudo, headers=headers)
+        if self.ttl > 0 and geracao == self._geracao:
+            entrada = EntradaCache(bytes(resposta.body), dict(headers or {}), resposta.media_type)
+            self.backend.guardar(chave, entrada, tags, self.ttl)
+        return resposta
+
+    def invalidar(self, *tags: Optional[str]) -> None:
+        """Chamar após o commit de uma escrita, com as tags das entidades alteradas."""
+        tags = [t for t in tags if t]
+        if not tags:
+            return
+        with self._lock:
+            self._geracao += 1
+        removidas = self.backend.invalidar(tags)
+        with self._lock:
+            self.invalidacoes += removidas
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.acertos + self.falhas
+            dados = {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "invalidacoes": self.invalidacoes,
+                "ttl_segundos": self.ttl,
+                "backend": type(self.backend).__name__,
+            }
+        dados.update(self.backend.tamanho())
+        return dados
+
+
+def carregar_backend(nome: str) -> BackendCache:
+    """'memoria' (padrão) ou 'modulo:Classe' de um BackendCache próprio."""
+    if nome == "memoria":
+        return BackendMemoria(
+            max_itens=int(os.getenv("CACHE_RESPOSTAS_MAX", "1024")),
+            max_bytes=int(os.getenv("CACHE_RESPOSTAS_MAX_BYTES", str(64 * 1024 * 1024))),
+        )
+    modulo, _, classe = nome.partition(":")
+    return getattr(importlib.import_module(modulo), classe)()
+
+
+# CACHE_RESPOSTAS_TTL=0 desliga o cache. O TTL também limita o tempo que um
+# worker enxerga dados antigos quando a escrita aconteceu em outro processo.
+cache_respostas = CacheRespostas(
+    backend=carregar_backend(os.getenv("CACHE_RESPOSTAS_BACKEND", "memoria")),
+    ttl=float(os.getenv("CACHE_RESPOSTAS_TTL", "300")),
+)
@@ -0,0 +1,271 @@
+"""
+Cadastro de artigos em lote: validação, inserção, PDFs do ZIP e notificações.
+
+Usado pelas rotas de artigo (cadastro, lote de operações) e pelo
+WorkerImportacoes (importacoes.py), que importa um BibTeX bloco a bloco com
+importar_bloco. Nenhuma função faz commit; a transação é de quem chama.
+"""
+import logging
+import os
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from armazenamento import BlobSalvo, registrar_referencias, salvar_blob
+from autores import separar_autores, slug_autor, subscribers_por_autor, vincular_autores_em_lote
+from cache_respostas import tag_autor
+from models import Artigo, EdicaoEvento, Evento, Subscriber
+from notificacoes import enfileirar_notificacao
+from schemas import ArtigoSchema
+
+logger = logging.getLogger(__name__)
+
+
+def tags_autores(*autores: Optional[str]) -> List[str]:
+    """Tags do cache das páginas de autor citadas nas strings de autores (antigas e novas)."""
+    return [tag_autor(slug_autor(nome)) for campo in autores for nome in separar_autores(campo)]
+
+
+def salvar_pdf_zip(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo) -> BlobSalvo:
+    """
+    Descompacta um único membro do ZIP direto para o armazenamento, em blocos
+    (sem extrair para diretório temporário nem carregar o PDF em memória).
+    """
+    try:
+        with zip_ref.open(info) as origem:
+            return salvar_blob(origem)
+    except Exception as e:
+        raise RuntimeError(f"Falha ao salvar o arquivo no disco: {e}")
+
+
+def mapear_pdfs_zip(zip_ref: zipfile.ZipFile) -> Dict[str, zipfile.ZipInfo]:
+    """
+    Lê apenas o diretório central do ZIP e retorna {nome_pdf: ZipInfo}.
+    Os membros só são descompactados quando uma entrada BibTeX os referencia.
+    """
+    file_map: Dict[str, zipfile.ZipInfo] = {}
+    for info in zip_ref.infolist():
+        if not info.is_dir() and info.filename.lower().endswith('.pdf'):
+            file_map[os.path.basename(info.filename)] = info
+    return file_map
+
+
+def notificar_subscribers(session: Session, artigo_schema: ArtigoSchema,
+                           subscribers_por_slug: Optional[Dict[str, List[Subscriber]]] = None):
+    """
+    Enfileira no outbox (notificacoes_outbox) um email para cada subscriber cujo
+    nome case exatamente com algum autor do artigo. As linhas entram na mesma
+    transação do artigo; nada é enviado antes do commit.
+    `subscribers_por_slug` permite reaproveitar o resultado de subscribers_por_autor
+    já calculado para um lote inteiro (importação); se omitido, faz uma única
+    query indexada pelos autores deste artigo.
+    """
+    messages = []
+    try:
+        slugs_autores = {slug_autor(a) for a in separar_autores(artigo_schema.autores)}
+        if subscribers_por_slug is None:
+            subscribers_por_slug = subscribers_por_autor(session, slugs_autores)
+
+        matched = []
+        vistos = set()
+        for slug in slugs_autores:
+            for sub in subscribers_por_slug.get(slug, []):
+                if sub.id not in vistos:
+                    vistos.add(sub.id)
+                    matched.append(sub)
+
+        if matched:
+            subject = f"Novo artigo: {artigo_schema.titulo}"
+            body = (
+                f"Foi publicado um novo artigo '{artigo_schema.titulo}' no evento {artigo_schema.nome_evento}.\n\n"
+                f"Autores: {artigo_schema.autores}\n"
+                f"Ano: {artigo_schema.ano or 'N/A'}\n"
+                f"Local: {artigo_schema.location or 'N/A'}\n"
+                f"Páginas: {artigo_schema.pagina_inicial or 'N/A'}-{artigo_schema.pagina_final or 'N/A'}\n"
+                f"PDF: {artigo_schema.caminho_pdf or 'N/A'}"
+            )
+            # O envio fica a cargo do worker_notificacoes, depois do commit
+            for u in matched:
+                enfileirar_notificacao(session, u.email, subject, body)
+                messages.append(f"Email para {u.email} enfileirado sobre o novo artigo criado: {artigo_schema.titulo}")
+    except Exception:
+        logger.exception("Erro ao enfileirar notificações")
+        # Esta função não deve levantar exceção para não quebrar a transação de BD
+
+    return messages
+
+
+def validar_artigos_em_lote(session: Session, artigos: List[ArtigoSchema],
+                            ids_proprios: Optional[List[Optional[int]]] = None) -> Tuple[Dict[int, int], Dict[int, str]]:
+    """
+    Valida evento/edição e duplicidade de uma lista de artigos usando uma query
+    por tabela (eventos, edições e artigos existentes), em vez de três por artigo.
+    Em edições, `ids_proprios[i]` é o id do artigo editado, que não conta como
+    duplicata de si mesmo (None para artigos novos).
+    Retorna ({indice: id_edicao} dos válidos, {indice: motivo} dos rejeitados),
+    com os mesmos motivos que o cadastro unitário devolve.
+    """
+    validos: Dict[int, int] = {}
+    erros: Dict[int, str] = {}
+    if not artigos:
+        return validos, erros
+
+    # 1. Eventos referenciados (o primeiro cadastrado vence em caso de nome repetido)
+    nomes = {a.nome_evento for a in artigos}
+    eventos: Dict[str, Evento] = {}
+    for evento in session.query(Evento).filter(Evento.nome.in_(nomes)).order_by(Evento.id).all():
+        eventos.setdefault(evento.nome, evento)
+
+    # 2. Edições desses eventos, indexadas por (evento, ano) e pela primeira do evento
+    edicao_por_ano: Dict[Tuple[int, int], int] = {}
+    primeira_edicao: Dict[int, int] = {}
+    if eventos:
+        ids_evento = [e.id for e in eventos.values()]
+        for edicao in session.query(EdicaoEvento).filter(EdicaoEvento.id_evento.in_(ids_evento)).order_by(EdicaoEvento.id).all():
+            edicao_por_ano.setdefault((edicao.id_evento, edicao.ano), edicao.id)
+            primeira_edicao.setdefault(edicao.id_evento, edicao.id)
+
+    candidatos: Dict[int, int] = {}
+    for i, artigo in enumerate(artigos):
+        evento = eventos.get(artigo.nome_evento)
+        if not evento:
+            erros[i] = f"Evento '{artigo.nome_evento}' não encontrado"
+        elif artigo.ano:
+            if (evento.id, artigo.ano) in edicao_por_ano:
+                candidatos[i] = edicao_por_ano[(evento.id, artigo.ano)]
+            else:
+                erros[i] = f"Não existe edição do evento '{evento.nome}' no ano {artigo.ano}"
+        elif evento.id in primeira_edicao:
+            candidatos[i] = primeira_edicao[evento.id]
+        else:
+            erros[i] = f"Não existe edição cadastrada para o evento '{evento.nome}' (ano não especificado)."
+
+    # 3. Duplicidade pelo par (titulo, id_edicao): uma única query para o lote todo.
+    # Dois IN simples usam o índice (id_edicao, titulo); o IN de tuplas (row value)
+    # faria o SQLite varrer o índice inteiro. O resultado é filtrado pelos pares.
+    existentes: Dict[Tuple[str, int], Optional[int]] = {}   # par -> id do artigo que o ocupa
+    if candidatos:
+        pares = {(artigos[i].titulo, id_edicao) for i, id_edicao in candidatos.items()}
+        for titulo, id_edicao, id_artigo in (
+            session.query(Artigo.titulo, Artigo.id_edicao, Artigo.id)
+            .filter(Artigo.id_edicao.in_({e for _, e in pares}), Artigo.titulo.in_({t for t, _ in pares}))
+        ):
+            if (titulo, id_edicao) in pares:
+                existentes[(titulo, id_edicao)] = id_artigo
+    for i, id_edicao in candidatos.items():
+        par = (artigos[i].titulo, id_edicao)
+        proprio = ids_proprios[i] if ids_proprios else None
+        if par in existentes and (proprio is None or existentes[par] != proprio):
+            erros[i] = f"Artigo com título '{artigos[i].titulo}' já cadastrado na edição {id_edicao}."
+        else:
+            # Também barra títulos repetidos dentro do próprio lote
+            existentes[par] = None
+            validos[i] = id_edicao
+    return validos, erros
+
+
+def inserir_artigos_em_lote(session: Session, artigos: List[ArtigoSchema], ids_edicao: List[int],
+                             blobs: List[Optional[BlobSalvo]]) -> List[int]:
+    """
+    Insere os artigos com um INSERT de várias linhas (sem commit), registra as
+    referências aos PDFs e cria os vínculos de autores em lote.
+    `ids_edicao[i]` e `blobs[i]` são a edição e o PDF (ou None) de `artigos[i]`.
+    Retorna os ids, na ordem de `artigos`.
+    """
+    if not artigos:
+        return []
+    registrar_referencias(session, [b for b in blobs if b])
+    linhas = [
+        {**a.model_dump(), 'id_edicao': id_edicao, 'sha256_pdf': blob.sha256 if blob else None}
+        for a, id_edicao, blob in zip(artigos, ids_edicao, blobs)
+    ]
+    # Sem sort_by_parameter_order: com ele o SQLite não garante a ordem de um INSERT
+    # de várias linhas e o SQLAlchemy cai para um INSERT por artigo. Os ids voltam
+    # casados pelo par (titulo, id_edicao), único no lote depois da validação.
+    retornadas = session.execute(insert(Artigo).returning(Artigo.id, Artigo.titulo, Artigo.id_edicao), linhas).all()
+    id_por_par = {(titulo, id_edicao): id_artigo for id_artigo, titulo, id_edicao in retornadas}
+    ids = [id_por_par[(linha['titulo'], linha['id_edicao'])] for linha in linhas]
+    vincular_autores_em_lote(session, [(id_artigo, a.autores) for id_artigo, a in zip(ids, artigos)])
+    return ids
+
+
+def notificar_subscribers_em_lote(session: Session, artigos: List[ArtigoSchema]) -> List[Dict[str, Any]]:
+    """
+    Casa os autores de todos os artigos com os subscribers em uma única query
+    e enfileira as notificações. Retorna [{titulo, notificacoes}] dos artigos que geraram email.
+    """
+    slugs = {slug_autor(a) for art in artigos for a in separar_autores(art.autores)}
+    subscribers_por_slug = subscribers_por_autor(session, slugs)
+    notificacoes = []
+    for artigo_schema in artigos:
+        msgs = notificar_subscribers(session, artigo_schema, subscribers_por_slug)
+        if msgs:
+            notificacoes.append({'titulo': artigo_schema.titulo, 'notificacoes': msgs})
+    return notificacoes
+
+
+def importar_bloco(session: Session, zip_ref: zipfile.ZipFile, pdf_file_map: Dict[str, zipfile.ZipInfo],
+                    itens: List[Tuple[int, Optional[ArtigoSchema], str]],
+                    blobs_salvos: List[BlobSalvo]) -> Tuple[List[ArtigoSchema], List[int], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Valida, salva os PDFs e insere os artigos de `itens` ([(índice no BibTeX,
+    ArtigoSchema ou None, chave)]) e enfileira as notificações, sem commit.
+    O PDF de cada entrada é '<chave>.pdf' no ZIP. Os PDFs salvos vão para
+    `blobs_salvos` (para limpeza se a transação falhar).
+    Retorna (aprovados, ids_edicao, pulados [{indice, chave, titulo, motivo}], notificacoes).
+    """
+    pulados_por_indice: Dict[int, Dict[str, Any]] = {}
+
+    def pular(i: int, chave: str, titulo: Optional[str], motivo: str) -> None:
+        pulados_por_indice[i] = {"indice": i, "chave": chave, "titulo": titulo, "motivo": motivo}
+
+    # Checagens que não dependem do BD (ordem do BibTeX preservada no relatório)
+    candidatos: List[Tuple[int, str, ArtigoSchema, zipfile.ZipInfo]] = []
+    for i, artigo_schema, chave_bibtex in itens:
+        pdf_filename_esperado = f"{chave_bibtex}.pdf"  # ✅ usa o nome BibTeX
+
+        if artigo_schema is None:
+            pular(i, chave_bibtex, None, "Falha de validação/parsing do BibTeX: Schema incompleto/inválido.")
+            continue
+
+        # Regra de Negócio: Ignorar artigos sem ano
+        if not artigo_schema.ano:
+            pular(i, chave_bibtex, artigo_schema.titulo,
+                  "Artigo ignorado. O campo 'ano' está faltando ou é inválido no BibTeX.")
+            continue
+
+        if pdf_filename_esperado not in pdf_file_map:
+            pular(i, chave_bibtex, artigo_schema.titulo, f"Arquivo PDF '{pdf_filename_esperado}' não encontrado no ZIP.")
+            continue
+
+        candidatos.append((i, chave_bibtex, artigo_schema, pdf_file_map[pdf_filename_esperado]))
+
+    # Validação em lote no BD: eventos, edições e duplicidade (uma query cada)
+    validos, erros_bd = validar_artigos_em_lote(session, [a for _, _, a, _ in candidatos])
+
+    # Salvamento dos PDFs apenas dos artigos aprovados
+    aprovados: List[ArtigoSchema] = []
+    ids_edicao: List[int] = []
+    blobs: List[BlobSalvo] = []
+    for pos, (i, chave_bibtex, artigo_schema, zip_info) in enumerate(candidatos):
+        if pos in erros_bd:
+            pular(i, chave_bibtex, artigo_schema.titulo, f"Erro de cadastro no BD: {erros_bd[pos]}")
+            continue
+        try:
+            blob = salvar_pdf_zip(zip_ref, zip_info)
+        except Exception as e:
+            pular(i, chave_bibtex, artigo_schema.titulo, f"Falha ao salvar PDF no disco: {e}")
+            continue
+        artigo_schema.caminho_pdf = blob.caminho
+        blobs_salvos.append(blob)
+        aprovados.append(artigo_schema)
+        ids_edicao.append(validos[pos])
+        blobs.append(blob)
+
+    # Inserção em lote (executemany) e notificações com uma única query de subscribers
+    inserir_artigos_em_lote(session, aprovados, ids_edicao, blobs)
+    notificacoes = notificar_subscribers_em_lote(session, aprovados)
+    pulados = [pulados_por_indice[i] for i in sorted(pulados_por_indice)]
+    return aprovados, ids_edicao, pulados, notificacoes
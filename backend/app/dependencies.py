@@ -1,25 +1,110 @@
 from fastapi import Depends, HTTPException
 from main import SECRET_KEY, ALGORITHM, oauth2_schema
-from models import db
-from sqlalchemy.orm import sessionmaker, Session
+from banco import SessaoAsync, SessaoLeitura
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Usuario
 from jose import jwt, JWTError
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import os
+import threading
+import time
 
-def pegar_sessao():
-    try:
-        Session = sessionmaker(bind=db)
-        session = Session()
+async def pegar_sessao():
+    async with SessaoAsync() as session:
+        yield session
+
+async def pegar_sessao_leitura():
+    """Sessão do pool somente leitura (rotas GET); não espera o lock de escrita."""
+    async with SessaoLeitura() as session:
         yield session
-    finally:
-        session.close()
 
-def verificar_token(token: str = Depends(oauth2_schema), session: Session = Depends(pegar_sessao)):
+
+@dataclass(frozen=True)
+class UsuarioAutenticado:
+    """Cópia dos dados do usuário usada pelas rotas, desacoplada da sessão do BD."""
+    id: int
+    nome: Optional[str]
+    email: str
+    admin: bool
+
+
+class CacheUsuarios:
+    """
+    Cache LRU com TTL dos usuários autenticados, indexado pelo id.
+    O TTL é a janela máxima para uma mudança no usuário (ex: perda do admin)
+    valer sem invalidação explícita.
+    """
+
+    def __init__(self, ttl: float, tamanho_maximo: int):
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self._itens: "OrderedDict[int, Tuple[float, UsuarioAutenticado]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, id_usuario: int) -> Optional[UsuarioAutenticado]:
+        with self._lock:
+            item = self._itens.get(id_usuario)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._itens[id_usuario]
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(id_usuario)
+            self.acertos += 1
+            return item[1]
+
+    def guardar(self, usuario: UsuarioAutenticado) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._itens[usuario.id] = (time.monotonic() + self.ttl, usuario)
+            self._itens.move_to_end(usuario.id)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, id_usuario: Optional[int] = None) -> None:
+        """Remove um usuário do cache (ou todos, sem argumento)."""
+        with self._lock:
+            if id_usuario is None:
+                self._itens.clear()
+            else:
+                self._itens.pop(id_usuario, None)
+
+    def estatisticas(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "itens": len(self._itens),
+                "tamanho_maximo": self.tamanho_maximo,
+                "ttl_segundos": self.ttl,
+            }
+
+
+# USUARIO_CACHE_TTL=0 desliga o cache
+cache_usuarios = CacheUsuarios(
+    ttl=float(os.getenv("USUARIO_CACHE_TTL", "30")),
+    tamanho_maximo=int(os.getenv("USUARIO_CACHE_MAX", "1024")),
+)
+
+async def verificar_token(token: str = Depends(oauth2_schema), session: AsyncSession = Depends(pegar_sessao_leitura)):
     try:
         dic_info = jwt.decode(token, SECRET_KEY, ALGORITHM)
         id_usuario = int(dic_info.get("sub"))
     except JWTError:
         raise HTTPException(status_code=401, detail="Acesso Negado, verifique a validade do token")
-    usuario = session.query(Usuario).filter(Usuario.id==id_usuario).first()
+    usuario = cache_usuarios.obter(id_usuario)
+    if usuario:
+        return usuario
+    usuario = await session.get(Usuario, id_usuario)
     if not usuario:
         raise HTTPException(status_code=401, detail="Acesso Inválido")
-    return usuario
\ No newline at end of file
+    autenticado = UsuarioAutenticado(usuario.id, usuario.nome, usuario.email, bool(usuario.admin))
+    cache_usuarios.guardar(autenticado)
+    return autenticado
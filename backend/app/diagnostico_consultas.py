@@ -0,0 +1,189 @@
+"""
+Diagnóstico de consultas (opcional, para desenvolvimento e testes).
+
+Cada escopo gera um relatório: uma requisição HTTP (middleware), um bloco de
+uma importação BibTeX (importacoes.py) ou uma rodada do outbox (notificacoes.py).
+
+Ligado por DIAGNOSTICO_CONSULTAS:
+    (vazio)    desligado (padrão; nenhum evento é registrado nos engines)
+    log        registra um relatório [CONSULTAS] por escopo no logger deste
+               módulo (WARNING quando há problema, INFO quando não há)
+    estrito    além do relatório, levanta OrcamentoConsultasExcedido ao fim do
+               escopo que estourar o orçamento (com o TestClient, o teste falha;
+               num bloco de importação, o job termina como 'falhou')
+
+O relatório aponta:
+- consultas mais lentas que DIAGNOSTICO_LENTA_MS (padrão 50), com o EXPLAIN
+  QUERY PLAN capturado na hora, com os mesmos parâmetros;
+- N+1: a mesma forma de SQL repetida mais de DIAGNOSTICO_REPETICOES vezes
+  (padrão 5) num escopo. A forma ignora os valores (vão como parâmetros)
+  e o tamanho das listas de IN;
+- mais de DIAGNOSTICO_MAX_CONSULTAS consultas no escopo (0 = sem limite).
+
+executemany conta como uma consulta: inserções em lote não são N+1.
+"""
+import logging
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from banco import db, db_async, db_leitura
+from plano_consultas import varreduras_completas
+
+logger = logging.getLogger(__name__)
+
+MODO = os.getenv("DIAGNOSTICO_CONSULTAS", "").strip().lower()
+ATIVO = MODO in ("log", "estrito", "1", "true", "sim")
+ESTRITO = MODO == "estrito"
+LENTA_MS = float(os.getenv("DIAGNOSTICO_LENTA_MS", "50"))
+MAX_REPETICOES = int(os.getenv("DIAGNOSTICO_REPETICOES", "5"))
+MAX_CONSULTAS = int(os.getenv("DIAGNOSTICO_MAX_CONSULTAS", "0"))
+
+# Sem plano: controle de transação e PRAGMAs
+_SEM_PLANO = ("PRAGMA", "EXPLAIN", "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+_LISTA_PARAMETROS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+
+class OrcamentoConsultasExcedido(Exception):
+    """Escopo com consulta lenta, N+1 ou consultas demais (modo estrito)."""
+
+
+def forma_sql(statement: str) -> str:
+    """SQL normalizado: espaços colapsados e 'IN (?, ?, ?)' como 'IN (?)'."""
+    return _LISTA_PARAMETROS.sub("(?)", _ESPACOS.sub(" ", statement).strip())
+
+
+def _resumir(sql: str, limite: int = 160) -> str:
+    return sql if len(sql) <= limite else sql[:limite] + "..."
+
+
+class RelatorioConsultas:
+    def __init__(self, descricao: str):
+        self.descricao = descricao
+        self.total = 0
+        self.tempo_db = 0.0
+        self.formas: Dict[str, List] = {}   # forma -> [execuções, segundos]
+        self.lentas: List[Tuple[float, str, List[str]]] = []   # (ms, sql, plano)
+
+    def registrar(self, forma: str, segundos: float) -> None:
+        self.total += 1
+        self.tempo_db += segundos
+        contagem = self.formas.setdefault(forma, [0, 0.0])
+        contagem[0] += 1
+        contagem[1] += segundos
+
+    def repetidas(self) -> List[Tuple[str, int, float]]:
+        return sorted(((f, n, s) for f, (n, s) in self.formas.items() if n > MAX_REPETICOES),
+                      key=lambda item: -item[1])
+
+    def problemas(self) -> List[str]:
+        problemas = [f"{n}x a mesma consulta ({s * 1000:.1f} ms no total): {_resumir(f)}"
+                     for f, n, s in self.repetidas()]
+        problemas += [f"consulta lenta ({ms:.1f} ms): {_resumir(sql)}" for ms, sql, _ in self.lentas]
+        if MAX_CONSULTAS and self.total > MAX_CONSULTAS:
+            problemas.append(f"{self.total} consultas (limite {MAX_CONSULTAS})")
+        return problemas
+
+    def texto(self) -> str:
+        linhas = [f"[CONSULTAS] {self.descricao}: {self.total} consulta(s), {self.tempo_db * 1000:.1f} ms no banco"]
+        for f, n, s in self.repetidas():
+            linhas.append(f"  N+1? {n}x ({s * 1000:.1f} ms): {_resumir(f)}")
+        for ms, sql, plano in self.lentas:
+            varreduras = varreduras_completas(plano)
+            linhas.append(f"  LENTA {ms:.1f} ms{' (SCAN sem índice)' if varreduras else ''}: {_resumir(sql)}")
+            linhas += [f"       {d}" for d in plano]
+        if MAX_CONSULTAS and self.total > MAX_CONSULTAS:
+            linhas.append(f"  ACIMA DO LIMITE: {self.total} > {MAX_CONSULTAS} consultas")
+        return "\n".join(linhas)
+
+
+_relatorio: ContextVar[Optional[RelatorioConsultas]] = ContextVar("relatorio_consultas", default=None)
+
+
+def _plano(conn, statement: str, parametros) -> List[str]:
+    """
+    EXPLAIN QUERY PLAN pelo cursor DBAPI da própria conexão (mesma transação,
+    sem disparar os eventos do SQLAlchemy de novo).
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parametros)
+        return [linha[3] for linha in cursor.fetchall()]
+    except Exception as e:
+        return [f"(plano indisponível: {e})"]
+    finally:
+        cursor.close()
+
+
+def instrumentar_engine(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        if _relatorio.get() is not None:
+            conn.info.setdefault("diagnostico_inicio", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def depois(conn, cursor, statement, parameters, context, executemany):
+        relatorio = _relatorio.get()
+        if relatorio is None or not conn.info.get("diagnostico_inicio"):
+            return
+        decorrido = perf_counter() - conn.info["diagnostico_inicio"].pop()
+        relatorio.registrar(forma_sql(statement), decorrido)
+        if decorrido * 1000 >= LENTA_MS and not statement.lstrip().upper().startswith(_SEM_PLANO):
+            amostra = parameters[0] if executemany and parameters else parameters
+            relatorio.lentas.append((decorrido * 1000, forma_sql(statement), _plano(conn, statement, amostra)))
+
+    @event.listens_for(engine, "handle_error")
+    def erro(contexto):
+        if contexto.connection is not None and contexto.connection.info.get("diagnostico_inicio"):
+            contexto.connection.info["diagnostico_inicio"].pop()
+
+
+@contextmanager
+def escopo(descricao: str) -> Iterator[Optional[RelatorioConsultas]]:
+    """
+    Junta as consultas feitas dentro do bloco (inclusive em threads do
+    run_in_threadpool, que copiam o contexto) num relatório. Desligado, não faz nada.
+    """
+    if not ATIVO:
+        yield None
+        return
+    relatorio = RelatorioConsultas(descricao)
+    token = _relatorio.set(relatorio)
+    try:
+        yield relatorio
+    finally:
+        _relatorio.reset(token)
+        problemas = relatorio.problemas()
+        if relatorio.total:
+            logger.log(logging.WARNING if problemas else logging.INFO, "%s", relatorio.texto())
+    if ESTRITO and problemas:
+        raise OrcamentoConsultasExcedido(f"{relatorio.descricao}: " + "; ".join(problemas))
+
+
+class MiddlewareDiagnostico:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with escopo(f"{scope['method']} {scope['path']}"):
+            await self.app(scope, receive, send)
+
+
+def ativar(app) -> None:
+    """
+    Registra os eventos nos engines e o middleware (chamado em main.py se ATIVO).
+    O engine síncrono (db) é o dos workers de importação e de notificações.
+    """
+    instrumentar_engine(db)
+    instrumentar_engine(db_async.sync_engine)
+    instrumentar_engine(db_leitura.sync_engine)
+    app.add_middleware(MiddlewareDiagnostico)
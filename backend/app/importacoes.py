@@ -0,0 +1,343 @@
+"""
+Importação BibTeX em segundo plano (POST /artigo/artigo/importar-bibtex).
+
+O upload só grava o .bib e o ZIP em IMPORTACOES_PASTA/<id>/ e cria a linha em
+importacoes ('pendente'); a resposta (202) traz o id. O WorkerImportacoes,
+iniciado no lifespan como o de notificações, processa um job por vez em blocos
+de IMPORTACOES_LOTE entradas (padrão 200). Cada bloco valida, salva os PDFs,
+insere os artigos, enfileira as notificações e grava o progresso (entradas
+processadas, bytes do .bib já lidos, contadores e os pulados do bloco) num
+único commit. GET /artigo/import-jobs/{id} lê esse progresso; o BibTeX é lido
+uma vez só, então o percentual vem dos bytes lidos (aproximado: o leitor vai um
+pouco à frente) e o total de entradas só aparece no fim.
+
+Se o processo cair no meio, o job fica 'processando'; quando o worker sobe de
+novo, ele volta para 'pendente' e continua depois da última entrada gravada (o
+BibTeX é relido e as entradas já processadas são descartadas). PDFs salvos por
+um bloco que não chegou ao commit são reaproveitados na retomada (armazenamento
+por conteúdo). Um erro inesperado num bloco encerra o job como 'falhou'; os
+blocos anteriores continuam gravados.
+
+Como o outbox, pressupõe um único processo consumindo os jobs: com vários
+workers do uvicorn, deixe IMPORTACOES_WORKER=0 em todos menos um.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import zipfile
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from armazenamento import remover_se_orfao
+from banco import db
+from cache_respostas import TAG_ARTIGOS, cache_respostas, tag_edicao
+from cadastro_artigos import importar_bloco, mapear_pdfs_zip, tags_autores
+from diagnostico_consultas import escopo
+from leitor_bibtex import iterar_artigos
+from models import ImportacaoBibtex, ImportacaoPulado
+from notificacoes import worker_notificacoes
+from schemas import ArtigoSchema
+from versoes import TABELA_ARTIGOS, comando_incremento
+
+logger = logging.getLogger(__name__)
+
+PASTA_IMPORTACOES = os.getenv('IMPORTACOES_PASTA', 'importacoes')
+TAMANHO_LOTE = int(os.getenv('IMPORTACOES_LOTE', '200'))               # entradas por commit
+INTERVALO_OCIOSO = float(os.getenv('IMPORTACOES_INTERVALO', '5'))     # segundos entre verificações
+ATIVO = os.getenv('IMPORTACOES_WORKER', '1').lower() not in ('0', 'false', 'nao', 'não')
+
+ARQUIVO_BIBTEX = 'entrada.bib'
+ARQUIVO_ZIP = 'pdfs.zip'
+FINALIZADOS = ('concluida', 'falhou')
+
+
+def _agora() -> datetime:
+    # O SQLite guarda DateTime sem fuso; usamos sempre UTC "naive"
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def pasta_importacao(id_importacao: int) -> str:
+    return os.path.join(PASTA_IMPORTACOES, str(id_importacao))
+
+
+def nova_importacao(id_usuario: int, arquivo: Optional[str]) -> ImportacaoBibtex:
+    return ImportacaoBibtex(id_usuario, arquivo, _agora())
+
+
+def gravar_arquivos(id_importacao: int, bibtex: BinaryIO, pdf_zip: BinaryIO) -> None:
+    """Copia os uploads (já em disco, no SpooledTemporaryFile) para a pasta do job, em blocos."""
+    pasta = pasta_importacao(id_importacao)
+    os.makedirs(pasta, exist_ok=True)
+    try:
+        for origem, nome in ((bibtex, ARQUIVO_BIBTEX), (pdf_zip, ARQUIVO_ZIP)):
+            origem.seek(0)
+            with open(os.path.join(pasta, nome), 'wb') as destino:
+                shutil.copyfileobj(origem, destino, 1024 * 1024)
+    except Exception:
+        remover_arquivos(id_importacao)
+        raise
+
+
+def remover_arquivos(id_importacao: int) -> None:
+    shutil.rmtree(pasta_importacao(id_importacao), ignore_errors=True)
+
+
+def descrever_importacao(job: ImportacaoBibtex, pulados: List[ImportacaoPulado]) -> Dict[str, Any]:
+    """Corpo de GET /artigo/import-jobs/{id}: progresso, relatório de pulados e resumo."""
+    percentual = None
+    if job.status == 'concluida':
+        percentual = 100.0
+    elif job.tamanho_bibtex:
+        percentual = min(100.0, round(100 * job.bytes_lidos / job.tamanho_bibtex, 1))
+
+    mensagem = None
+    if job.status == 'concluida':
+        mensagem = f"Importação finalizada. Total de artigos cadastrados: {job.cadastrados}."
+        if job.pulados:
+            mensagem += f" {job.pulados} artigo(s) foram pulados. Veja o relatório."
+        if job.notificacoes:
+            mensagem += f" {job.notificacoes} artigo(s) geraram notificações de subscribers."
+    elif job.status == 'falhou':
+        mensagem = f"Importação interrompida por erro depois de {job.processadas} entrada(s): {job.erro}"
+
+    return {
+        "id": job.id,
+        "status": job.status,
+        "arquivo": job.arquivo,
+        "progresso": {"processadas": job.processadas, "total": job.total_entradas, "percentual": percentual},
+        "total_cadastrados": job.cadastrados,
+        "total_pulados": job.pulados,
+        "total_notificacoes": job.notificacoes,
+        "mensagem": mensagem,
+        "erro": job.erro,
+        "criado_em": job.criado_em,
+        "iniciado_em": job.iniciado_em,
+        "concluido_em": job.concluido_em,
+        "relatorio_erros": [
+            {"indice": p.indice, "chave": p.chave, "titulo": p.titulo, "motivo": p.motivo} for p in pulados
+        ],
+    }
+
+
+class _Execucao:
+    """Arquivos abertos e posição no BibTeX de um job em processamento."""
+
+    def __init__(self, id_importacao: int, processadas: int):
+        pasta = pasta_importacao(id_importacao)
+        self.id = id_importacao
+        self.proxima = processadas
+        self.zip_ref: Optional[zipfile.ZipFile] = None
+        self._bibtex = open(os.path.join(pasta, ARQUIVO_BIBTEX), 'rb')
+        self.artigos: Iterator[Tuple[Optional[ArtigoSchema], str]] = iterar_artigos(self._bibtex)
+        try:
+            # Retomada: descarta as entradas de blocos já gravados
+            deque(islice(self.artigos, processadas), maxlen=0)
+            self.zip_ref = zipfile.ZipFile(os.path.join(pasta, ARQUIVO_ZIP))
+            self.pdf_file_map = mapear_pdfs_zip(self.zip_ref)
+        except Exception:
+            self.fechar()
+            raise
+
+    def bytes_lidos(self) -> int:
+        return self._bibtex.tell()
+
+    def proximo_bloco(self, tamanho: int) -> List[Tuple[int, Optional[ArtigoSchema], str]]:
+        return [(self.proxima + i, artigo, chave) for i, (artigo, chave) in enumerate(islice(self.artigos, tamanho))]
+
+    def fechar(self) -> None:
+        self.artigos.close()
+        if self.zip_ref is not None:
+            self.zip_ref.close()
+        self._bibtex.close()
+
+
+class WorkerImportacoes:
+    """
+    Processa os jobs de importacoes em ordem de criação, um por vez, com um
+    commit por bloco de entradas (ver docstring do módulo).
+    """
+
+    def __init__(self, engine=db, tamanho_lote: int = TAMANHO_LOTE):
+        self.Session = sessionmaker(bind=engine)
+        self.tamanho_lote = max(1, tamanho_lote)
+        self._tarefa: Optional[asyncio.Task] = None
+        self._acordar: Optional[asyncio.Event] = None
+
+    # --- acesso ao banco (síncrono, chamado via threadpool) ---
+
+    def _recuperar_interrompidas(self) -> None:
+        """Jobs 'processando' de uma execução interrompida voltam para a fila (retomam do último bloco)."""
+        with self.Session() as session:
+            session.execute(update(ImportacaoBibtex).where(ImportacaoBibtex.status == 'processando')
+                            .values(status='pendente'))
+            session.commit()
+
+    def _reservar(self) -> Optional[int]:
+        """
+        Passa o job pendente mais antigo para 'processando' num único UPDATE
+        condicional; nenhuma linha devolvida quer dizer que não há o que reservar
+        (fila vazia, ou outro consumidor pegou o job antes).
+        """
+        agora = _agora()
+        proximo = (select(ImportacaoBibtex.id).where(ImportacaoBibtex.status == 'pendente')
+                   .order_by(ImportacaoBibtex.id).limit(1).scalar_subquery())
+        with self.Session() as session:
+            id_importacao = session.scalar(
+                update(ImportacaoBibtex)
+                .where(ImportacaoBibtex.id == proximo, ImportacaoBibtex.status == 'pendente')
+                .values(status='processando', atualizado_em=agora,
+                        iniciado_em=func.coalesce(ImportacaoBibtex.iniciado_em, agora))
+                .returning(ImportacaoBibtex.id)
+            )
+            session.commit()
+            return id_importacao
+
+    def _abrir(self, id_importacao: int) -> _Execucao:
+        with self.Session() as session:
+            job = session.get(ImportacaoBibtex, id_importacao)
+            if job.tamanho_bibtex is None:
+                job.tamanho_bibtex = os.path.getsize(os.path.join(pasta_importacao(id_importacao), ARQUIVO_BIBTEX))
+                session.commit()
+            processadas = job.processadas
+            logger.info("Job %s: %s byte(s) de BibTeX, continuando da entrada %s",
+                        id_importacao, job.tamanho_bibtex, processadas)
+        return _Execucao(id_importacao, processadas)
+
+    def _processar_bloco(self, execucao: _Execucao) -> Optional[Tuple[List[str], bool]]:
+        """
+        Importa o próximo bloco e grava o progresso no mesmo commit. Retorna
+        (tags do cache a invalidar, se há notificações novas), ou None no fim do arquivo.
+        """
+        bloco = execucao.proximo_bloco(self.tamanho_lote)
+        if not bloco:
+            return None
+        blobs_salvos = []
+        with self.Session() as session:
+            try:
+                aprovados, ids_edicao, pulados, notificacoes = importar_bloco(
+                    session, execucao.zip_ref, execucao.pdf_file_map, bloco, blobs_salvos)
+                if pulados:
+                    # executemany sem RETURNING: add_all faria um INSERT por pulado para buscar o id
+                    session.execute(insert(ImportacaoPulado), [
+                        {'id_importacao': execucao.id, 'indice': p['indice'], 'chave': p['chave'],
+                         'titulo': p['titulo'], 'motivo': p['motivo']} for p in pulados])
+                job = session.get(ImportacaoBibtex, execucao.id)
+                job.processadas = bloco[-1][0] + 1
+                job.bytes_lidos = execucao.bytes_lidos()
+                job.cadastrados += len(aprovados)
+                job.pulados += len(pulados)
+                job.notificacoes += len(notificacoes)
+                job.atualizado_em = _agora()
+                if aprovados:
+                    session.execute(comando_incremento(TABELA_ARTIGOS))
+                session.commit()
+            except Exception:
+                session.rollback()
+                for blob in blobs_salvos:
+                    remover_se_orfao(session, blob.sha256)
+                raise
+        execucao.proxima = bloco[-1][0] + 1
+        tags = []
+        if aprovados:
+            tags = [TAG_ARTIGOS, *{tag_edicao(i) for i in ids_edicao},
+                    *set(tags_autores(*(a.autores for a in aprovados)))]
+        return tags, bool(notificacoes)
+
+    def _finalizar(self, id_importacao: int, erro: Optional[str]) -> None:
+        with self.Session() as session:
+            job = session.get(ImportacaoBibtex, id_importacao)
+            agora = _agora()
+            job.status = 'falhou' if erro else 'concluida'
+            job.erro = erro[:500] if erro else None
+            if not erro:
+                # Contado na própria leitura: as processadas são todas as entradas do arquivo
+                job.total_entradas = job.processadas
+            job.concluido_em = agora
+            job.atualizado_em = agora
+            session.commit()
+            if erro:
+                logger.warning("Job %s falhou depois de %s entrada(s): %s", id_importacao, job.processadas, erro)
+            else:
+                logger.info("Job %s concluído: %s cadastrado(s), %s pulado(s)",
+                            id_importacao, job.cadastrados, job.pulados)
+        remover_arquivos(id_importacao)
+
+    # --- ciclo de vida ---
+
+    async def processar(self, id_importacao: int) -> None:
+        execucao = None
+        try:
+            execucao = await run_in_threadpool(self._abrir, id_importacao)
+            while True:
+                with escopo(f"importação {id_importacao}, entradas a partir de {execucao.proxima}"):
+                    resultado = await run_in_threadpool(self._processar_bloco, execucao)
+                if resultado is None:
+                    break
+                tags, notificar = resultado
+                if tags:
+                    cache_respostas.invalidar(*tags)
+                if notificar:
+                    worker_notificacoes.acordar()
+            erro = None
+        except asyncio.CancelledError:
+            raise   # desligamento: o job continua 'processando' e é retomado na próxima subida
+        except Exception as e:
+            erro = f"{type(e).__name__}: {e}"
+        finally:
+            if execucao is not None:
+                execucao.fechar()
+        await run_in_threadpool(self._finalizar, id_importacao, erro)
+
+    async def processar_pendentes(self) -> int:
+        """Processa os jobs pendentes até esvaziar a fila; retorna quantos foram processados."""
+        total = 0
+        while (id_importacao := await run_in_threadpool(self._reservar)) is not None:
+            await self.processar(id_importacao)
+            total += 1
+        return total
+
+    async def _executar(self) -> None:
+        await run_in_threadpool(self._recuperar_interrompidas)
+        while True:
+            try:
+                await self.processar_pendentes()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Erro no worker de importações: %s", e)
+            self._acordar.clear()
+            try:
+                await asyncio.wait_for(self._acordar.wait(), timeout=INTERVALO_OCIOSO)
+            except asyncio.TimeoutError:
+                pass
+
+    def acordar(self) -> None:
+        """Avisa o worker que há um job novo (chamar após o commit)."""
+        if self._acordar is not None:
+            self._acordar.set()
+
+    def iniciar(self) -> None:
+        if self._tarefa is not None or not ATIVO:
+            return
+        self._acordar = asyncio.Event()
+        self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        if self._tarefa is None:
+            return
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+
+
+worker_importacoes = WorkerImportacoes()
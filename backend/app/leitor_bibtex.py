@@ -0,0 +1,278 @@
+"""
+Leitura incremental de BibTeX (importação em /artigo/artigo/importar-bibtex).
+
+O bibtexparser.loads recebe o texto inteiro e monta o banco completo em memória
+antes de devolver a primeira entrada. Aqui o upload é lido em blocos de
+TAMANHO_LEITURA bytes e cortado nas fronteiras de elemento ('@' no início de
+uma linha, fora de chaves) em trechos de ~BIBTEX_BLOCO_KB (padrão 512), e cada
+trecho passa pelo próprio bibtexparser: a memória fica limitada ao trecho, não
+ao arquivo, e a gramática continua sendo a dele.
+
+Opções do parser: as do bibtexparser.loads que usávamos, mais common_strings
+(jan, feb, ... já definidos). Um único BibTexParser lê os trechos em ordem,
+para um @string valer nos trechos seguintes. Um @string não definido faz o
+bibtexparser abortar o trecho inteiro; nesse caso o trecho é relido elemento
+por elemento e a entrada com problema sai como (None, chave), pulada com
+motivo, como as que não viram ArtigoSchema (título curto, ano não numérico).
+
+Com BIBTEX_PROCESSOS > 1 (padrão 1: desligado até o benchmarks/bibtex.py mostrar
+ganho na máquina de produção), arquivos a partir de BIBTEX_LIMIAR_PROCESSOS_MB
+(padrão 4) têm os trechos analisados num pool desse tamanho, com a ordem
+preservada e no máximo 2 trechos por processo em andamento. Trechos com
+@string são lidos no processo principal, para valerem nos trechos seguintes.
+
+O corte só muda o resultado num valor com uma linha começando por '@' que
+esteja entre aspas, ou num elemento maior que BIBTEX_BLOCO_KB: passado esse
+tamanho o '@' de início de linha corta mesmo dentro de chaves, para uma chave
+não fechada não segurar o arquivo inteiro na memória.
+"""
+import codecs
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from bibtexparser.bparser import BibTexParser
+
+from schemas import ArtigoSchema
+
+PROCESSOS = int(os.getenv("BIBTEX_PROCESSOS", "1"))
+LIMIAR_PROCESSOS = int(float(os.getenv("BIBTEX_LIMIAR_PROCESSOS_MB", "4")) * 1024 * 1024)
+TAMANHO_BLOCO = int(os.getenv("BIBTEX_BLOCO_KB", "512")) * 1024
+TAMANHO_LEITURA = 64 * 1024
+
+# O bibtexparser avisa (WARNING) a cada tipo fora do padrão e @string redefinido
+logging.getLogger("bibtexparser").setLevel(logging.ERROR)
+
+_MARCAS = re.compile(r"[{}@\n]")
+_DEFINICAO_MACRO = re.compile(r"@[ \t\r\n]*string", re.IGNORECASE)
+_CHAVE = re.compile(r"[ \t\r\n]*@[ \t\r\n]*[A-Za-z]+[ \t\r\n]*[{(][ \t\r\n]*([^,\s]+)")
+
+Artigos = List[Tuple[Optional[ArtigoSchema], str]]
+
+
+def ler_texto(stream: BinaryIO) -> Iterator[str]:
+    """Texto do arquivo em pedaços de TAMANHO_LEITURA bytes (UTF-8, BOM removido)."""
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        bruto = stream.read(TAMANHO_LEITURA)
+        if not bruto:
+            break
+        texto = decodificador.decode(bruto)
+        if texto:
+            yield texto
+    resto = decodificador.decode(b"", final=True)
+    if resto:
+        yield resto
+
+
+def ler_elementos(pedacos: Iterable[str]) -> Iterator[str]:
+    """
+    Texto de cada elemento (@entrada, @string, @comment, ...), cortado no '@'
+    que começa uma linha fora de chaves. O que vem antes do primeiro '@' sai
+    como um elemento próprio, que o bibtexparser trata como comentário.
+    """
+    atual: List[str] = []
+    tamanho = nivel = 0
+    # As chaves só contam dentro de um elemento, até ele fechar: fora dele
+    # (comentários soltos, lixo entre entradas) o bibtexparser as ignora
+    aberto = False
+    inicio_linha = True   # só espaços desde o último '\n' (ou desde o começo do arquivo)
+    for pedaco in pedacos:
+        corte = anterior = 0
+        for m in _MARCAS.finditer(pedaco):
+            if inicio_linha and pedaco[anterior:m.start()].strip(" \t\r"):
+                inicio_linha = False
+            anterior = m.end()
+            c = m.group()
+            if c == "\n":
+                inicio_linha = True
+                continue
+            inicio_linha_arroba, inicio_linha = inicio_linha, False
+            if not aberto:
+                if c != "@" or not inicio_linha_arroba:
+                    continue
+            elif c == "{":
+                nivel += 1
+                continue
+            elif c == "}":
+                nivel -= 1
+                aberto = nivel > 0
+                continue
+            elif not inicio_linha_arroba:
+                continue
+            # Chaves desbalanceadas não seguram o corte além de TAMANHO_BLOCO
+            if aberto and nivel > 0 and tamanho + m.start() - corte < TAMANHO_BLOCO:
+                continue
+            atual.append(pedaco[corte:m.start()])
+            elemento = "".join(atual)
+            if elemento.strip():
+                yield elemento
+            atual, tamanho, corte, nivel, aberto = [], 0, m.start(), 0, True
+        if inicio_linha and pedaco[anterior:].strip(" \t\r"):
+            inicio_linha = False
+        atual.append(pedaco[corte:])
+        tamanho += len(pedaco) - corte
+    elemento = "".join(atual)
+    if elemento.strip():
+        yield elemento
+
+
+def _trechos(elementos: Iterator[str]) -> Iterator[Tuple[List[str], bool]]:
+    """Grupos de elementos com ~TAMANHO_BLOCO caracteres; o bool indica @string."""
+    trecho: List[str] = []
+    tamanho, com_macro = 0, False
+    for elemento in elementos:
+        trecho.append(elemento)
+        tamanho += len(elemento)
+        com_macro = com_macro or _DEFINICAO_MACRO.match(elemento.lstrip()) is not None
+        if tamanho >= TAMANHO_BLOCO:
+            yield trecho, com_macro
+            trecho, tamanho, com_macro = [], 0, False
+    if trecho:
+        yield trecho, com_macro
+
+
+def novo_parser(macros: Optional[Dict[str, str]] = None) -> BibTexParser:
+    """Parser com as opções da importação; `macros` substitui os @string iniciais."""
+    parser = BibTexParser(common_strings=macros is None)
+    if macros is not None:
+        parser.bib_database.strings.update(macros)
+    return parser
+
+
+def _ler(parser: BibTexParser, texto: str) -> List[Dict[str, str]]:
+    """Entradas de `texto`; as anteriores do parser são descartadas, os @string ficam."""
+    parser.bib_database.entries = []
+    try:
+        parser.parse(texto)
+    finally:
+        entradas, parser.bib_database.entries = parser.bib_database.entries, []
+        parser.bib_database.comments = []
+        parser.bib_database.preambles = []
+    return entradas
+
+
+def entrada_para_artigo(entrada: Dict[str, str]) -> Tuple[Optional[ArtigoSchema], str]:
+    chave = entrada.get("ID") or entrada.get("key")
+    paginas = entrada["pages"].split("--") if "--" in entrada.get("pages", "") else None
+    try:
+        artigo = ArtigoSchema(
+            titulo=entrada.get("title"),
+            autores=entrada.get("author"),
+            nome_evento=entrada.get("booktitle"),
+            ano=int(entrada["year"]) if "year" in entrada else None,
+            pagina_inicial=int(paginas[0]) if paginas else None,
+            pagina_final=int(paginas[1]) if paginas else None,
+            caminho_pdf=None,
+            booktitle=entrada.get("booktitle"),
+            publisher=entrada.get("publisher"),
+            location=entrada.get("location"),
+        )
+    except ValueError:   # inclui ValidationError do pydantic
+        return None, chave
+    return artigo, chave
+
+
+def analisar_trecho(parser: BibTexParser, elementos: List[str]) -> Artigos:
+    """
+    (ArtigoSchema ou None, chave) das entradas de um trecho, lido de uma vez;
+    se o bibtexparser abortar (ex: @string não definido), elemento por elemento.
+    """
+    try:
+        return [entrada_para_artigo(e) for e in _ler(parser, "".join(elementos))]
+    except Exception:
+        pass
+    artigos: Artigos = []
+    for elemento in elementos:
+        try:
+            artigos.extend(entrada_para_artigo(e) for e in _ler(parser, elemento))
+        except Exception:
+            m = _CHAVE.match(elemento)
+            if m is not None and not _DEFINICAO_MACRO.match(elemento.lstrip()):
+                artigos.append((None, m.group(1)))
+    return artigos
+
+
+def _analisar_no_pool(elementos: List[str], macros: Dict[str, str]) -> Artigos:
+    # Roda nos processos do pool
+    return analisar_trecho(novo_parser(macros), elementos)
+
+
+class PoolBibtex:
+    """Processos para os trechos de arquivos grandes, criados no primeiro uso."""
+
+    def __init__(self, processos: int = PROCESSOS):
+        self.processos = max(1, processos)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()   # usado a partir das threads do run_in_threadpool
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: fork de um processo com threads (uvicorn, aiosqlite) não é seguro
+                self._executor = ProcessPoolExecutor(max_workers=self.processos,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def encerrar(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+pool_bibtex = PoolBibtex()
+
+
+def _artigos_em_processos(elementos: Iterator[str], pool: PoolBibtex) -> Iterator[Tuple[Optional[ArtigoSchema], str]]:
+    executor = pool.executor()
+    parser = novo_parser()
+    pendentes: Deque[Union[Future, Artigos]] = deque()
+    try:
+        for trecho, com_macro in _trechos(elementos):
+            if com_macro:
+                pendentes.append(analisar_trecho(parser, trecho))
+            else:
+                pendentes.append(executor.submit(_analisar_no_pool, trecho, dict(parser.bib_database.strings)))
+            while len(pendentes) > 2 * pool.processos:
+                pronto = pendentes.popleft()
+                yield from pronto.result() if isinstance(pronto, Future) else pronto
+        while pendentes:
+            pronto = pendentes.popleft()
+            yield from pronto.result() if isinstance(pronto, Future) else pronto
+    finally:
+        for pendente in pendentes:
+            if isinstance(pendente, Future):
+                pendente.cancel()
+
+
+def _tamanho_restante(stream: BinaryIO) -> Optional[int]:
+    try:
+        atual = stream.tell()
+        fim = stream.seek(0, os.SEEK_END)
+        stream.seek(atual)
+        return fim - atual
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def iterar_artigos(stream: BinaryIO, pool: Optional[PoolBibtex] = pool_bibtex,
+                   limiar: int = LIMIAR_PROCESSOS) -> Iterator[Tuple[Optional[ArtigoSchema], str]]:
+    """
+    (ArtigoSchema ou None, chave BibTeX) de cada entrada, na ordem do arquivo,
+    a partir de um arquivo binário (ex: UploadFile.file). O pool só entra a
+    partir de `limiar` bytes; pool=None força a leitura no processo atual.
+    """
+    tamanho = _tamanho_restante(stream)
+    elementos = ler_elementos(ler_texto(stream))
+    if pool is not None and pool.processos > 1 and tamanho is not None and tamanho >= limiar:
+        yield from _artigos_em_processos(elementos, pool)
+        return
+    parser = novo_parser()
+    for trecho, _ in _trechos(elementos):
+        yield from analisar_trecho(parser, trecho)
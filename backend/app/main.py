@@ -5,6 +5,10 @@ from passlib.context import CryptContext
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from pathlib import Path
+from contextlib import asynccontextmanager
+import logging
+from serializacao import RespostaJSON
+from metricas import MiddlewareMetricas
 
 load_dotenv()
 
@@ -14,8 +18,31 @@ load_dotenv(dotenv_path=env_path)
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
-app = FastAPI(title = os.getenv("PROJECT_NAME"), description= os.getenv("PROJECT_DESCRIPITION"), version= os.getenv("PROJECT_VERSION"))
+# Logs da aplicação (notificações, diagnóstico de consultas); o uvicorn configura os dele à parte
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(levelname)s [%(name)s] %(message)s")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Worker que envia os emails do outbox (notificacoes_outbox) fora das requisições
+    from banco import verificar_pragmas
+    await verificar_pragmas()
+    from notificacoes import worker_notificacoes
+    worker_notificacoes.iniciar()
+    # Worker dos jobs de importação BibTeX (importacoes.py)
+    from importacoes import worker_importacoes
+    worker_importacoes.iniciar()
+    yield
+    await worker_importacoes.parar()
+    await worker_notificacoes.parar()
+    from senhas import pool_senhas
+    pool_senhas.encerrar()
+    from leitor_bibtex import pool_bibtex
+    pool_bibtex.encerrar()
+
+app = FastAPI(title = os.getenv("PROJECT_NAME"), description= os.getenv("PROJECT_DESCRIPITION"), version= os.getenv("PROJECT_VERSION"), lifespan=lifespan,
+              default_response_class=RespostaJSON)  # orjson, ver serializacao.py
 
 origins = [
     "http://localhost:5173",
@@ -28,9 +55,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Metadados da paginação (ver paginacao.py)
+    expose_headers=["X-Proximo-Cursor", "X-Total-Count"],
 )
+# Depois do CORS = mais externo: mede a requisição inteira (ver metricas.py, GET /metrics)
+app.add_middleware(MiddlewareMetricas)
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_schema = OAuth2PasswordBearer(tokenUrl="auth/login-form")
 
 from router.auth_router import auth_router
@@ -38,9 +69,16 @@ from router.evento_routher import evento_router
 from router.artigo_router import artigo_router
 from router.subscriber_router import subscriber_router
 from router.edition_router import edition_router
+from router.metricas_router import metricas_router
 
 app.include_router(auth_router)
 app.include_router(evento_router)
 app.include_router(artigo_router)
 app.include_router(subscriber_router)
-app.include_router(edition_router)
\ No newline at end of file
+app.include_router(edition_router)
+app.include_router(metricas_router)
+
+# Opcional: relatório de consultas lentas/N+1 por requisição (DIAGNOSTICO_CONSULTAS=log|estrito)
+import diagnostico_consultas
+if diagnostico_consultas.ATIVO:
+    diagnostico_consultas.ativar(app)
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""
+Métricas da API no formato texto do Prometheus (GET /metrics).
+
+MiddlewareMetricas (ASGI puro, registrado em main.py) mede cada requisição:
+latência, tamanho do corpo recebido e enviado e requisições em andamento, por
+método e rota (o template, ex: /artigo/{id}, não o caminho real). Os eventos
+before/after_cursor_execute dos engines (ligados em banco.py) somam, na requisição
+corrente (contextvar), o número de consultas e o tempo gasto no banco. A
+serialização é medida em RespostaJSON.render (serializacao.py).
+
+Cada resposta sai com o cabeçalho Server-Timing, que divide o tempo até o
+início da resposta em db, serialize e other (visível no DevTools do navegador).
+
+As métricas são por processo: com vários workers do uvicorn, cada um expõe as
+suas. METRICAS_TOKEN, se definido, passa a ser exigido em /metrics como
+"Authorization: Bearer <token>".
+"""
+import os
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN")
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BYTES = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+ROTA_DESCONHECIDA = "<sem rota>"   # 404 de caminho inexistente: não vira um rótulo por URL
+
+_lock = threading.Lock()
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{n}="{_escapar(str(v))}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+
+    def _cabecalho(self) -> List[str]:
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *rotulos: str, valor: float = 1) -> None:
+        with _lock:
+            self._valores[rotulos] = self._valores.get(rotulos, 0) + valor
+
+    def exportar(self) -> List[str]:
+        with _lock:
+            itens = sorted(self._valores.items())
+        return self._cabecalho() + [f"{self.nome}{_rotulos(self.rotulos, r)} {v!r}" for r, v in itens]
+
+
+class Medidor(Contador):
+    """Valor que sobe e desce (ex: requisições em andamento)."""
+    tipo = "gauge"
+
+    def dec(self, *rotulos: str) -> None:
+        self.inc(*rotulos, valor=-1)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str], buckets: Iterable[float]):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(float(b) for b in buckets)
+        # rótulos -> [contagem por bucket (não cumulativa) ..., +Inf], soma
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observar(self, valor: float, *rotulos: str) -> None:
+        with _lock:
+            serie = self._series.get(rotulos)
+            if serie is None:
+                serie = self._series[rotulos] = ([0] * (len(self.buckets) + 1), [0.0])
+            serie[0][bisect_left(self.buckets, valor)] += 1
+            serie[1][0] += valor
+
+    def exportar(self) -> List[str]:
+        with _lock:
+            itens = sorted((r, (list(c), s[0])) for r, (c, s) in self._series.items())
+        linhas = self._cabecalho()
+        limites = [repr(b) for b in self.buckets] + ["+Inf"]
+        for rotulos, (contagens, soma) in itens:
+            acumulado = 0
+            for limite, contagem in zip(limites, contagens):
+                acumulado += contagem
+                le = f'le="{limite}"'
+                linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, rotulos, le)} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, rotulos)} {soma!r}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, rotulos)} {acumulado}")
+        return linhas
+
+
+# Nomes no padrão do Prometheus, para servirem em dashboards prontos
+requisicoes = Contador("http_requests_total", "Requisições HTTP concluídas.", ("method", "route", "status"))
+latencia = Histograma("http_request_duration_seconds", "Duração das requisições HTTP.",
+                      ("method", "route"), BUCKETS_SEGUNDOS)
+tamanho_requisicao = Histograma("http_request_size_bytes", "Bytes do corpo recebido.",
+                                ("method", "route"), BUCKETS_BYTES)
+tamanho_resposta = Histograma("http_response_size_bytes", "Bytes do corpo enviado.",
+                              ("method", "route"), BUCKETS_BYTES)
+em_andamento = Medidor("http_requests_in_progress", "Requisições HTTP em andamento.", ("method",))
+consultas_por_requisicao = Histograma("http_request_db_queries", "Consultas SQL por requisição.",
+                                      ("method", "route"), BUCKETS_CONSULTAS)
+tempo_db_por_requisicao = Histograma("http_request_db_duration_seconds", "Tempo no banco por requisição.",
+                                     ("method", "route"), BUCKETS_SEGUNDOS)
+consultas = Contador("db_queries_total", "Consultas SQL executadas (inclui as fora de requisições).", ("pool",))
+tempo_db = Contador("db_query_duration_seconds_total", "Tempo total das consultas SQL.", ("pool",))
+
+METRICAS: List[_Metrica] = [requisicoes, latencia, tamanho_requisicao, tamanho_resposta, em_andamento,
+                            consultas_por_requisicao, tempo_db_por_requisicao, consultas, tempo_db]
+
+
+def exportar() -> str:
+    return "\n".join(linha for metrica in METRICAS for linha in metrica.exportar()) + "\n"
+
+
+class MedicaoRequisicao:
+    """Tempo de banco e de serialização acumulados durante uma requisição."""
+    __slots__ = ("consultas", "tempo_db", "tempo_serializacao")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_db = 0.0
+        self.tempo_serializacao = 0.0
+
+    def server_timing(self, total: float) -> str:
+        outro = max(0.0, total - self.tempo_db - self.tempo_serializacao)
+        return (f'db;dur={self.tempo_db * 1000:.2f};desc="{self.consultas} consulta(s)", '
+                f"serialize;dur={self.tempo_serializacao * 1000:.2f}, other;dur={outro * 1000:.2f}")
+
+
+_medicao: ContextVar[Optional[MedicaoRequisicao]] = ContextVar("medicao_requisicao", default=None)
+
+
+def medicao_atual() -> Optional[MedicaoRequisicao]:
+    return _medicao.get()
+
+
+def registrar_serializacao(segundos: float) -> None:
+    medicao = _medicao.get()
+    if medicao is not None:
+        medicao.tempo_serializacao += segundos
+
+
+def instrumentar_engine(engine, pool: str) -> None:
+    """
+    Conta consultas e tempo de banco (chamado em banco.py para cada engine).
+    O SQLAlchemy async roda o código síncrono num greenlet com o mesmo contexto
+    da tarefa, então a contextvar da requisição é visível aqui.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metricas_inicio", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def depois(conn, cursor, statement, parameters, context, executemany):
+        decorrido = perf_counter() - conn.info["metricas_inicio"].pop()
+        consultas.inc(pool)
+        tempo_db.inc(pool, valor=decorrido)
+        medicao = _medicao.get()
+        if medicao is not None:
+            medicao.consultas += 1
+            medicao.tempo_db += decorrido
+
+    @event.listens_for(engine, "handle_error")
+    def erro(contexto):
+        # Consulta que falhou não passa por after_cursor_execute
+        if contexto.connection is not None and contexto.connection.info.get("metricas_inicio"):
+            contexto.connection.info["metricas_inicio"].pop()
+
+
+def _rota(scope) -> str:
+    # O roteamento grava a rota encontrada no próprio scope (FastAPI: scope["route"])
+    rota = scope.get("route")
+    return getattr(rota, "path_format", None) or getattr(rota, "path", None) or ROTA_DESCONHECIDA
+
+
+class MiddlewareMetricas:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicao = MedicaoRequisicao()
+        token = _medicao.set(medicao)
+        metodo = scope["method"]
+        status = 500   # se a aplicação falhar antes de responder
+        recebidos = enviados = 0
+        inicio = perf_counter()
+
+        async def receber():
+            nonlocal recebidos
+            mensagem = await receive()
+            if mensagem["type"] == "http.request":
+                recebidos += len(mensagem.get("body", b""))
+            return mensagem
+
+        async def enviar(mensagem):
+            nonlocal status, enviados
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                timing = medicao.server_timing(perf_counter() - inicio).encode("latin-1")
+                mensagem = {**mensagem, "headers": [*mensagem.get("headers", []), (b"server-timing", timing)]}
+            elif mensagem["type"] == "http.response.body":
+                enviados += len(mensagem.get("body", b""))
+            await send(mensagem)
+
+        em_andamento.inc(metodo)
+        try:
+            await self.app(scope, receber, enviar)
+        finally:
+            duracao = perf_counter() - inicio
+            em_andamento.dec(metodo)
+            _medicao.reset(token)
+            rota = _rota(scope)
+            requisicoes.inc(metodo, rota, str(status))
+            latencia.observar(duracao, metodo, rota)
+            tamanho_requisicao.observar(recebidos, metodo, rota)
+            tamanho_resposta.observar(enviados, metodo, rota)
+            consultas_por_requisicao.observar(medicao.consultas, metodo, rota)
+            tempo_db_por_requisicao.observar(medicao.tempo_db, metodo, rota)
@@ -1,7 +1,5 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, ForeignKey
-from sqlalchemy.orm import declarative_base
-
-db = create_engine("sqlite:///banco.db") # conexão com o db
+from sqlalchemy import func, Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Index
+from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base() # base do db
 
@@ -10,7 +8,7 @@ class Usuario(Base):
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
     nome = Column("nome", String)
-    email = Column("email", String, nullable=False)
+    email = Column("email", String, nullable=False, unique=True, index=True)
     senha = Column("senha", String)
     admin = Column("admin", Boolean, default=False)
 
@@ -24,7 +22,7 @@ class Evento(Base):
     __tablename__= "eventos"
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
-    nome = Column("nome", String, nullable=False)
+    nome = Column("nome", String, nullable=False, unique=True, index=True)
     sigla = Column("sigla", String)
     descricao = Column("descricao", String)
     site = Column("site", String)
@@ -37,8 +35,12 @@ class Evento(Base):
         self.site = site
         self.entidade_promotora = entidade_promotora
 
+# Buscas por nome sem diferenciar maiúsculas: func.lower(Evento.nome) == func.lower(nome)
+Index('ix_eventos_nome_lower', func.lower(Evento.nome))
+
 class EdicaoEvento(Base):
     __tablename__= "edicoes"
+    __table_args__ = (Index('ix_edicoes_id_evento_ano', 'id_evento', 'ano'),)
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
     ano = Column("ano", Integer, nullable=False)
@@ -52,6 +54,8 @@ class EdicaoEvento(Base):
 
 class Artigo(Base):
     __tablename__ = 'artigos'
+    # Duplicidade (titulo, id_edicao) garantida pelo banco e listagem por edição
+    __table_args__ = (Index('ix_artigos_id_edicao_titulo', 'id_edicao', 'titulo', unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     titulo = Column(String, index=True, nullable=True)
@@ -68,9 +72,13 @@ class Artigo(Base):
     # Local (localização/venue) opcional do artigo na edição
     location = Column(String, nullable=True)
     # ligação para edição (id da tabela edicoes)
-    id_edicao = Column(Integer, nullable=True)
+    id_edicao = Column(Integer, ForeignKey("edicoes.id", name="fk_artigos_id_edicao_edicoes"), nullable=True)
+    # blob do PDF no armazenamento endereçado por conteúdo (tabela pdf_blobs)
+    sha256_pdf = Column(String, ForeignKey("pdf_blobs.sha256"), nullable=True, index=True)
+    # autores normalizados (tabela autores via artigo_autor), na ordem em que aparecem em 'autores'
+    autorias = relationship("ArtigoAutor", order_by="ArtigoAutor.posicao", cascade="all, delete-orphan")
 
-    def __init__(self, titulo: str, autores: str, nome_evento: str, ano: int = None, pagina_inicial: int = None, pagina_final: int = None, caminho_pdf: str = None, booktitle: str = None, publisher: str = None, location: str = None, id_edicao: int = None):
+    def __init__(self, titulo: str, autores: str, nome_evento: str, ano: int = None, pagina_inicial: int = None, pagina_final: int = None, caminho_pdf: str = None, booktitle: str = None, publisher: str = None, location: str = None, id_edicao: int = None, sha256_pdf: str = None):
         self.titulo = titulo
         self.autores = autores
         self.nome_evento = nome_evento
@@ -82,14 +90,156 @@ class Artigo(Base):
         self.publisher = publisher
         self.location = location
         self.id_edicao = id_edicao
+        self.sha256_pdf = sha256_pdf
+
+class PdfBlob(Base):
+    __tablename__ = 'pdf_blobs'
+
+    # Conteúdo identificado pelo SHA-256; cada arquivo é gravado uma única vez
+    sha256 = Column(String, primary_key=True)
+    caminho = Column(String, nullable=False)
+    tamanho = Column(Integer, nullable=False)
+    # quantos artigos apontam para este blob; o arquivo é apagado ao chegar a zero
+    referencias = Column(Integer, nullable=False, default=0)
+    criado_em = Column(DateTime, nullable=False)
+
+    def __init__(self, sha256, caminho, tamanho, criado_em, referencias=0):
+        self.sha256 = sha256
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self.criado_em = criado_em
+        self.referencias = referencias
+
+class Autor(Base):
+    __tablename__ = 'autores'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    nome = Column(String, nullable=False)
+    # nome normalizado usado nas buscas (ex: 'marco-tulio-valente'), ver autores.slug_autor
+    slug = Column(String, nullable=False, unique=True, index=True)
+
+    def __init__(self, nome, slug):
+        self.nome = nome
+        self.slug = slug
+
+class ArtigoAutor(Base):
+    __tablename__ = 'artigo_autor'
+
+    id_artigo = Column(Integer, ForeignKey("artigos.id", ondelete="CASCADE"), primary_key=True)
+    id_autor = Column(Integer, ForeignKey("autores.id"), primary_key=True, index=True)
+    posicao = Column(Integer, nullable=False, default=0)
+
+    autor = relationship("Autor")
+
+    def __init__(self, autor, posicao=0):
+        self.autor = autor
+        self.posicao = posicao
 
 class Subscriber(Base):
     __tablename__ = 'subscribers'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     nome = Column(String, nullable=False)
-    email = Column(String, nullable=False, unique=False)
+    email = Column(String, nullable=False, unique=True, index=True)
+    # nome normalizado igual a autores.slug, usado para casar assinantes com autores
+    slug = Column(String, nullable=True, index=True)
 
-    def __init__(self, nome, email):
+    def __init__(self, nome, email, slug=None):
         self.nome = nome
-        self.email = email
\ No newline at end of file
+        self.email = email
+        self.slug = slug
+
+class NotificacaoOutbox(Base):
+    __tablename__ = 'notificacoes_outbox'
+    __table_args__ = (Index('ix_notificacoes_outbox_status_proxima', 'status', 'proxima_tentativa'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    email = Column(String, nullable=False)
+    assunto = Column(String, nullable=False)
+    corpo = Column(String, nullable=False)
+    # pendente -> enviando -> enviado | falhou (após esgotar as tentativas)
+    status = Column(String, nullable=False, default='pendente')
+    tentativas = Column(Integer, nullable=False, default=0)
+    proxima_tentativa = Column(DateTime, nullable=False)
+    ultimo_erro = Column(String, nullable=True)
+    criado_em = Column(DateTime, nullable=False)
+    enviado_em = Column(DateTime, nullable=True)
+
+    def __init__(self, email, assunto, corpo, criado_em):
+        self.email = email
+        self.assunto = assunto
+        self.corpo = corpo
+        self.status = 'pendente'
+        self.tentativas = 0
+        self.criado_em = criado_em
+        self.proxima_tentativa = criado_em
+
+class VersaoTabela(Base):
+    __tablename__ = 'versoes_tabelas'
+
+    # Uma linha por tabela pública (artigos, eventos, edicoes), incrementada pelas
+    # rotas de escrita na mesma transação; base do ETag/Last-Modified (ver versoes.py)
+    tabela = Column(String, primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+    atualizado_em = Column(DateTime, nullable=False)
+
+    def __init__(self, tabela, atualizado_em, versao=0):
+        self.tabela = tabela
+        self.atualizado_em = atualizado_em
+        self.versao = versao
+
+class ImportacaoBibtex(Base):
+    __tablename__ = 'importacoes'
+    __table_args__ = (Index('ix_importacoes_status', 'status', 'id'),)
+
+    # Job de importação BibTeX processado pelo worker de importacoes.py
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # pendente -> processando -> concluida | falhou
+    status = Column(String, nullable=False, default='pendente')
+    id_usuario = Column(Integer, ForeignKey('usuarios.id'), nullable=True)
+    arquivo = Column(String, nullable=True)   # nome do .bib enviado
+    total_entradas = Column(Integer, nullable=True)   # conhecido quando o processamento termina
+    # Entradas do BibTeX já gravadas (commit por bloco): ponto de retomada
+    processadas = Column(Integer, nullable=False, default=0)
+    # Progresso enquanto o total não é conhecido: bytes do .bib já lidos / tamanho do .bib
+    tamanho_bibtex = Column(Integer, nullable=True)
+    bytes_lidos = Column(Integer, nullable=False, default=0)
+    cadastrados = Column(Integer, nullable=False, default=0)
+    pulados = Column(Integer, nullable=False, default=0)
+    notificacoes = Column(Integer, nullable=False, default=0)
+    erro = Column(String, nullable=True)
+    criado_em = Column(DateTime, nullable=False)
+    iniciado_em = Column(DateTime, nullable=True)
+    atualizado_em = Column(DateTime, nullable=False)
+    concluido_em = Column(DateTime, nullable=True)
+
+    def __init__(self, id_usuario, arquivo, criado_em):
+        self.status = 'pendente'
+        self.id_usuario = id_usuario
+        self.arquivo = arquivo
+        self.processadas = 0
+        self.bytes_lidos = 0
+        self.cadastrados = 0
+        self.pulados = 0
+        self.notificacoes = 0
+        self.criado_em = criado_em
+        self.atualizado_em = criado_em
+
+class ImportacaoPulado(Base):
+    __tablename__ = 'importacoes_pulados'
+    __table_args__ = (Index('ix_importacoes_pulados_importacao', 'id_importacao', 'indice'),)
+
+    # Relatório de entradas puladas, gravado no mesmo commit do bloco
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    id_importacao = Column(Integer, ForeignKey('importacoes.id', ondelete='CASCADE'), nullable=False)
+    indice = Column(Integer, nullable=False)   # posição da entrada no BibTeX (a partir de 0)
+    chave = Column(String, nullable=True)
+    titulo = Column(String, nullable=True)
+    motivo = Column(String, nullable=False)
+
+    def __init__(self, id_importacao, indice, chave, titulo, motivo):
+        self.id_importacao = id_importacao
+        self.indice = indice
+        self.chave = chave
+        self.titulo = titulo
+        self.motivo = motivo
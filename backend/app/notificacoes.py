@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import os
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from banco import db
+from diagnostico_consultas import escopo
+from models import NotificacaoOutbox
+
+logger = logging.getLogger(__name__)
+
+# Configuração do worker (variáveis de ambiente opcionais)
+CONCORRENCIA = int(os.getenv('NOTIFICACOES_CONCORRENCIA', '2'))       # conexões SMTP simultâneas
+TAMANHO_LOTE = int(os.getenv('NOTIFICACOES_LOTE', '50'))              # mensagens reservadas por rodada
+MAX_TENTATIVAS = int(os.getenv('NOTIFICACOES_MAX_TENTATIVAS', '5'))
+BACKOFF_BASE = float(os.getenv('NOTIFICACOES_BACKOFF_BASE', '30'))    # segundos; dobra a cada falha
+BACKOFF_MAX = float(os.getenv('NOTIFICACOES_BACKOFF_MAX', '3600'))
+INTERVALO_OCIOSO = float(os.getenv('NOTIFICACOES_INTERVALO', '5'))    # segundos entre verificações
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '10'))
+
+
+def _agora() -> datetime:
+    # O SQLite guarda DateTime sem fuso; usamos sempre UTC "naive"
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enfileirar_notificacao(session: Session, email: str, assunto: str, corpo: str) -> NotificacaoOutbox:
+    """
+    Grava a notificação no outbox, na mesma transação do chamador (sem commit).
+    O envio acontece depois, pelo WorkerNotificacoes.
+    """
+    notificacao = NotificacaoOutbox(email, assunto, corpo, _agora())
+    session.add(notificacao)
+    return notificacao
+
+
+class EntregadorSMTP:
+    """
+    Mantém uma conexão SMTP aberta e a reutiliza entre mensagens,
+    reconectando quando o servidor derruba a conexão.
+    Sem SMTP_HOST/SMTP_PORT configurados, apenas registra a mensagem no log (INFO).
+    """
+
+    def __init__(self):
+        self.host = os.getenv('SMTP_HOST')
+        self.port = int(os.getenv('SMTP_PORT')) if os.getenv('SMTP_PORT') else None
+        self.user = os.getenv('SMTP_USER')
+        self.senha = os.getenv('SMTP_PASS')
+        self.remetente = os.getenv('SMTP_FROM') or self.user or 'no-reply@example.com'
+        self._server: Optional[smtplib.SMTP] = None
+
+    def _conectar(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        if self.user and self.senha:
+            server.starttls()
+            server.login(self.user, self.senha)
+        return server
+
+    def enviar(self, email: str, assunto: str, corpo: str) -> None:
+        if not (self.host and self.port):
+            logger.info("[NOTIFY] Enviado email para %s: %s", email, assunto)
+            return
+
+        msg = EmailMessage()
+        msg['Subject'] = assunto
+        msg['From'] = self.remetente
+        msg['To'] = email
+        msg.set_content(corpo)
+
+        if self._server is None:
+            self._server = self._conectar()
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Conexão ociosa derrubada pelo servidor: reconecta e tenta uma vez
+            self._server = self._conectar()
+            self._server.send_message(msg)
+
+    def fechar(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+
+class WorkerNotificacoes:
+    """
+    Drena a tabela notificacoes_outbox em segundo plano.
+    Cada rodada reserva um lote de mensagens vencidas (status 'pendente'),
+    envia com até CONCORRENCIA conexões SMTP (uma por thread, reutilizada)
+    e grava o resultado: 'enviado', ou nova tentativa com backoff exponencial
+    até MAX_TENTATIVAS, quando passa a 'falhou'.
+    """
+
+    def __init__(self, engine=db, concorrencia: int = CONCORRENCIA):
+        self.Session = sessionmaker(bind=engine)
+        self.concorrencia = max(1, concorrencia)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._entregadores: List[EntregadorSMTP] = []
+        self._lock = threading.Lock()
+        self._tarefa: Optional[asyncio.Task] = None
+        self._acordar: Optional[asyncio.Event] = None
+
+    # --- acesso ao banco (síncrono, chamado via threadpool) ---
+
+    def _recuperar_reservas(self) -> None:
+        """Mensagens 'enviando' de uma execução interrompida voltam para a fila."""
+        with self.Session() as session:
+            session.query(NotificacaoOutbox).filter(NotificacaoOutbox.status == 'enviando').update(
+                {NotificacaoOutbox.status: 'pendente'}, synchronize_session=False)
+            session.commit()
+
+    def _reservar_lote(self) -> List[Tuple[int, str, str, str]]:
+        with self.Session() as session:
+            pendentes = (
+                session.query(NotificacaoOutbox)
+                .filter(NotificacaoOutbox.status == 'pendente', NotificacaoOutbox.proxima_tentativa <= _agora())
+                .order_by(NotificacaoOutbox.proxima_tentativa, NotificacaoOutbox.id)
+                .limit(TAMANHO_LOTE)
+                .all()
+            )
+            lote = [(n.id, n.email, n.assunto, n.corpo) for n in pendentes]
+            for n in pendentes:
+                n.status = 'enviando'
+            session.commit()
+            return lote
+
+    def _registrar_resultados(self, resultados: List[Tuple[int, Optional[str]]]) -> None:
+        agora = _agora()
+        with self.Session() as session:
+            # Uma consulta para a rodada inteira e um UPDATE em lote (executemany) por
+            # combinação de colunas: enviadas, novas tentativas e as que falharam de vez
+            ids = [id_notificacao for id_notificacao, _ in resultados]
+            tentativas_atuais = dict(session.query(NotificacaoOutbox.id, NotificacaoOutbox.tentativas)
+                                     .filter(NotificacaoOutbox.id.in_(ids)))
+            grupos: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for id_notificacao, erro in resultados:
+                if id_notificacao not in tentativas_atuais:
+                    continue
+                if erro is None:
+                    linha = {'id': id_notificacao, 'status': 'enviado', 'enviado_em': agora, 'ultimo_erro': None}
+                else:
+                    tentativas = tentativas_atuais[id_notificacao] + 1
+                    linha = {'id': id_notificacao, 'tentativas': tentativas, 'ultimo_erro': erro[:500]}
+                    if tentativas >= MAX_TENTATIVAS:
+                        linha['status'] = 'falhou'
+                    else:
+                        espera = min(BACKOFF_BASE * (2 ** (tentativas - 1)), BACKOFF_MAX)
+                        linha['status'] = 'pendente'
+                        linha['proxima_tentativa'] = agora + timedelta(seconds=espera)
+                grupos.setdefault(tuple(linha), []).append(linha)
+            for linhas in grupos.values():
+                session.execute(update(NotificacaoOutbox), linhas)
+            session.commit()
+
+    # --- envio (nas threads do executor) ---
+
+    def _entregador_da_thread(self) -> EntregadorSMTP:
+        entregador = getattr(self._local, 'entregador', None)
+        if entregador is None:
+            entregador = EntregadorSMTP()
+            self._local.entregador = entregador
+            with self._lock:
+                self._entregadores.append(entregador)
+        return entregador
+
+    def _entregar(self, item: Tuple[int, str, str, str]) -> Tuple[int, Optional[str]]:
+        id_notificacao, email, assunto, corpo = item
+        entregador = self._entregador_da_thread()
+        try:
+            entregador.enviar(email, assunto, corpo)
+            return id_notificacao, None
+        except Exception as e:
+            # Conexão em estado desconhecido: descarta para a próxima mensagem reconectar
+            entregador.fechar()
+            return id_notificacao, f"{type(e).__name__}: {e}"
+
+    # --- ciclo de vida ---
+
+    async def processar_lote(self) -> int:
+        """Processa uma rodada do outbox. Retorna quantas mensagens foram tentadas."""
+        lote = await run_in_threadpool(self._reservar_lote)
+        if not lote:
+            return 0
+        with escopo(f"notificações: rodada de {len(lote)} mensagem(ns)"):
+            loop = asyncio.get_running_loop()
+            resultados = await asyncio.gather(*[loop.run_in_executor(self._executor, self._entregar, item) for item in lote])
+            await run_in_threadpool(self._registrar_resultados, list(resultados))
+        return len(lote)
+
+    async def _executar(self) -> None:
+        await run_in_threadpool(self._recuperar_reservas)
+        while True:
+            try:
+                processadas = await self.processar_lote()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erro no worker de notificações")
+                processadas = 0
+            if processadas:
+                continue
+            self._acordar.clear()
+            try:
+                await asyncio.wait_for(self._acordar.wait(), timeout=INTERVALO_OCIOSO)
+            except asyncio.TimeoutError:
+                pass
+
+    def acordar(self) -> None:
+        """Avisa o worker que há mensagens novas (chamar após o commit)."""
+        if self._acordar is not None:
+            self._acordar.set()
+
+    def iniciar(self) -> None:
+        if self._tarefa is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.concorrencia, thread_name_prefix="smtp")
+        self._acordar = asyncio.Event()
+        self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        if self._tarefa is None:
+            return
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._tarefa = None
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        for entregador in self._entregadores:
+            entregador.fechar()
+        self._entregadores.clear()
+        self._local = threading.local()
+
+
+worker_notificacoes = WorkerNotificacoes()
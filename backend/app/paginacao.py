@@ -0,0 +1,96 @@
+import base64
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Paginação por chave (keyset): a próxima página começa depois da última chave
+# vista, em vez de OFFSET, então o custo não cresce com a profundidade.
+LIMITE_PADRAO = int(os.getenv("PAGINACAO_LIMITE_PADRAO", "50"))
+LIMITE_MAXIMO = int(os.getenv("PAGINACAO_LIMITE_MAXIMO", "200"))
+
+# O corpo das respostas não muda (o frontend consome as listas diretamente);
+# os metadados da página vão em cabeçalhos
+HEADER_PROXIMO_CURSOR = "X-Proximo-Cursor"
+HEADER_TOTAL = "X-Total-Count"
+
+
+class ParametrosPagina:
+    """Parâmetros de paginação comuns às rotas de listagem (usar com Depends())."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description=f"Cursor opaco devolvido no cabeçalho {HEADER_PROXIMO_CURSOR} da página anterior"),
+        limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO, description="Itens por página"),
+        total: bool = Query(False, description=f"Se verdadeiro, devolve a contagem total no cabeçalho {HEADER_TOTAL} (custa uma query extra)"),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.total = total
+
+
+def codificar_cursor(valores: List[Any]) -> str:
+    bruto = json.dumps(valores, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, quantidade: int) -> List[Any]:
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(bruto)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    # Os valores viram parâmetros da query: listas e objetos quebrariam no driver (500)
+    if (not isinstance(valores, list) or len(valores) != quantidade
+            or not all(v is None or isinstance(v, (str, int, float)) for v in valores)):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return valores
+
+
+async def paginar(session: AsyncSession, stmt: Select, chaves: List[Any], pagina: ParametrosPagina,
+                  decrescente: bool = False, tuplas: bool = False) -> Tuple[List[Any], Optional[str], Optional[int]]:
+    """
+    Executa `stmt` (um select já filtrado, sem ORDER BY) uma página por vez.
+    `chaves` são as expressões de ordenação; a última deve ser única (ex: o id)
+    para a ordem ser estável. Todas seguem a mesma direção (`decrescente`).
+    Retorna (itens, proximo_cursor ou None, total ou None). Cada item é a
+    primeira coluna do select quando ele tem uma só (ex: uma entidade ORM),
+    ou a linha com as colunas originais; com `tuplas=True` é sempre a linha
+    (seleção de colunas variável, ex: serializacao.campos_artigo).
+    """
+    n_colunas = len(stmt.column_descriptions)
+
+    total = None
+    if pagina.total:
+        total = await session.scalar(select(func.count()).select_from(stmt.subquery()))
+
+    paginado = stmt.add_columns(*chaves)
+    if pagina.cursor:
+        ultimo = tuple_(*decodificar_cursor(pagina.cursor, len(chaves)))
+        paginado = paginado.where(tuple_(*chaves) < ultimo if decrescente else tuple_(*chaves) > ultimo)
+    paginado = paginado.order_by(*[c.desc() if decrescente else c for c in chaves]).limit(pagina.limit + 1)
+
+    linhas = (await session.execute(paginado)).all()
+    proximo = None
+    if len(linhas) > pagina.limit:
+        linhas = linhas[:pagina.limit]
+        proximo = codificar_cursor(list(linhas[-1][n_colunas:]))
+    itens = [linha[0] if n_colunas == 1 and not tuplas else linha[:n_colunas] for linha in linhas]
+    return itens, proximo, total
+
+
+def headers_paginacao(proximo: Optional[str], total: Optional[int]) -> Dict[str, str]:
+    """Cabeçalhos da página, para rotas que montam a própria Response (ex: cache_respostas)."""
+    headers = {}
+    if proximo:
+        headers[HEADER_PROXIMO_CURSOR] = proximo
+    if total is not None:
+        headers[HEADER_TOTAL] = str(total)
+    return headers
+
+
+def aplicar_headers(response: Response, proximo: Optional[str], total: Optional[int]) -> None:
+    response.headers.update(headers_paginacao(proximo, total))
@@ -0,0 +1,72 @@
+"""
+Checagem de regressão dos índices: roda EXPLAIN QUERY PLAN nas consultas mais
+frequentes da API e acusa qualquer varredura completa de tabela (SCAN).
+
+Uso, na pasta backend/app e com o banco migrado (alembic upgrade head):
+    python plano_consultas.py
+Sai com código 1 se alguma consulta deixar de usar índice. O mesmo vale como
+teste (tests/test_plano_consultas.py, num banco temporário): python -m pytest
+"""
+import sys
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+
+from banco import db
+from models import Artigo, EdicaoEvento, Evento, Subscriber, Usuario
+
+# (descrição, consulta) no mesmo formato usado pelas rotas
+CONSULTAS_CRITICAS = [
+    ("evento por nome (criar/remover evento, validação de artigos)",
+     select(Evento).where(Evento.nome == "SBES")),
+    ("eventos por lista de nomes (importação em lote)",
+     select(Evento).where(Evento.nome.in_(["SBES", "SBQS"])).order_by(Evento.id)),
+    ("evento por nome sem diferenciar maiúsculas (páginas de evento/edição)",
+     select(Evento).where(func.lower(Evento.nome) == func.lower("sbes"))),
+    ("edição por (evento, ano)",
+     select(EdicaoEvento).where(EdicaoEvento.id_evento == 1, EdicaoEvento.ano == 2024)),
+    ("edições por lista de eventos (importação em lote)",
+     select(EdicaoEvento).where(EdicaoEvento.id_evento.in_([1, 2])).order_by(EdicaoEvento.id)),
+    ("duplicidade de artigo por (titulo, edição)",
+     select(Artigo.titulo, Artigo.id_edicao).where(
+         Artigo.id_edicao.in_([1, 2]), Artigo.titulo.in_(["Um titulo", "Outro titulo"]))),
+    ("artigos de uma edição",
+     select(Artigo).where(Artigo.id_edicao == 1).order_by(Artigo.id)),
+    ("assinante por email",
+     select(Subscriber).where(Subscriber.email == "a@b.com")),
+    ("usuário por email (login)",
+     select(Usuario).where(Usuario.email == "a@b.com")),
+]
+
+
+def plano(conexao: Connection, consulta) -> List[str]:
+    """Linhas 'detail' do EXPLAIN QUERY PLAN da consulta (valores embutidos no SQL)."""
+    sql = str(consulta.compile(dialect=conexao.dialect,
+                               compile_kwargs={"literal_binds": True, "render_postcompile": True}))
+    return [linha[3] for linha in conexao.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+
+def varreduras_completas(detalhes: List[str]) -> List[str]:
+    """SCAN sem índice; a tabela virtual do FTS tem seu próprio índice e é ignorada."""
+    return [d for d in detalhes if d.startswith("SCAN ") and "VIRTUAL TABLE" not in d]
+
+
+def verificar_indices(engine=db) -> Dict[str, Tuple[bool, List[str]]]:
+    """Retorna {descrição: (usa_indice, linhas_do_plano)} para cada consulta crítica."""
+    resultado = {}
+    with engine.connect() as conexao:
+        for descricao, consulta in CONSULTAS_CRITICAS:
+            detalhes = plano(conexao, consulta)
+            resultado[descricao] = (not varreduras_completas(detalhes), detalhes)
+    return resultado
+
+
+if __name__ == "__main__":
+    falhas = 0
+    for descricao, (ok, detalhes) in verificar_indices().items():
+        print(f"[{'OK' if ok else 'SCAN'}] {descricao}")
+        for d in detalhes:
+            print(f"       {d}")
+        falhas += not ok
+    sys.exit(1 if falhas else 0)
@@ -1,213 +1,194 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from fastapi import Form
-from schemas import ArtigoSchema, ResponseArtigoSchema
-from dependencies import pegar_sessao, verificar_token
-from models import Artigo, Usuario, Subscriber, Evento, EdicaoEvento
+from schemas import ArtigoSchema, ResponseArtigoSchema, LoteArtigosSchema, OperacaoArtigoSchema
+from dependencies import pegar_sessao, pegar_sessao_leitura, verificar_token
+from models import Artigo, Usuario, Autor, ArtigoAutor, PdfBlob, ImportacaoBibtex, ImportacaoPulado
 from typing import List, Dict, Any, Tuple, Optional 
-import smtplib
 import os
-from email.message import EmailMessage
 from starlette.concurrency import run_in_threadpool # Import necessário para assincronicidade
-from utils import parse_bibtex_to_artigo_schema
-import shutil # Necessário para operações de arquivo
+from importacoes import descrever_importacao, gravar_arquivos, nova_importacao, remover_arquivos, worker_importacoes
+from busca import CAMPOS_FTS, montar_consulta_fts, filtrar_por_fts, rank_bm25
+from autores import separar_autores, slug_autor, vincular_autores, autores_por_slug
+from notificacoes import worker_notificacoes
+from cache_http import http_date, requisicao_nao_modificada
+from paginacao import ParametrosPagina, paginar, headers_paginacao
+from cache_respostas import cache_respostas, TAG_ARTIGOS, tag_artigo, tag_autor, tag_edicao
+from versoes import ler_versoes, registrar_escrita, TABELA_ARTIGOS
+from serializacao import COLUNAS_ARTIGO, RespostaJSON, campos_artigo, colunas_artigo, linhas_para_dicts
+from armazenamento import BlobSalvo, salvar_blob, registrar_referencias, liberar_referencia, remover_se_orfao
+from cadastro_artigos import (inserir_artigos_em_lote, notificar_subscribers, notificar_subscribers_em_lote,
+                              tags_autores, validar_artigos_em_lote)
 import zipfile 
-import tempfile
 
 artigo_router = APIRouter(prefix="/artigo", tags=["artigo"])
 
-# Diretório base onde os PDFs serão salvos
-# ATENÇÃO: É recomendável usar variáveis de ambiente para o caminho em uma aplicação real.
-PDF_UPLOAD_DIR = "pdfs"
-os.makedirs(PDF_UPLOAD_DIR, exist_ok=True)
-
-
-# FUNÇÃO AUXILIAR: Lógica de Salvamento de PDF (Síncrona)
-def _salvar_pdf_sincrono_path(source_path: str, filename: str) -> str:
-    """
-    Salva ou move um arquivo do source_path para o diretório de uploads.
-    Retorna o caminho completo do arquivo salvo.
-    """
-    final_path = os.path.join(PDF_UPLOAD_DIR, filename)
-    try:
-        # Copia o arquivo para a pasta de uploads
-        shutil.copy(source_path, final_path)
-        return final_path
-    except Exception as e:
-        raise RuntimeError(f"Falha ao salvar o arquivo no disco: {e}")
-
 # FUNÇÃO AUXILIAR: Lógica de Salvamento de PDF (Síncrona)
-def _salvar_pdf_sincrono_file(upload_file: UploadFile, filename: str) -> str:
+def _salvar_pdf_sincrono_file(upload_file: UploadFile) -> BlobSalvo:
     """
-    Salva o conteúdo de UploadFile em disco de forma síncrona.
-    Retorna o caminho completo do arquivo salvo.
+    Salva o conteúdo de UploadFile no armazenamento endereçado por conteúdo.
+    Retorna o BlobSalvo (sha256, caminho, tamanho, novo).
     """
-    file_path = os.path.join(PDF_UPLOAD_DIR, filename)
     try:
-        # Usa 'shutil.copyfileobj' para lidar com uploads grandes de forma eficiente
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
-        return file_path
+        return salvar_blob(upload_file.file)
     except Exception as e:
-        # Garante que o buffer do arquivo seja 'rewind' ou tratado se necessário
-        # Mas para o salvamento, o erro é mais importante
         print(f"Erro ao salvar PDF: {e}")
         # Levantar exceção aqui fará o run_in_threadpool propagá-la
         raise RuntimeError(f"Falha ao salvar o arquivo no disco: {e}")
 
-# FUNÇÃO AUXILIAR (ADICIONADA): Descompacta e Mapeia PDFs
-# FUNÇÃO AUXILIAR (ATUALIZADA): Descompacta e Mapeia PDFs
-def _extrair_zip_e_mapear_pdfs(zip_file_content: bytes) -> Tuple[Dict[str, str], str]:
-    """
-    Descompacta o conteúdo do ZIP em um diretório temporário.
-    Retorna uma tupla: (dicionário {nome_pdf: caminho_temporario}, caminho_diretório_temporário)
-    O chamador é responsável por limpar o diretório temporário.
-    """
-    file_map: Dict[str, str] = {}
-    temp_dir = tempfile.mkdtemp() # <--- O diretório temporário é criado aqui
-    
-    # Salva o arquivo ZIP em um local temporário para poder abri-lo
-    zip_temp_path = os.path.join(temp_dir, "temp.zip")
-    with open(zip_temp_path, "wb") as f:
-        f.write(zip_file_content)
-        
-    try:
-        with zipfile.ZipFile(zip_temp_path, 'r') as zip_ref:
-            for member in zip_ref.namelist():
-                if member.lower().endswith('.pdf'):
-                    base_filename = os.path.basename(member)
-                    zip_ref.extract(member, temp_dir)
-                    
-                    # Garantimos o caminho completo dentro da extração
-                    extracted_path = os.path.join(temp_dir, member)
-                    
-                    file_map[base_filename] = extracted_path
-                    
-        return file_map, temp_dir # <--- RETORNA O CAMINHO TEMP
-    except Exception as e:
-        # Se falhar durante a extração, tentamos limpar e propagamos o erro
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-        raise RuntimeError(f"Erro ao processar arquivo ZIP: {e}")
-    finally:
-        # Remove o arquivo ZIP temporário, mas mantém a pasta temp_dir
-        if os.path.exists(zip_temp_path):
-            os.remove(zip_temp_path)
-
-# FUNÇÃO AUXILIAR: Lógica de Notificação (mantida)
-def _notificar_subscribers(session: Session, artigo_schema: ArtigoSchema):
-    # ... (Lógica de notificação permanece a mesma)
-    """
-    Notifica subscribers cujo nome case exatamente com algum autor do artigo.
-    Mantida síncrona, deve ser chamada via threadpool se for muito lenta.
-    """
-    messages = []
-    try:
-        subscribers = session.query(Subscriber).all()
-        artigo_autores = artigo_schema.autores
-
-        def normalize(name: str) -> str:
-            return ' '.join(name.strip().split())
-
-        autores_list = [p.strip() for p in (artigo_autores or '').split(' and ') if p.strip()]
-
-        matched = []
-        for sub in subscribers:
-            sub_name = normalize(sub.nome)
-            for a in autores_list:
-                a_norm = normalize(a)
-                if a_norm.lower() == sub_name.lower():
-                    matched.append(sub)
-                    break
-
-        if matched:
-            smtp_host = os.getenv('SMTP_HOST')
-            smtp_port = int(os.getenv('SMTP_PORT')) if os.getenv('SMTP_PORT') else None
-            smtp_user = os.getenv('SMTP_USER')
-            smtp_pass = os.getenv('SMTP_PASS')
-            subject = f"Novo artigo: {artigo_schema.titulo}"
-            body = (
-                f"Foi publicado um novo artigo '{artigo_schema.titulo}' no evento {artigo_schema.nome_evento}.\n\n"
-                f"Autores: {artigo_schema.autores}\n"
-                f"Ano: {artigo_schema.ano or 'N/A'}\n"
-                f"Local: {artigo_schema.location or 'N/A'}\n"
-                f"Páginas: {artigo_schema.pagina_inicial or 'N/A'}-{artigo_schema.pagina_final or 'N/A'}\n"
-                f"PDF: {artigo_schema.caminho_pdf or 'N/A'}"
-            )
-            if smtp_host and smtp_port:
-                msg = EmailMessage()
-                msg['Subject'] = subject
-                msg['From'] = smtp_user or 'no-reply@example.com'
-                msg.set_content(body)
-                with smtplib.SMTP(smtp_host, smtp_port) as server:
-                    if smtp_user and smtp_pass:
-                        server.starttls()
-                        server.login(smtp_user, smtp_pass)
-                    for u in matched:
-                        msg['To'] = u.email
-                        server.send_message(msg)
-                        messages.append(f"Enviado email para {u.email} sobre o novo artigo criado {artigo_schema.titulo}")
-            else:
-                for u in matched:
-                    # Log/print fallback and also record message to return
-                    msg_text = f"Enviado email para {u.email} sobre o novo artigo criado: {artigo_schema.titulo}"
-                    print(f"[NOTIFY] {msg_text}")
-                    messages.append(msg_text)
-    except Exception as e:
-        print(f"Erro ao notificar subscribers: {e}")
-        # Esta função não deve levantar exceção para não quebrar a transação de BD
-
-    return messages
+# FUNÇÃO AUXILIAR: Remove PDF salvo antes do armazenamento por conteúdo
+def _remover_pdf_legado(caminho: Optional[str]) -> None:
+    """Artigos antigos (sem sha256_pdf) têm um arquivo próprio, que pode ser apagado direto."""
+    if caminho and os.path.exists(caminho):
+        try:
+            os.remove(caminho)
+        except Exception as e:
+            print(f"AVISO: Falha ao remover arquivo PDF {caminho}: {e}")
 
-# FUNÇÃO CORE: Lógica de Validação e Inserção (mantida)
-def _cadastrar_artigo_core(session: Session, artigo_schema: ArtigoSchema) -> str:
-    # ... (Lógica core de cadastro permanece a mesma)
+# FUNÇÃO CORE: Lógica de Validação e Inserção de um artigo
+def _cadastrar_artigo_core(session: Session, artigo_schema: ArtigoSchema, blob: Optional[BlobSalvo] = None) -> Artigo:
     """
     Realiza a validação de evento/edição, verifica duplicidade e adiciona 
     um ArtigoSchema à sessão do banco de dados (sem commit).
-    Retorna o título do artigo cadastrado.
+    Se `blob` for informado, o artigo passa a referenciar esse PDF.
+    Retorna o artigo cadastrado (ainda sem id).
     """
-    # 1. Verifica se o evento existe
-    evento = session.query(Evento).filter(Evento.nome == artigo_schema.nome_evento).first()
-    if not evento:
-        raise HTTPException(status_code=400, detail=f"Evento '{artigo_schema.nome_evento}' não encontrado")
-
-    edicao = None
-    
-    if artigo_schema.ano:
-        # Se o ANO for fornecido no ArtigoSchema, compara o ID do Evento E o Ano.
-        edicao = session.query(EdicaoEvento).filter(
-            (EdicaoEvento.id_evento == evento.id) & (EdicaoEvento.ano == artigo_schema.ano)
-        ).first()
-        
-        # Se o ano é fornecido, mas a edição específica não existe, levanta erro.
-        if not edicao:
-            raise HTTPException(status_code=400, detail=f"Não existe edição do evento '{evento.nome}' no ano {artigo_schema.ano}")
-            
-    else:
-        # Se o ANO NÃO for fornecido, compara APENAS o ID do Evento.
-        edicao = session.query(EdicaoEvento).filter(
-            EdicaoEvento.id_evento == evento.id
-        ).first()
-
-        # Se não houver ANO e nenhuma edição for encontrada para o evento, levanta erro.
-        if not edicao:
-            raise HTTPException(status_code=400, detail=f"Não existe edição cadastrada para o evento '{evento.nome}' (ano não especificado).")
-            
-    
-    # Verifica duplicidade pelo par (titulo, id_edicao)
-    artigo = session.query(Artigo).filter((Artigo.titulo == artigo_schema.titulo) & (Artigo.id_edicao == edicao.id)).first()
-    if artigo:
-        raise HTTPException(status_code=400, detail=f"Artigo com título '{artigo_schema.titulo}' já cadastrado na edição {edicao.id}.")
+    validos, erros = validar_artigos_em_lote(session, [artigo_schema])
+    if 0 in erros:
+        raise HTTPException(status_code=400, detail=erros[0])
 
-    # 4. Criação do novo artigo e add à session
     artigo_data = artigo_schema.model_dump()
-    artigo_data['id_edicao'] = edicao.id
+    artigo_data['id_edicao'] = validos[0]
     
     # Instancia o modelo Artigo
     novo_artigo = Artigo(**artigo_data)
+    if blob:
+        novo_artigo.sha256_pdf = blob.sha256
+        registrar_referencias(session, [blob])
     session.add(novo_artigo)
-    return novo_artigo.titulo
+    vincular_autores(session, novo_artigo)
+    return novo_artigo
+
+# Campos que a edição substitui (os mesmos de /artigo/artigo/editar)
+CAMPOS_EDITAVEIS = ('titulo', 'autores', 'nome_evento', 'ano', 'pagina_inicial', 'pagina_final',
+                    'booktitle', 'publisher', 'location')
+
+# FUNÇÃO CORE: Lote de operações (criar/editar/remover) numa única transação
+def _aplicar_lote(session: Session, operacoes: List[OperacaoArtigoSchema], tudo_ou_nada: bool) -> Dict[str, Any]:
+    """
+    Valida todas as operações com leituras em lote (artigos alvo, PDFs
+    referenciados e evento/edição/duplicidade dos novos artigos) e aplica as
+    válidas, sem commit. Com `tudo_ou_nada`, uma operação inválida impede todas.
+    Criações e edições passam pela mesma validação de evento/edição: a edição
+    volta a resolver id_edicao a partir de nome_evento/ano. A duplicidade de
+    título considera o banco antes do lote (remover e recriar o mesmo título,
+    ou trocar títulos entre dois artigos, num só lote é recusado).
+    Retorna os resultados por operação e o que a rota faz depois do commit
+    (tags do cache, PDFs liberados e notificações).
+    """
+    resultados = [{'indice': i, 'op': op.op, 'id': op.id, 'status': 'ok'} for i, op in enumerate(operacoes)]
+
+    def rejeitar(i: int, motivo: str) -> None:
+        resultados[i].update(status='erro', erro=motivo)
+
+    # 1. Leituras em lote
+    ids = {op.id for op in operacoes if op.op != 'criar'}
+    artigos = {a.id: a for a in session.query(Artigo).filter(Artigo.id.in_(ids))
+               .options(selectinload(Artigo.autorias).selectinload(ArtigoAutor.autor)).all()} if ids else {}
+    # Só as colunas: um PdfBlob no identity map ficaria desatualizado depois do upsert de registrar_referencias
+    shas = {op.sha256_pdf for op in operacoes if op.sha256_pdf and op.op != 'remover'}
+    blobs = {sha: BlobSalvo(sha, caminho, tamanho, False) for sha, caminho, tamanho in
+             session.query(PdfBlob.sha256, PdfBlob.caminho, PdfBlob.tamanho).filter(PdfBlob.sha256.in_(shas))} if shas else {}
+
+    # 2. Validação, na ordem do lote
+    removidos = set()
+    for i, op in enumerate(operacoes):
+        if op.op != 'remover' and op.sha256_pdf and op.sha256_pdf not in blobs:
+            rejeitar(i, f"PDF '{op.sha256_pdf}' não encontrado no armazenamento")
+        elif op.op == 'criar':
+            continue
+        elif op.id not in artigos:
+            rejeitar(i, "Não existe artigo com esse ID")
+        elif op.id in removidos:
+            rejeitar(i, "Artigo removido por uma operação anterior do lote")
+        elif op.op == 'remover':
+            removidos.add(op.id)
+    # Edições de um artigo removido mais adiante no lote não têm efeito e não são validadas
+    com_metadados = [i for i, op in enumerate(operacoes) if resultados[i]['status'] == 'ok'
+                     and (op.op == 'criar' or (op.op == 'editar' and op.id not in removidos))]
+    validos, erros = validar_artigos_em_lote(session, [operacoes[i].artigo for i in com_metadados],
+                                             [operacoes[i].id if operacoes[i].op == 'editar' else None
+                                              for i in com_metadados])
+    for pos, motivo in erros.items():
+        rejeitar(com_metadados[pos], motivo)
+    edicao_por_operacao = {com_metadados[pos]: id_edicao for pos, id_edicao in validos.items()}
+
+    rejeitadas = sum(r['status'] == 'erro' for r in resultados)
+    efeitos: Dict[str, Any] = {'resultados': resultados, 'aplicadas': 0, 'rejeitadas': rejeitadas, 'tags': set(),
+                               'shas_liberados': [], 'caminhos_legados': [], 'notificacoes': []}
+    if tudo_ou_nada and rejeitadas:
+        for r in resultados:
+            if r['status'] == 'ok':
+                r['status'] = 'nao_aplicada'
+        return efeitos
+
+    # 3. Criações: um executemany, como na importação BibTeX
+    tags = efeitos['tags']
+    novos = [(i, edicao_por_operacao[i]) for i, op in enumerate(operacoes)
+             if op.op == 'criar' and i in edicao_por_operacao]
+    schemas_novos = []
+    for i, _ in novos:
+        artigo_schema = operacoes[i].artigo
+        blob = blobs.get(operacoes[i].sha256_pdf)
+        artigo_schema.caminho_pdf = blob.caminho if blob else None
+        schemas_novos.append(artigo_schema)
+    ids_novos = inserir_artigos_em_lote(session, schemas_novos, [e for _, e in novos],
+                                         [blobs.get(operacoes[i].sha256_pdf) for i, _ in novos])
+    for (i, id_edicao), id_artigo, artigo_schema in zip(novos, ids_novos, schemas_novos):
+        resultados[i]['id'] = id_artigo
+        tags.update([tag_edicao(id_edicao), *tags_autores(artigo_schema.autores)])
+
+    # 4. Edições e remoções. As referências novas entram antes de liberar as
+    # antigas, para um PDF trocado de artigo no mesmo lote não chegar a zero.
+    aplicaveis = [(i, op) for i, op in enumerate(operacoes) if op.op != 'criar' and resultados[i]['status'] == 'ok']
+    autores_carregados = autores_por_slug(session, {slug_autor(nome) for _, op in aplicaveis if op.op == 'editar'
+                                                    for nome in separar_autores(op.artigo.autores)})
+    referencias: List[BlobSalvo] = []
+    liberar: List[Tuple[Optional[str], Optional[str]]] = []   # (sha256, caminho) dos PDFs que saíram
+    for i, op in aplicaveis:
+        artigo = artigos[op.id]
+        tags.update([tag_artigo(artigo.id), tag_edicao(artigo.id_edicao), *tags_autores(artigo.autores)])
+        if op.op == 'remover':
+            liberar.append((artigo.sha256_pdf, artigo.caminho_pdf))
+            session.delete(artigo)
+            continue
+        if op.id in removidos:
+            continue   # removido mais adiante no lote: a edição não teria efeito
+        for campo in CAMPOS_EDITAVEIS:
+            setattr(artigo, campo, getattr(op.artigo, campo))
+        artigo.id_edicao = edicao_por_operacao[i]
+        vincular_autores(session, artigo, autores_carregados)
+        tags.update([tag_edicao(artigo.id_edicao), *tags_autores(artigo.autores)])
+        if op.sha256_pdf and op.sha256_pdf != artigo.sha256_pdf:
+            referencias.append(blobs[op.sha256_pdf])
+            liberar.append((artigo.sha256_pdf, artigo.caminho_pdf))
+            artigo.sha256_pdf = op.sha256_pdf
+            artigo.caminho_pdf = blobs[op.sha256_pdf].caminho
+    registrar_referencias(session, referencias)
+    for sha, caminho in liberar:
+        if sha:
+            liberar_referencia(session, sha)
+            efeitos['shas_liberados'].append(sha)
+        elif caminho:
+            efeitos['caminhos_legados'].append(caminho)
+
+    efeitos['aplicadas'] = len(novos) + len(aplicaveis)
+    efeitos['notificacoes'] = notificar_subscribers_em_lote(session, schemas_novos)
+    return efeitos
 
 # =========================================================================
 # ENDPOINTS (ASSÍNCRONOS)
@@ -234,7 +215,7 @@ async def criar_artigo(
     publisher: Optional[str] = Form(None),
     location: Optional[str] = Form(None),
     pdf_file: UploadFile = File(..., description="Arquivo PDF do artigo"),
-    session: Session = Depends(pegar_sessao),
+    session: AsyncSession = Depends(pegar_sessao),
     usuario: Usuario = Depends(verificar_token)
 ):
     """
@@ -244,10 +225,8 @@ async def criar_artigo(
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
     if pdf_file.content_type != 'application/pdf':
         raise HTTPException(status_code=400, detail="O arquivo deve ser um PDF (application/pdf).")
-    filename = f"{titulo.lower().replace(' ', '_')}_{pdf_file.filename}"
-    caminho_pdf_salvo = None
     try:
-        caminho_pdf_salvo = await run_in_threadpool(_salvar_pdf_sincrono_file, pdf_file, filename)
+        blob = await run_in_threadpool(_salvar_pdf_sincrono_file, pdf_file)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao salvar arquivo PDF: {e}")
     finally:
@@ -259,39 +238,49 @@ async def criar_artigo(
         ano=ano,
         pagina_inicial=pagina_inicial,
         pagina_final=pagina_final,
-        caminho_pdf=caminho_pdf_salvo,
+        caminho_pdf=blob.caminho,
         booktitle=booktitle,
         publisher=publisher,
         location=location,
     )
     try:
-        titulo_cadastrado = await run_in_threadpool(_cadastrar_artigo_core, session, artigo_schema)
+        # As funções CORE são síncronas; run_sync as executa sobre a mesma conexão async
+        novo_artigo = await session.run_sync(_cadastrar_artigo_core, artigo_schema, blob)
+        titulo_cadastrado = novo_artigo.titulo
         # Notifica subscribers e captura mensagens
-        notificacoes = await run_in_threadpool(_notificar_subscribers, session, artigo_schema)
-        session.commit()
+        notificacoes = await session.run_sync(notificar_subscribers, artigo_schema)
+        await registrar_escrita(session, TABELA_ARTIGOS)
+        await session.commit()
+        cache_respostas.invalidar(TAG_ARTIGOS, tag_edicao(novo_artigo.id_edicao), *tags_autores(novo_artigo.autores))
+        worker_notificacoes.acordar()
     except HTTPException:
-        session.rollback()
-        if caminho_pdf_salvo and os.path.exists(caminho_pdf_salvo):
-            os.remove(caminho_pdf_salvo)
+        await session.rollback()
+        await session.run_sync(remover_se_orfao, blob.sha256)
         raise
+    except IntegrityError:
+        # ix_artigos_id_edicao_titulo é único: o mesmo título entrou na edição depois da validação
+        await session.rollback()
+        await session.run_sync(remover_se_orfao, blob.sha256)
+        raise HTTPException(status_code=400, detail=f"Artigo com título '{titulo}' já cadastrado na edição.")
     except Exception as e:
-        session.rollback()
-        if caminho_pdf_salvo and os.path.exists(caminho_pdf_salvo):
-            os.remove(caminho_pdf_salvo)
+        await session.rollback()
+        await session.run_sync(remover_se_orfao, blob.sha256)
         raise HTTPException(status_code=500, detail=f"Erro interno ao cadastrar artigo: {e}")
-    return {"mensagem": f"Artigo {titulo_cadastrado} incluído com sucesso no evento {nome_evento}", "caminho_pdf": caminho_pdf_salvo, "notificacoes": notificacoes}
+    return {"mensagem": f"Artigo {titulo_cadastrado} incluído com sucesso no evento {nome_evento}", "caminho_pdf": blob.caminho, "notificacoes": notificacoes}
 
-# ENDPOINT: Importar múltiplos artigos via BibTeX
-@artigo_router.post("/artigo/importar-bibtex")
+# ENDPOINT: Importar múltiplos artigos via BibTeX (em segundo plano, ver importacoes.py)
+@artigo_router.post("/artigo/importar-bibtex", status_code=202)
 async def importar_bibtex(
     bibtex_file: UploadFile = File(..., description="Arquivo de texto contendo dados BibTeX"),
     pdf_zip_file: UploadFile = File(..., description="Arquivo ZIP contendo os PDFs (nomes devem corresponder à chave BibTeX)"),
-    session: Session = Depends(pegar_sessao),
+    session: AsyncSession = Depends(pegar_sessao),
     usuario: Usuario = Depends(verificar_token)
 ):
     """
-    Importa múltiplos artigos a partir de um arquivo BibTeX e um ZIP de PDFs.
+    Recebe um arquivo BibTeX e um ZIP de PDFs e cria um job de importação.
     Requer que o nome do PDF no ZIP corresponda à chave BibTeX.
+    Responde na hora com o id do job; o progresso, o relatório de pulados e o
+    resumo final ficam em GET /artigo/import-jobs/{id}.
     """
     ALLOWED_MIME_TYPES = [
         'application/zip', 
@@ -307,151 +296,76 @@ async def importar_bibtex(
     
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
-    
-    titulos_cadastrados = []
-    artigos_pulados: List[Dict[str, str]] = []
-    notificacoes_por_artigo: List[Dict[str, Any]] = []
-    
-    pdf_file_map: Dict[str, str] = {}
-    # Inicializa a variável que será limpa no final
-    temp_dir_to_clean: Optional[str] = None 
-    
+
     try:
-        # 1. Leitura e Parsing do BibTeX (Assíncrono)
-        contents_bibtex = await bibtex_file.read()
-        bibtex_data = contents_bibtex.decode('utf-8')
-        
-        artigos_com_meta = await run_in_threadpool(parse_bibtex_to_artigo_schema, bibtex_data)
-        print("DEBUG artigos_com_meta:", artigos_com_meta)
-        
-        # 2. Descompactação e Mapeamento dos PDFs (Assíncrono)
-        contents_zip = await pdf_zip_file.read()
-        
-        # CORREÇÃO DO ERRO DE DESEMPACOTAMENTO:
-        # Captura o resultado como uma única tupla e depois desempacota.
-        resultado_extracao = await run_in_threadpool(_extrair_zip_e_mapear_pdfs, contents_zip)
-        pdf_file_map, temp_dir_to_clean = resultado_extracao
-        
-        # 3. Processamento de CADA Artigo
-        for artigo_schema, chave_bibtex in artigos_com_meta:
-            pdf_filename_esperado = f"{chave_bibtex}.pdf"  # ✅ usa o nome BibTeX
-            erro_parsing = None
-            identificador = chave_bibtex
-
-            # Checagem de falha de parsing ou schema base (existente)
-            if erro_parsing or artigo_schema is None:
-                artigos_pulados.append({
-                    "identificador": identificador, 
-                    "motivo": f"Falha de validação/parsing do BibTeX: {erro_parsing or 'Schema incompleto/inválido'}."
-                })
-                continue
-                
-            # NOVO: Regra de Negócio: Ignorar artigos sem ano (se exigido)
-            # A função core faz essa checagem, mas é bom dar um feedback mais específico aqui
-            # se o campo está vazio, prevenindo a chamada desnecessária ao BD.
-            if not artigo_schema.ano:
-                artigos_pulados.append({
-                    "titulo": artigo_schema.titulo,
-                    "motivo": f"Artigo ignorado. O campo 'ano' está faltando ou é inválido no BibTeX."
-                })
-                continue
-
-            # --- 3.2. Mapeamento e Salvamento do PDF ---
-            if pdf_filename_esperado not in pdf_file_map:
-                artigos_pulados.append({
-                    "titulo": artigo_schema.titulo,
-                    "motivo": f"Arquivo PDF '{pdf_filename_esperado}' não encontrado no ZIP."
-                })
-                continue
-            
-            source_pdf_path = pdf_file_map[pdf_filename_esperado]
-            final_pdf_filename = f"{artigo_schema.nome_evento.lower()}_{pdf_filename_esperado}"
-            caminho_pdf_salvo = None
-            
-            # Salva o arquivo permanentemente
-            try:
-                # CORREÇÃO LÓGICA: Deve usar _salvar_pdf_sincrono_path, pois a origem é um PATH
-                caminho_pdf_salvo = await run_in_threadpool(_salvar_pdf_sincrono_path, source_pdf_path, final_pdf_filename)
-                artigo_schema.caminho_pdf = caminho_pdf_salvo
-            except Exception as e:
-                artigos_pulados.append({
-                    "titulo": artigo_schema.titulo,
-                    "motivo": f"Falha ao salvar PDF no disco: {e}"
-                })
-                continue
-                
-            # --- 3.3. Cadastro no BD (em memória) ---
-            try:
-                # O _cadastrar_artigo_core já chama a notificação
-                titulo_cadastrado = await run_in_threadpool(_cadastrar_artigo_core, session, artigo_schema)
-                # Notifica e coleciona mensagens para este artigo
-                msgs = await run_in_threadpool(_notificar_subscribers, session, artigo_schema)
-                titulos_cadastrados.append(titulo_cadastrado)
-                if msgs:
-                    notificacoes_por_artigo.append({
-                        'titulo': artigo_schema.titulo,
-                        'notificacoes': msgs
-                    })
-                
-            except HTTPException as e:
-                artigos_pulados.append({
-                    "titulo": artigo_schema.titulo,
-                    "motivo": f"Erro de cadastro no BD: {e.detail}"
-                })
-                if caminho_pdf_salvo and os.path.exists(caminho_pdf_salvo):
-                    os.remove(caminho_pdf_salvo)
-                continue 
-        
-        # 4. Commit Único no Final
-        session.commit()
-        
-    except Exception as e:
-        session.rollback()
-        raise HTTPException(status_code=500, detail=f"Erro interno ou falha na transação: {e}")
+        # O Starlette já gravou o upload em disco (SpooledTemporaryFile); só o diretório central é lido
+        if not await run_in_threadpool(zipfile.is_zipfile, pdf_zip_file.file):
+            raise HTTPException(status_code=400, detail="Erro ao processar arquivo ZIP: arquivo inválido.")
+
+        importacao = nova_importacao(usuario.id, bibtex_file.filename)
+        session.add(importacao)
+        await session.flush()
+        id_importacao = importacao.id
+        try:
+            # Cópia em blocos para IMPORTACOES_PASTA/<id>/; o worker lê de lá (e relê na retomada)
+            await run_in_threadpool(gravar_arquivos, id_importacao, bibtex_file.file, pdf_zip_file.file)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            await run_in_threadpool(remover_arquivos, id_importacao)
+            raise HTTPException(status_code=500, detail=f"Erro interno ao registrar a importação: {e}")
     finally:
-        # 5. Limpeza (CORRIGIDA)
-        if temp_dir_to_clean and os.path.exists(temp_dir_to_clean):
-            # Remove recursivamente o diretório temporário e todo o seu conteúdo
-            shutil.rmtree(temp_dir_to_clean)
-        
-    # 6. Mensagem de Sucesso e Relatório
-    mensagem_final = f"Importação finalizada. Total de artigos cadastrados: {len(titulos_cadastrados)}."
-    
-    if artigos_pulados:
-        mensagem_final += f" {len(artigos_pulados)} artigo(s) foram pulados. Veja o relatório."
-    if notificacoes_por_artigo:
-        mensagem_final += f" {len(notificacoes_por_artigo)} artigo(s) geraram notificações de subscribers."
+        await pdf_zip_file.close()
+        await bibtex_file.close()
 
+    worker_importacoes.acordar()
     return {
-        "mensagem": mensagem_final, 
-        "total_cadastrados": len(titulos_cadastrados), 
-        "titulos_cadastrados": titulos_cadastrados,
-        "total_pulados": len(artigos_pulados),
-        "relatorio_erros": artigos_pulados,
-        "notificacoes": notificacoes_por_artigo
+        "mensagem": "Importação recebida. Acompanhe o progresso pela URL indicada.",
+        "id": id_importacao,
+        "status": "pendente",
+        "url": f"{artigo_router.prefix}/import-jobs/{id_importacao}",
     }
 
+# ENDPOINT: Progresso e relatório de uma importação BibTeX
+@artigo_router.get("/import-jobs/{id_job}")
+async def status_importacao(id_job: int, session: AsyncSession = Depends(pegar_sessao_leitura),
+                            usuario: Usuario = Depends(verificar_token)):
+    if not usuario.admin:
+        raise HTTPException(status_code=401, detail="Você não tem autorização para acessar essa importação")
+    importacao = await session.get(ImportacaoBibtex, id_job)
+    if not importacao:
+        raise HTTPException(status_code=404, detail="Importação não encontrada")
+    pulados = (await session.scalars(
+        select(ImportacaoPulado).where(ImportacaoPulado.id_importacao == id_job).order_by(ImportacaoPulado.indice)
+    )).all()
+    return descrever_importacao(importacao, pulados)
+
 # ... (Endpoints listar, remover, editar, pesquisar e author_home permanecem iguais)
 # ENDPOINT: Remover artigo
 @artigo_router.post("/artigo/remover/{id_artigo}")
-async def remover_artigo(id_artigo: int, session: Session = Depends(pegar_sessao),
+async def remover_artigo(id_artigo: int, session: AsyncSession = Depends(pegar_sessao),
                        usuario: Usuario = Depends(verificar_token)):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
     
-    artigo = session.query(Artigo).filter(Artigo.id == id_artigo).first()
+    artigo = await session.get(Artigo, id_artigo)
     if not artigo:
         raise HTTPException(status_code=400, detail="Não existe artigo com esse ID")
     
-    # Removendo arquivo físico se existir
-    if artigo.caminho_pdf and os.path.exists(artigo.caminho_pdf):
-        try:
-            os.remove(artigo.caminho_pdf)
-        except Exception as e:
-            print(f"AVISO: Falha ao remover arquivo PDF {artigo.caminho_pdf}: {e}")
-    
-    session.delete(artigo)
-    session.commit()
+    # O PDF é compartilhado entre artigos com o mesmo conteúdo: só libera a referência
+    sha_antigo = artigo.sha256_pdf
+    caminho_antigo = artigo.caminho_pdf
+    await session.run_sync(liberar_referencia, sha_antigo)
+    await session.delete(artigo)
+    await registrar_escrita(session, TABELA_ARTIGOS)
+    await session.commit()
+    cache_respostas.invalidar(TAG_ARTIGOS, tag_artigo(id_artigo), tag_edicao(artigo.id_edicao),
+                              *tags_autores(artigo.autores))
+    # Remove o arquivo físico só depois do commit e se ninguém mais o referencia
+    if sha_antigo:
+        await session.run_sync(remover_se_orfao, sha_antigo)
+    else:
+        _remover_pdf_legado(caminho_antigo)
     return {"mensagem": f"artigo '{id_artigo}' removido com sucesso",
             "Artigo": artigo}
 
@@ -470,14 +384,20 @@ async def editar_artigo(
     publisher: Optional[str] = Form(None),
     location: Optional[str] = Form(None),
     pdf_file: Optional[UploadFile] = File(None),
-    session: Session = Depends(pegar_sessao),
+    session: AsyncSession = Depends(pegar_sessao),
     usuario: Usuario = Depends(verificar_token)
 ):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
-    artigo = session.query(Artigo).filter(Artigo.id == id_artigo).first()
+    artigo = await session.get(Artigo, id_artigo)
     if not artigo:
         raise HTTPException(status_code=400, detail="Não existe artigo com esse ID")
+    autores_antigos = artigo.autores
+    # Antes de alterar o objeto: o autoflush das consultas seguintes já gravaria o título
+    repetido = await session.scalar(select(Artigo.id).where(
+        Artigo.id_edicao == artigo.id_edicao, Artigo.titulo == titulo, Artigo.id != id_artigo).limit(1))
+    if repetido:
+        raise HTTPException(status_code=400, detail=f"Artigo com título '{titulo}' já cadastrado na edição {artigo.id_edicao}.")
     # Atualiza campos
     artigo.titulo = titulo
     artigo.autores = autores
@@ -488,144 +408,259 @@ async def editar_artigo(
     artigo.booktitle = booktitle
     artigo.publisher = publisher
     artigo.location = location
+    await session.run_sync(vincular_autores, artigo)
     # Atualiza PDF se enviado
     if pdf_file:
         if pdf_file.content_type != 'application/pdf':
             raise HTTPException(status_code=400, detail="O arquivo deve ser um PDF (application/pdf).")
-        filename = f"{titulo.lower().replace(' ', '_')}_{pdf_file.filename}"
         try:
-            caminho_pdf_salvo = await run_in_threadpool(_salvar_pdf_sincrono_file, pdf_file, filename)
+            blob = await run_in_threadpool(_salvar_pdf_sincrono_file, pdf_file)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Erro ao salvar arquivo PDF: {e}")
         finally:
             await pdf_file.close()
-        # Remove PDF antigo se existir
-        if artigo.caminho_pdf and os.path.exists(artigo.caminho_pdf):
-            try:
-                os.remove(artigo.caminho_pdf)
-            except Exception as e:
-                print(f"AVISO: Falha ao remover arquivo PDF antigo {artigo.caminho_pdf}: {e}")
-        artigo.caminho_pdf = caminho_pdf_salvo
-    session.commit()
+        # Troca a referência: o PDF antigo só é apagado se ficar sem artigos
+        sha_antigo, caminho_antigo = artigo.sha256_pdf, artigo.caminho_pdf
+        await session.run_sync(registrar_referencias, [blob])
+        await session.run_sync(liberar_referencia, sha_antigo)
+        artigo.caminho_pdf = blob.caminho
+        artigo.sha256_pdf = blob.sha256
+    await registrar_escrita(session, TABELA_ARTIGOS)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Outro artigo com o mesmo título entrou na edição depois da checagem
+        await session.rollback()
+        if pdf_file:
+            await session.run_sync(remover_se_orfao, blob.sha256)
+        raise HTTPException(status_code=400, detail=f"Artigo com título '{titulo}' já cadastrado na edição.")
+    cache_respostas.invalidar(TAG_ARTIGOS, tag_artigo(id_artigo), tag_edicao(artigo.id_edicao),
+                              *tags_autores(autores_antigos, artigo.autores))
+    if pdf_file and sha_antigo != blob.sha256:
+        if sha_antigo:
+            await session.run_sync(remover_se_orfao, sha_antigo)
+        else:
+            _remover_pdf_legado(caminho_antigo)
     return {"mensagem": f"Artigo '{id_artigo}' editado com sucesso"}
 
+# ENDPOINT: Lote de operações em JSON (criar, editar e remover numa transação)
+@artigo_router.post("/batch")
+async def lote_artigos(lote: LoteArtigosSchema, session: AsyncSession = Depends(pegar_sessao),
+                       usuario: Usuario = Depends(verificar_token)):
+    """
+    Aplica uma lista de operações (só metadados; PDFs por `sha256_pdf` de um
+    arquivo já armazenado) com uma verificação de token e um único commit.
+    Modo tudo_ou_nada: se alguma operação for inválida, nada é gravado e a
+    resposta é 400 com o resultado de cada uma. Modo melhor_esforco: grava as
+    válidas e relata as recusadas.
+    """
+    if not usuario.admin:
+        raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
+    try:
+        efeitos = await session.run_sync(_aplicar_lote, lote.operacoes, lote.modo == "tudo_ou_nada")
+        if efeitos['aplicadas']:
+            await registrar_escrita(session, TABELA_ARTIGOS)
+            await session.commit()
+        else:
+            await session.rollback()
+    except IntegrityError:
+        # Validação feita antes de um cadastro concorrente do mesmo (titulo, id_edicao)
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Título já cadastrado na edição por outra requisição; reenvie o lote")
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro interno ou falha na transação: {e}")
+
+    resposta = {
+        "modo": lote.modo,
+        "total_aplicadas": efeitos['aplicadas'],
+        "total_rejeitadas": efeitos['rejeitadas'],
+        "resultados": efeitos['resultados'],
+        "notificacoes": efeitos['notificacoes'],
+    }
+    if lote.modo == "tudo_ou_nada" and efeitos['rejeitadas']:
+        raise HTTPException(status_code=400, detail={"mensagem": "Nenhuma operação aplicada. Veja os resultados.", **resposta})
+    if not efeitos['aplicadas']:
+        return {"mensagem": "Nenhuma operação aplicada. Veja os resultados.", **resposta}
+
+    cache_respostas.invalidar(TAG_ARTIGOS, *efeitos['tags'])
+    worker_notificacoes.acordar()
+    # Arquivos físicos só depois do commit e se ninguém mais os referencia
+    for sha in efeitos['shas_liberados']:
+        await session.run_sync(remover_se_orfao, sha)
+    for caminho in efeitos['caminhos_legados']:
+        _remover_pdf_legado(caminho)
+    return {"mensagem": f"Lote finalizado. {efeitos['aplicadas']} operação(ões) aplicada(s), "
+                        f"{efeitos['rejeitadas']} recusada(s).", **resposta}
+
 # ENDPOINT: Listar artigos mais recentes
 @artigo_router.get("/recentes", response_model=List[ResponseArtigoSchema])
-async def listar_artigos_recentes(session: Session = Depends(pegar_sessao)):
+async def listar_artigos_recentes(request: Request, projecao: Tuple[str, ...] = Depends(campos_artigo),
+                                  session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
     Lista os 5 artigos mais recentes adicionados ao banco de dados.
+    `fields` limita os campos devolvidos (ver serializacao.campos_artigo).
+    Aceita GET condicional (If-None-Match / If-Modified-Since), ver versoes.py.
     """
-    artigos = session.query(Artigo).order_by(Artigo.id.desc()).limit(5).all()
-    return artigos
+    versoes = await ler_versoes(session, TABELA_ARTIGOS)
+    if requisicao_nao_modificada(request, versoes.etag, versoes.ultima_modificacao):
+        return Response(status_code=304, headers=versoes.headers())
+    chave = ("artigos_recentes", projecao)
+    em_cache = cache_respostas.obter(chave)
+    if em_cache:
+        return cache_respostas.resposta(em_cache, request)
+    geracao = cache_respostas.geracao()
+    linhas = (await session.execute(select(*colunas_artigo(projecao)).order_by(Artigo.id.desc()).limit(5))).all()
+    return cache_respostas.responder(chave, linhas_para_dicts(linhas, projecao), [TAG_ARTIGOS], geracao, versoes.headers())
 
 
 # ENDPOINT: Pesquisa unificada
 @artigo_router.get("/artigo/search", response_model=List[ResponseArtigoSchema])
-async def pesquisa_unificada(field: str = Query(..., description="Campo a pesquisar: titulo, autor, evento"),
-                              q: str = Query(..., description="Substring a procurar"),
-                              session: Session = Depends(pegar_sessao)):
+async def pesquisa_unificada(q: str = Query(..., description="Termos a procurar (prefixo). Aceita 'campo:termo', ex: 'autor:valente'"),
+                              field: Optional[str] = Query(None, description="Campo(s) a pesquisar, separados por vírgula: titulo, autor, evento, publisher. Se omitido, pesquisa em todos"),
+                              pagina: ParametrosPagina = Depends(),
+                              projecao: Tuple[str, ...] = Depends(campos_artigo),
+                              session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
-    Pesquisa unificada por artigo. `field` deve ser um de: 'titulo', 'autor', 'evento'.
-    Retorna todos os artigos cujo campo contém a substring `q` (case-insensitive).
+    Pesquisa unificada por artigo usando o índice FTS5 'artigos_fts'.
+    Cada termo de `q` é tratado como prefixo e todos precisam aparecer.
+    `field` mantém o contrato antigo ('titulo', 'autor' ou 'evento') e também
+    aceita vários campos separados por vírgula. Resultados ordenados por relevância (BM25),
+    paginados por chave (rank, id): ver paginacao.py.
+    `fields` (diferente de `field`) limita os campos devolvidos de cada artigo.
+    As linhas vêm como tuplas de colunas e vão direto para o JSON; o response_model
+    fica só para a documentação.
     """
-    field = field.lower()
-    q = q.strip()
-    if field not in ("titulo", "autor", "evento"):
-        raise HTTPException(status_code=400, detail="Campo inválido. Use 'titulo', 'autor' ou 'evento'.")
+    campos = None
+    if field:
+        campos = [f.strip().lower() for f in field.split(",") if f.strip()]
+        if any(c not in CAMPOS_FTS for c in campos):
+            raise HTTPException(status_code=400, detail="Campo inválido. Use 'titulo', 'autor', 'evento' ou 'publisher'.")
 
-    if field == "titulo":
-        resultados = session.query(Artigo).filter(Artigo.titulo.ilike(f"%{q}%")).all()
-    elif field == "autor":
-        resultados = session.query(Artigo).filter(Artigo.autores.ilike(f"%{q}%")).all()
-    else:  # evento
-        resultados = session.query(Artigo).filter(Artigo.nome_evento.ilike(f"%{q}%")).all()
+    expr = montar_consulta_fts(q.strip(), campos)
+    if not expr:
+        return []
 
-    return resultados
+    stmt = filtrar_por_fts(select(*colunas_artigo(projecao)), expr, Artigo.id, ordenar=False)
+    resultados, proximo, total = await paginar(session, stmt, [rank_bm25, Artigo.id], pagina, tuplas=True)
+    return RespostaJSON(linhas_para_dicts(resultados, projecao), headers=headers_paginacao(proximo, total))
 
 
 @artigo_router.get('/authors/{author_slug}')
-async def author_home(author_slug: str, session: Session = Depends(pegar_sessao)) -> Dict[str, Any]:
+async def author_home(author_slug: str, request: Request, pagina: ParametrosPagina = Depends(),
+                      projecao: Tuple[str, ...] = Depends(campos_artigo),
+                      session: AsyncSession = Depends(pegar_sessao_leitura)) -> Dict[str, Any]:
     """
-    Página do autor: lista os artigos daquele autor organizados por ano (sem paginação).
+    Página do autor: lista os artigos daquele autor organizados por ano.
+    Paginada por chave na ordem (ano, título, id) decrescente; um mesmo ano pode
+    continuar na página seguinte.
     URL exemplo: /authors/marco-tulio-valente
-    Observação: não fazemos aliasing — o slug é convertido em nome simples (troca '-' por ' ').
+    Observação: não fazemos aliasing — o slug é normalizado (ver autores.slug_autor) e comparado com autores.slug.
+    `fields` limita os campos devolvidos de cada artigo (ver serializacao.campos_artigo).
+    Aceita GET condicional (If-None-Match / If-Modified-Since), ver versoes.py.
     """
-    def normalize_name(s: str) -> str:
-        return ' '.join(s.replace('-', ' ').strip().split()).lower()
-
-    search_name = normalize_name(author_slug)
-
-    # Busca candidatos por ilike para reduzir o conjunto e depois filtra por igualdade normalizada
-    candidates = session.query(Artigo).filter(Artigo.autores.ilike(f"%{search_name}%")).all()
-
-    matched = []
-    for art in candidates:
-        autores_list = [a.strip() for a in (art.autores or '').split(' and ') if a.strip()]
-        for a in autores_list:
-            if normalize_name(a) == search_name:
-                matched.append(art)
-                break
-
-    # Agrupa por ano
-    grouped: Dict[Any, list] = {}
-    for art in matched:
-        year = art.ano if getattr(art, 'ano', None) is not None else 'Unknown'
-        grouped.setdefault(year, []).append(art)
-
-    # Ordena anos desc (Unknown por último)
-    years = [y for y in grouped.keys() if y != 'Unknown']
-    years.sort(reverse=True)
-    if 'Unknown' in grouped:
-        years.append('Unknown')
+    versoes = await ler_versoes(session, TABELA_ARTIGOS)
+    if requisicao_nao_modificada(request, versoes.etag, versoes.ultima_modificacao):
+        return Response(status_code=304, headers=versoes.headers())
+    slug = slug_autor(author_slug)
+    # A grafia do slug aparece na resposta ('author'), então entra na chave
+    chave = ("autor", author_slug, pagina.cursor, pagina.limit, pagina.total, projecao)
+    em_cache = cache_respostas.obter(chave)
+    if em_cache:
+        return cache_respostas.resposta(em_cache, request)
+    geracao = cache_respostas.geracao()
+
+    # O agrupamento precisa do ano mesmo quando ele não foi pedido em `fields`
+    selecionados = projecao if 'ano' in projecao else (*projecao, 'ano')
+    # Busca pelo slug indexado em 'autores' e junta com os artigos via 'artigo_autor'
+    stmt = (
+        select(*colunas_artigo(selecionados))
+        .join(ArtigoAutor, ArtigoAutor.id_artigo == Artigo.id)
+        .join(Autor, Autor.id == ArtigoAutor.id_autor)
+        .where(Autor.slug == slug)
+    )
+    # Sem ano vai para o fim ('Unknown'); a ordem do BD já é a da página
+    chaves = [func.coalesce(Artigo.ano, -1), func.lower(func.coalesce(Artigo.titulo, '')), Artigo.id]
+    matched, proximo, total = await paginar(session, stmt, chaves, pagina, decrescente=True, tuplas=True)
 
+    # Agrupa por ano: a ordem do BD já é a da página (anos desc, sem ano por último)
     result = {
         'author': author_slug.replace('-', ' '),
         'articles_by_year': []
     }
+    grupos = result['articles_by_year']
+    for art in linhas_para_dicts(matched, selecionados):
+        ano = art['ano'] if 'ano' in projecao else art.pop('ano')
+        year = ano if ano is not None else 'Unknown'
+        if not grupos or grupos[-1]['year'] != year:
+            grupos.append({'year': year, 'articles': []})
+        grupos[-1]['articles'].append(art)
 
-    for y in years:
-        arts = grouped[y]
-        arts_sorted = sorted(arts, key=lambda x: (x.ano if x.ano is not None else -1, (x.titulo or '').lower()), reverse=True)
-        serialized = [
-            {
-                'id': getattr(a, 'id', None),
-                'titulo': a.titulo,
-                'autores': a.autores,
-                'nome_evento': a.nome_evento,
-                'ano': a.ano,
-                'pagina_inicial': a.pagina_inicial,
-                'pagina_final': a.pagina_final,
-                'caminho_pdf': a.caminho_pdf,
-                'booktitle': getattr(a, 'booktitle', None),
-                'publisher': getattr(a, 'publisher', None),
-                'location': getattr(a, 'location', None),
-                'id_edicao': getattr(a, 'id_edicao', None)
-            }
-            for a in arts_sorted
-        ]
-        result['articles_by_year'].append({'year': y, 'articles': serialized})
-
-    return result
+    return cache_respostas.responder(chave, result, [tag_autor(slug)], geracao,
+                                     {**versoes.headers(), **headers_paginacao(proximo, total)})
 
 
 
+# ENDPOINT: Download do PDF
+@artigo_router.api_route('/{id_artigo}/pdf', methods=["GET", "HEAD"])
+async def baixar_pdf(id_artigo: int, request: Request,
+                     v: Optional[str] = Query(None, description="SHA-256 do PDF; quando informado, a resposta pode ser guardada em cache indefinidamente"),
+                     session: AsyncSession = Depends(pegar_sessao_leitura)):
+    """
+    Envia o PDF do artigo. Suporta requisições Range (leitura parcial e retomada),
+    ETag forte (o SHA-256 do conteúdo), Last-Modified e respostas 304 para
+    If-None-Match / If-Modified-Since. Em servidores ASGI com a extensão
+    'http.response.pathsend' o arquivo é enviado pelo sendfile do sistema operacional.
+    """
+    artigo = (await session.execute(select(Artigo.caminho_pdf, Artigo.sha256_pdf).where(Artigo.id == id_artigo))).first()
+    if not artigo or not artigo.caminho_pdf:
+        raise HTTPException(status_code=404, detail='PDF não encontrado')
+    try:
+        stat_result = await run_in_threadpool(os.stat, artigo.caminho_pdf)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail='PDF não encontrado')
+
+    if artigo.sha256_pdf:
+        etag = f'"{artigo.sha256_pdf}"'
+    else:
+        # PDFs anteriores ao armazenamento por conteúdo: ETag pelo arquivo
+        etag = f'"{int(stat_result.st_mtime)}-{stat_result.st_size}"'
+    # URL versionada (?v=<sha256>) nunca muda de conteúdo; a URL simples sempre revalida (304 é barato)
+    if artigo.sha256_pdf and v == artigo.sha256_pdf:
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        cache_control = "public, no-cache"
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat_result.st_mtime),
+        "Cache-Control": cache_control,
+    }
+    if requisicao_nao_modificada(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(
+        artigo.caminho_pdf,
+        media_type="application/pdf",
+        headers=headers,
+        stat_result=stat_result,
+        filename=f"artigo-{id_artigo}.pdf",
+        content_disposition_type="inline",
+    )
+
+
 @artigo_router.get('/{id_artigo}')
-async def get_artigo(id_artigo: int, session: Session = Depends(pegar_sessao)):
-    artigo = session.query(Artigo).filter(Artigo.id == id_artigo).first()
-    if not artigo:
+async def get_artigo(id_artigo: int, request: Request, session: AsyncSession = Depends(pegar_sessao_leitura)):
+    """Aceita GET condicional (If-None-Match / If-Modified-Since), ver versoes.py."""
+    versoes = await ler_versoes(session, TABELA_ARTIGOS)
+    if requisicao_nao_modificada(request, versoes.etag, versoes.ultima_modificacao):
+        return Response(status_code=304, headers=versoes.headers())
+    chave = ("artigo", id_artigo)
+    em_cache = cache_respostas.obter(chave)
+    if em_cache:
+        return cache_respostas.resposta(em_cache, request)
+    geracao = cache_respostas.geracao()
+    linha = (await session.execute(select(*COLUNAS_ARTIGO).where(Artigo.id == id_artigo))).first()
+    if not linha:
         raise HTTPException(status_code=404, detail='Artigo não encontrado')
 
-    return {
-        'id': artigo.id,
-        'titulo': artigo.titulo,
-        'autores': artigo.autores,
-        'nome_evento': artigo.nome_evento,
-        'ano': artigo.ano,
-        'pagina_inicial': artigo.pagina_inicial,
-        'pagina_final': artigo.pagina_final,
-        'caminho_pdf': artigo.caminho_pdf,
-        'booktitle': getattr(artigo, 'booktitle', None),
-        'publisher': getattr(artigo, 'publisher', None),
-        'location': getattr(artigo, 'location', None),
-        'id_edicao': getattr(artigo, 'id_edicao', None)
-    }
\ No newline at end of file
+    return cache_respostas.responder(chave, linhas_para_dicts([linha])[0], [tag_artigo(id_artigo)], geracao, versoes.headers())
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from schemas import UsuarioSchema, LoginSchema
-from dependencies import pegar_sessao, verificar_token
+from dependencies import pegar_sessao, verificar_token, cache_usuarios
 from models import Usuario
-from main import bcrypt_context, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY
+from senhas import pool_senhas
+from cache_respostas import cache_respostas
+from main import ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from fastapi.security import OAuth2PasswordRequestForm
@@ -16,12 +20,17 @@ def criar_token(id_usuario, duracao_token=timedelta(minutes=ACCESS_TOKEN_EXPIRE_
     jwt_codificado = jwt.encode(dic_info, SECRET_KEY, ALGORITHM)
     return jwt_codificado
 
-def autenticar_usuario(email, senha, session):
-    usuario = session.query(Usuario).filter(Usuario.email==email).first()
+async def autenticar_usuario(email, senha, session):
+    usuario = await session.scalar(select(Usuario).where(Usuario.email==email).limit(1))
     if not usuario:
         return False
-    elif not bcrypt_context.verify(senha, usuario.senha):
+    valida, novo_hash = await pool_senhas.verificar(senha, usuario.senha)
+    if not valida:
         return False
+    if novo_hash:
+        # Hash gerado com outro custo (BCRYPT_ROUNDS): regrava com o custo atual
+        usuario.senha = novo_hash
+        await session.commit()
     return usuario
 
 @auth_router.get("/")
@@ -35,20 +44,27 @@ async def home():
 # rotas de subscribe/unsubscribe removidas (usar /subscriber para assinaturas públicas)
 
 @auth_router.post("/criar_conta")
-async def criar_conta(usuario_schema: UsuarioSchema, session: Session = Depends(pegar_sessao)):
-    usuario = session.query(Usuario).filter(Usuario.email ==usuario_schema.email).first()
+async def criar_conta(usuario_schema: UsuarioSchema, session: AsyncSession = Depends(pegar_sessao)):
+    usuario = await session.scalar(select(Usuario).where(Usuario.email ==usuario_schema.email).limit(1))
     if usuario:
         raise HTTPException(status_code=400, detail="Já existe esse usuario com esse email")
     else:
-        senha_criptografada = bcrypt_context.hash(usuario_schema.senha)
+        senha_criptografada = await pool_senhas.gerar_hash(usuario_schema.senha)
         novo_usuario = Usuario(usuario_schema.nome, usuario_schema.email, senha_criptografada, usuario_schema.admin)
         session.add(novo_usuario)
-        session.commit()
+        try:
+            await session.commit()
+        except IntegrityError:
+            # ix_usuarios_email é único (cadastros simultâneos com o mesmo email)
+            await session.rollback()
+            raise HTTPException(status_code=400, detail="Já existe esse usuario com esse email")
+        # ids do SQLite podem ser reaproveitados; não deixa um principal antigo no cache
+        cache_usuarios.invalidar(novo_usuario.id)
         return {"mensagem": f"Usario de email {usuario_schema.email} cadastrado com sucesso"}
     
 @auth_router.post("/login")
-async def login(login_schema: LoginSchema, session: Session = Depends(pegar_sessao)):
-    usuario = autenticar_usuario(login_schema.email, login_schema.senha, session)
+async def login(login_schema: LoginSchema, session: AsyncSession = Depends(pegar_sessao)):
+    usuario = await autenticar_usuario(login_schema.email, login_schema.senha, session)
     if not usuario:
         raise HTTPException(status_code=400, detail="Usuário não encontrado ou credenciais inválidas")
     else:
@@ -62,8 +78,8 @@ async def login(login_schema: LoginSchema, session: Session = Depends(pegar_sess
         }
     
 @auth_router.post("/login-form")
-async def login_form(dados_formulario: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(pegar_sessao)):
-    usuario = autenticar_usuario(dados_formulario.username, dados_formulario.password, session)
+async def login_form(dados_formulario: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(pegar_sessao)):
+    usuario = await autenticar_usuario(dados_formulario.username, dados_formulario.password, session)
     if not usuario:
         raise HTTPException(status_code=400, detail="Usuário não encontrado ou credenciais inválidas")
     else:
@@ -85,4 +101,20 @@ async def use_refresh_token(usuario: Usuario = Depends(verificar_token)):
 @auth_router.get('/me')
 async def me(usuario: Usuario = Depends(verificar_token)):
     """Retorna informações do usuário autenticado."""
-    return {"id": usuario.id, "nome": usuario.nome, "email": usuario.email, "admin": usuario.admin}
\ No newline at end of file
+    return {"id": usuario.id, "nome": usuario.nome, "email": usuario.email, "admin": usuario.admin}
+
+
+@auth_router.get('/cache-usuarios')
+async def estatisticas_cache_usuarios(usuario: Usuario = Depends(verificar_token)):
+    """Acertos/falhas do cache de usuários autenticados (somente admin)."""
+    if not usuario.admin:
+        raise HTTPException(status_code=401, detail="Você não tem autorização para acessar essa informação")
+    return cache_usuarios.estatisticas()
+
+
+@auth_router.get('/cache-respostas')
+async def estatisticas_cache_respostas(usuario: Usuario = Depends(verificar_token)):
+    """Taxa de acerto e ocupação do cache das rotas públicas de leitura (somente admin)."""
+    if not usuario.admin:
+        raise HTTPException(status_code=401, detail="Você não tem autorização para acessar essa informação")
+    return cache_respostas.estatisticas()
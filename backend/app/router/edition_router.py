@@ -1,51 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from dependencies import pegar_sessao
-from models import Evento, EdicaoEvento, Artigo
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import and_, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from dependencies import pegar_sessao_leitura
+from models import Evento, EdicaoEvento, Artigo, ArtigoAutor, Autor
+from paginacao import ParametrosPagina, codificar_cursor, decodificar_cursor, HEADER_PROXIMO_CURSOR, HEADER_TOTAL
+from cache_respostas import cache_respostas, tag_evento, tag_edicao
+from cache_http import requisicao_nao_modificada
+from versoes import ler_versoes, TABELA_ARTIGOS, TABELA_EDICOES, TABELA_EVENTOS
 
 edition_router = APIRouter(prefix="/edicao", tags=["edicao"])
 
+# Nomes normalizados dos autores do artigo, na ordem do BibTeX, como array JSON
+_autores_json = (
+    select(func.json_group_array(literal_column("nome")))
+    .select_from(
+        select(Autor.nome)
+        .join(ArtigoAutor, ArtigoAutor.id_autor == Autor.id)
+        .where(ArtigoAutor.id_artigo == Artigo.id)
+        .order_by(ArtigoAutor.posicao)
+        .correlate(Artigo)  # sem isso o SQLAlchemy incluiria 'artigos' no FROM da subquery
+        .subquery()
+    )
+    .scalar_subquery()
+)
+
+
 @edition_router.get("/{nome_evento}/{ano}")
-async def get_edicao_por_evento_e_ano(nome_evento: str, ano: int, session: Session = Depends(pegar_sessao)):
+async def get_edicao_por_evento_e_ano(nome_evento: str, ano: int, request: Request, pagina: ParametrosPagina = Depends(),
+                                      session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
-    Retorna uma edição específica de um evento, incluindo seus artigos.
+    Retorna uma edição específica de um evento, incluindo seus artigos
+    (paginados por id; ver paginacao.py).
+    Evento, edição e artigos vêm de uma única query; o JSON pronto fica em
+    cache_respostas até alguma escrita na edição ou no evento.
+    Aceita GET condicional (If-None-Match / If-Modified-Since), ver versoes.py.
     """
-    evento = session.query(Evento).filter(Evento.nome.ilike(f"{nome_evento}")).first()
-    if not evento:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    versoes = await ler_versoes(session, TABELA_EVENTOS, TABELA_EDICOES, TABELA_ARTIGOS)
+    if requisicao_nao_modificada(request, versoes.etag, versoes.ultima_modificacao):
+        return Response(status_code=304, headers=versoes.headers())
+    chave = ("edicao", nome_evento.lower(), ano, pagina.cursor, pagina.limit, pagina.total)
+    em_cache = cache_respostas.obter(chave)
+    if em_cache:
+        return cache_respostas.resposta(em_cache, request)
+    geracao = cache_respostas.geracao()
 
-    edicao = session.query(EdicaoEvento).filter(
-        EdicaoEvento.id_evento == evento.id,
-        EdicaoEvento.ano == ano
-    ).first()
-
-    if not edicao:
+    # O cursor entra no ON do LEFT JOIN: a linha do evento/edição vem mesmo sem artigos restantes
+    filtro_artigos = Artigo.id_edicao == EdicaoEvento.id
+    if pagina.cursor:
+        filtro_artigos = and_(filtro_artigos, Artigo.id > decodificar_cursor(pagina.cursor, 1)[0])
+    stmt = (
+        select(
+            Evento.id, Evento.nome, EdicaoEvento.id, EdicaoEvento.local,
+            Artigo.id, Artigo.titulo, _autores_json, Artigo.nome_evento, Artigo.ano,
+            Artigo.pagina_inicial, Artigo.pagina_final, Artigo.caminho_pdf,
+            Artigo.booktitle, Artigo.publisher, Artigo.location,
+        )
+        .join(EdicaoEvento, EdicaoEvento.id_evento == Evento.id)
+        .outerjoin(Artigo, filtro_artigos)
+        .where(func.lower(Evento.nome) == func.lower(nome_evento), EdicaoEvento.ano == ano)
+        # Nomes/edições repetidos: vale o primeiro cadastrado, como antes
+        .order_by(Evento.id, EdicaoEvento.id, Artigo.id)
+        .limit(pagina.limit + 1)
+    )
+    linhas = (await session.execute(stmt)).all()
+    if not linhas:
+        if not await session.scalar(select(Evento.id).where(func.lower(Evento.nome) == func.lower(nome_evento)).limit(1)):
+            raise HTTPException(status_code=404, detail="Evento não encontrado")
         raise HTTPException(status_code=404, detail="Edição não encontrada")
 
-    artigos = session.query(Artigo).filter(Artigo.id_edicao == edicao.id).all()
+    id_evento, evento_nome, id_edicao, local = linhas[0][:4]
+    linhas = [l for l in linhas if l[2] == id_edicao and l[4] is not None]
+
+    headers = versoes.headers()
+    if len(linhas) > pagina.limit:
+        linhas = linhas[:pagina.limit]
+        headers[HEADER_PROXIMO_CURSOR] = codificar_cursor([linhas[-1][4]])
+    if pagina.total:
+        total = await session.scalar(select(func.count()).where(Artigo.id_edicao == id_edicao))
+        headers[HEADER_TOTAL] = str(total)
 
     edicao_data = {
-        "id": edicao.id,
-        "ano": edicao.ano,
-        "local": edicao.local,
-        "id_evento": edicao.id_evento,
-        "evento_nome": evento.nome,
+        "id": id_edicao,
+        "ano": ano,
+        "local": local,
+        "id_evento": id_evento,
+        "evento_nome": evento_nome,
         "artigos": [
             {
-                "id": artigo.id,
-                "titulo": artigo.titulo,
-                "autores": [autor.strip() for autor in artigo.autores.split(' and ')] if artigo.autores else [],
+                "id": id_artigo,
+                "titulo": titulo,
+                "autores": orjson.loads(autores),
                 "resumo": "Resumo não disponível.",
-                "nome_evento": artigo.nome_evento,
-                "ano": artigo.ano,
-                "pagina_inicial": artigo.pagina_inicial,
-                "pagina_final": artigo.pagina_final,
-                "caminho_pdf": artigo.caminho_pdf,
-                "booktitle": artigo.booktitle,
-                "publisher": artigo.publisher,
-                "location": artigo.location,
-                "id_edicao": artigo.id_edicao
-            } for artigo in artigos
+                "nome_evento": nome_evento_artigo,
+                "ano": ano_artigo,
+                "pagina_inicial": pagina_inicial,
+                "pagina_final": pagina_final,
+                "caminho_pdf": caminho_pdf,
+                "booktitle": booktitle,
+                "publisher": publisher,
+                "location": location,
+                "id_edicao": id_edicao
+            } for (_, _, _, _, id_artigo, titulo, autores, nome_evento_artigo, ano_artigo,
+                   pagina_inicial, pagina_final, caminho_pdf, booktitle, publisher, location) in linhas
         ]
     }
-    return edicao_data
\ No newline at end of file
+    return cache_respostas.responder(chave, edicao_data, [tag_evento(id_evento), tag_edicao(id_edicao)],
+                                     geracao, headers)
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from schemas import EventoSchema, EdicaoEventoSchema
-from dependencies import pegar_sessao, verificar_token
-from models import Evento, Usuario, EdicaoEvento
+from dependencies import pegar_sessao, pegar_sessao_leitura, verificar_token
+from models import Artigo, Evento, Usuario, EdicaoEvento
+from paginacao import ParametrosPagina, paginar, aplicar_headers
+from cache_respostas import cache_respostas, TAG_EVENTOS, tag_evento, tag_edicao
+from cache_http import requisicao_nao_modificada
+from versoes import ler_versoes, registrar_escrita, TABELA_EVENTOS, TABELA_EDICOES
 
 evento_router = APIRouter(prefix="/evento", tags=["evento"])
 
@@ -15,12 +21,12 @@ async def home():
     return {"mensagem": "Você acessou a rota padrão para eventos"}
 
 @evento_router.post("/")
-async def criar_evento(evento_schema: EventoSchema, session: Session = Depends(pegar_sessao),
+async def criar_evento(evento_schema: EventoSchema, session: AsyncSession = Depends(pegar_sessao),
                        usuario: Usuario = Depends(verificar_token)):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
     
-    evento = session.query(Evento).filter(Evento.nome == evento_schema.nome).first()
+    evento = await session.scalar(select(Evento).where(Evento.nome == evento_schema.nome).limit(1))
     if evento:
         raise HTTPException(status_code=400, detail="Já existe evento com esse nome")
     else:
@@ -29,30 +35,47 @@ async def criar_evento(evento_schema: EventoSchema, session: Session = Depends(p
         data['site'] = str(data['site']) if data.get('site') else None
         novo_evento = Evento(**data)
         session.add(novo_evento)
-        session.commit()
+        await registrar_escrita(session, TABELA_EVENTOS)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # ix_eventos_nome é único: outro cadastro com o mesmo nome chegou antes
+            await session.rollback()
+            raise HTTPException(status_code=400, detail="Já existe evento com esse nome")
+        cache_respostas.invalidar(TAG_EVENTOS)
         return {"mensagem": f"Evento {evento_schema.nome} criado com sucesso"}
     
 
 @evento_router.post("/remover/{nome_evento}")
-async def remover_evento(nome_evento: str, session: Session = Depends(pegar_sessao),
+async def remover_evento(nome_evento: str, session: AsyncSession = Depends(pegar_sessao),
                        usuario: Usuario = Depends(verificar_token)):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
-    evento = session.query(Evento).filter(Evento.nome == nome_evento).first()
+    evento = await session.scalar(select(Evento).where(Evento.nome == nome_evento).limit(1))
     if not evento:
         raise HTTPException(status_code=400, detail="Não existe evento com esse nome")
-    session.delete(evento)
-    session.commit()
+    # edicoes.id_evento é FOREIGN KEY (PRAGMA foreign_keys): as edições saem antes
+    if await session.scalar(select(EdicaoEvento.id).where(EdicaoEvento.id_evento == evento.id).limit(1)):
+        raise HTTPException(status_code=400, detail="O evento tem edições cadastradas; remova as edições antes")
+    await session.delete(evento)
+    await registrar_escrita(session, TABELA_EVENTOS)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Uma edição foi criada entre a checagem e o commit
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="O evento tem edições cadastradas; remova as edições antes")
+    cache_respostas.invalidar(TAG_EVENTOS, tag_evento(evento.id))
     return {"mensagem": f"Evento '{nome_evento}' removido com sucesso"}
 
 
 @evento_router.post("/editar/{id_evento}")
-async def editar_evento(id_evento: int, evento_schema: EventoSchema, session: Session = Depends(pegar_sessao),
+async def editar_evento(id_evento: int, evento_schema: EventoSchema, session: AsyncSession = Depends(pegar_sessao),
                        usuario: Usuario = Depends(verificar_token)):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
     
-    evento = session.query(Evento).filter(Evento.id == id_evento).first()
+    evento = await session.get(Evento, id_evento)
     if not evento:
         raise HTTPException(status_code=400, detail="Não existe evento com esse ID")
     
@@ -61,88 +84,129 @@ async def editar_evento(id_evento: int, evento_schema: EventoSchema, session: Se
     evento.descricao = evento_schema.descricao
     evento.site = str(evento_schema.site) if evento_schema.site else None
     evento.entidade_promotora = evento_schema.entidade_promotora
-    session.commit()
+    await registrar_escrita(session, TABELA_EVENTOS)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Já existe evento com esse nome")
+    cache_respostas.invalidar(TAG_EVENTOS, tag_evento(id_evento))
     return {"mensagem": f"Evento '{evento_schema.nome}' editado com sucesso"}
 
 
 @evento_router.post("/edicao/")
-async def nova_edicao(edicao_schema: EdicaoEventoSchema, sessao: Session = Depends(pegar_sessao),
+async def nova_edicao(edicao_schema: EdicaoEventoSchema, sessao: AsyncSession = Depends(pegar_sessao),
                       usuario: Usuario = Depends(verificar_token)):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
     
-    evento = sessao.query(Evento).filter(Evento.id == edicao_schema.id_evento).first()
+    evento = await sessao.get(Evento, edicao_schema.id_evento)
     if not evento:
         raise HTTPException(status_code=400, detail="Evento não encontrado")
     
     edicao = EdicaoEvento(**edicao_schema.model_dump())
     sessao.add(edicao)
-    sessao.commit()
+    await registrar_escrita(sessao, TABELA_EDICOES)
+    await sessao.commit()
+    cache_respostas.invalidar(tag_evento(evento.id))
 
     return {"mensagem": f"Nova edição do evento {evento.nome} criada"}
 
 @evento_router.post("/edicao/remover/{id_edicao}")
-async def remover_edicao(id_edicao: int, sessao: Session = Depends(pegar_sessao),
+async def remover_edicao(id_edicao: int, sessao: AsyncSession = Depends(pegar_sessao),
                       usuario: Usuario = Depends(verificar_token)):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
     
-    edicao = sessao.query(EdicaoEvento).filter(EdicaoEvento.id == id_edicao).first()
+    edicao = await sessao.get(EdicaoEvento, id_edicao)
     if not edicao:
         raise HTTPException(status_code=400, detail="Edicao não encontrado")
     
-    evento = sessao.query(Evento).filter(Evento.id == edicao .id_evento).first()
-    sessao.delete(edicao)
-    sessao.commit()
+    evento = await sessao.get(Evento, edicao.id_evento)
+    # artigos.id_edicao é FOREIGN KEY (PRAGMA foreign_keys): os artigos saem antes
+    if await sessao.scalar(select(Artigo.id).where(Artigo.id_edicao == id_edicao).limit(1)):
+        raise HTTPException(status_code=400, detail="A edição tem artigos cadastrados; remova os artigos antes")
+    await sessao.delete(edicao)
+    await registrar_escrita(sessao, TABELA_EDICOES)
+    try:
+        await sessao.commit()
+    except IntegrityError:
+        await sessao.rollback()
+        raise HTTPException(status_code=400, detail="A edição tem artigos cadastrados; remova os artigos antes")
+    cache_respostas.invalidar(tag_evento(evento.id), tag_edicao(id_edicao))
     return {'mensagem': f"Removido edição {id_edicao} do evento {evento.nome}"}
 
 
 @evento_router.post("/edicao/editar/{id_edicao}")
-async def editar_edicao(id_edicao: int, edicao_schema: EdicaoEventoSchema, session: Session = Depends(pegar_sessao),
+async def editar_edicao(id_edicao: int, edicao_schema: EdicaoEventoSchema, session: AsyncSession = Depends(pegar_sessao),
                        usuario: Usuario = Depends(verificar_token)):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para fazer essa modificação")
     
-    edicao = session.query(EdicaoEvento).filter(EdicaoEvento.id == id_edicao).first()
+    edicao = await session.get(EdicaoEvento, id_edicao)
     if not edicao:
         raise HTTPException(status_code=400, detail="Não existe edicao com esse ID")
     
-    evento = session.query(Evento).filter(Evento.id == edicao_schema.id_evento).first()
+    evento = await session.get(Evento, edicao_schema.id_evento)
     if not evento:
         raise HTTPException(status_code=400, detail=f"Não existe evento de ID {edicao_schema.id_evento}")
     
+    id_evento_antigo = edicao.id_evento
     edicao.ano = edicao_schema.ano
     edicao.local = edicao_schema.local
     edicao.id_evento = edicao_schema.id_evento
-    session.commit()
+    await registrar_escrita(session, TABELA_EDICOES)
+    await session.commit()
+    cache_respostas.invalidar(tag_evento(id_evento_antigo), tag_evento(edicao.id_evento), tag_edicao(id_edicao))
     return {"mensagem": f"Edição {id_edicao} editada com sucesso"}
 
 @evento_router.get("/recentes")
-async def listar_eventos_recentes(session: Session = Depends(pegar_sessao)):
+async def listar_eventos_recentes(request: Request, session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
     Lista os 5 eventos mais recentes adicionados ao banco de dados.
+    Aceita GET condicional (If-None-Match / If-Modified-Since), ver versoes.py.
     """
-    eventos = session.query(Evento).order_by(Evento.id.desc()).limit(5).all()
-    return eventos
+    versoes = await ler_versoes(session, TABELA_EVENTOS)
+    if requisicao_nao_modificada(request, versoes.etag, versoes.ultima_modificacao):
+        return Response(status_code=304, headers=versoes.headers())
+    chave = ("eventos_recentes",)
+    em_cache = cache_respostas.obter(chave)
+    if em_cache:
+        return cache_respostas.resposta(em_cache, request)
+    geracao = cache_respostas.geracao()
+    eventos = (await session.scalars(select(Evento).order_by(Evento.id.desc()).limit(5))).all()
+    return cache_respostas.responder(chave, eventos, [TAG_EVENTOS], geracao, versoes.headers())
 
 @evento_router.get("/search")
-async def pesquisar_eventos(q: str, session: Session = Depends(pegar_sessao)):
+async def pesquisar_eventos(q: str, response: Response, pagina: ParametrosPagina = Depends(),
+                            session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
-    Pesquisa por eventos cujo nome contém a substring `q`.
+    Pesquisa por eventos cujo nome contém a substring `q`, paginada por id.
     """
-    eventos = session.query(Evento).filter(Evento.nome.ilike(f"%{q}%")).all()
+    stmt = select(Evento).where(Evento.nome.ilike(f"%{q}%"))
+    eventos, proximo, total = await paginar(session, stmt, [Evento.id], pagina)
+    aplicar_headers(response, proximo, total)
     return eventos
 
 @evento_router.get("/{nome_evento}")
-async def get_evento_por_nome(nome_evento: str, session: Session = Depends(pegar_sessao)):
+async def get_evento_por_nome(nome_evento: str, request: Request, session: AsyncSession = Depends(pegar_sessao_leitura)):
     """
     Retorna um evento específico pelo nome, incluindo suas edições.
+    Aceita GET condicional (If-None-Match / If-Modified-Since), ver versoes.py.
     """
-    evento = session.query(Evento).filter(Evento.nome.ilike(f"{nome_evento}")).first()
+    versoes = await ler_versoes(session, TABELA_EVENTOS, TABELA_EDICOES)
+    if requisicao_nao_modificada(request, versoes.etag, versoes.ultima_modificacao):
+        return Response(status_code=304, headers=versoes.headers())
+    chave = ("evento", nome_evento.lower())
+    em_cache = cache_respostas.obter(chave)
+    if em_cache:
+        return cache_respostas.resposta(em_cache, request)
+    geracao = cache_respostas.geracao()
+    evento = await session.scalar(select(Evento).where(func.lower(Evento.nome) == func.lower(nome_evento)).limit(1))
     if not evento:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
 
-    edicoes = session.query(EdicaoEvento).filter(EdicaoEvento.id_evento == evento.id).order_by(EdicaoEvento.ano.desc()).all()
+    edicoes = (await session.scalars(select(EdicaoEvento).where(EdicaoEvento.id_evento == evento.id).order_by(EdicaoEvento.ano.desc()))).all()
 
     evento_data = {
         "id": evento.id,
@@ -160,4 +224,4 @@ async def get_evento_por_nome(nome_evento: str, session: Session = Depends(pegar
             } for edicao in edicoes
         ]
     }
-    return evento_data
+    return cache_respostas.responder(chave, evento_data, [tag_evento(evento.id)], geracao, versoes.headers())
@@ -0,0 +1,16 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response
+
+import metricas
+
+metricas_router = APIRouter(tags=["metricas"])
+
+
+@metricas_router.get('/metrics', include_in_schema=False)
+async def exportar_metricas(authorization: Optional[str] = Header(None)):
+    """Métricas deste processo no formato texto do Prometheus (ver metricas.py)."""
+    if metricas.METRICAS_TOKEN and authorization != f"Bearer {metricas.METRICAS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    return Response(metricas.exportar(), media_type=metricas.TIPO_CONTEUDO)
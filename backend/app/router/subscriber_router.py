@@ -1,37 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from schemas import SubscriberSchema, ResponseSubscriberSchema
-from dependencies import pegar_sessao, verificar_token
+from dependencies import pegar_sessao, pegar_sessao_leitura, verificar_token
 from models import Subscriber, Usuario
+from autores import slug_autor
+from paginacao import ParametrosPagina, paginar, aplicar_headers
 
 subscriber_router = APIRouter(prefix="/subscriber", tags=["subscriber"])
 
 @subscriber_router.post("/", response_model=ResponseSubscriberSchema)
-async def subscribe(subscriber: SubscriberSchema, session: Session = Depends(pegar_sessao)):
-    existing = session.query(Subscriber).filter(Subscriber.email == subscriber.email).first()
+async def subscribe(subscriber: SubscriberSchema, session: AsyncSession = Depends(pegar_sessao)):
+    existing = await session.scalar(select(Subscriber).where(Subscriber.email == subscriber.email).limit(1))
     if existing:
         raise HTTPException(status_code=400, detail="Já existe um assinante com esse email")
-    novo = Subscriber(subscriber.nome, subscriber.email)
+    novo = Subscriber(subscriber.nome, subscriber.email, slug_autor(subscriber.nome))
     session.add(novo)
-    session.commit()
-    session.refresh(novo)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # ix_subscribers_email é único (inscrições simultâneas com o mesmo email)
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Já existe um assinante com esse email")
     return {"id": novo.id, "nome": novo.nome, "email": novo.email}
 
 @subscriber_router.get("/", response_model=List[ResponseSubscriberSchema])
-async def list_subscribers(session: Session = Depends(pegar_sessao), usuario: Usuario = Depends(verificar_token)):
+async def list_subscribers(response: Response, pagina: ParametrosPagina = Depends(),
+                           session: AsyncSession = Depends(pegar_sessao_leitura), usuario: Usuario = Depends(verificar_token)):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para acessar esta rota")
-    subs = session.query(Subscriber).all()
+    subs, proximo, total = await paginar(session, select(Subscriber), [Subscriber.id], pagina)
+    aplicar_headers(response, proximo, total)
     return [{"id": s.id, "nome": s.nome, "email": s.email} for s in subs]
 
 @subscriber_router.delete("/{subscriber_id}")
-async def unsubscribe(subscriber_id: int, session: Session = Depends(pegar_sessao), usuario: Usuario = Depends(verificar_token)):
+async def unsubscribe(subscriber_id: int, session: AsyncSession = Depends(pegar_sessao), usuario: Usuario = Depends(verificar_token)):
     if not usuario.admin:
         raise HTTPException(status_code=401, detail="Você não tem autorização para executar esta ação")
-    s = session.query(Subscriber).filter(Subscriber.id == subscriber_id).first()
+    s = await session.get(Subscriber, subscriber_id)
     if not s:
         raise HTTPException(status_code=404, detail="Assinante não encontrado")
-    session.delete(s)
-    session.commit()
+    await session.delete(s)
+    await session.commit()
     return {"mensagem": "Assinante removido"}
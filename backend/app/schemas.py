@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, EmailStr, AnyUrl
-from typing import Optional
+from pydantic import BaseModel, Field, EmailStr, AnyUrl, model_validator
+from typing import List, Literal, Optional
 
 class UsuarioSchema(BaseModel):
     nome: str = Field(..., min_length=3, max_length=50, description="Nome Sobrenome")
@@ -106,6 +106,35 @@ class ResponseArtigoSchema(BaseModel):
         from_attributes = True
 
 
+# Operações por chamada de POST /artigo/batch
+MAX_OPERACOES_LOTE = 1000
+
+class OperacaoArtigoSchema(BaseModel):
+    """
+    Uma operação do lote de artigos. 'criar' usa `artigo`; 'editar' usa `id` e
+    `artigo` (substitui os metadados, como /artigo/artigo/editar); 'remover' usa `id`.
+    `sha256_pdf` aponta para um PDF já armazenado (pdf_blobs) em vez de enviar o arquivo.
+    """
+    op: Literal["criar", "editar", "remover"]
+    id: Optional[int] = Field(None, description="ID do artigo (editar/remover)")
+    artigo: Optional[ArtigoSchema] = Field(None, description="Metadados do artigo (criar/editar); caminho_pdf é ignorado")
+    sha256_pdf: Optional[str] = Field(None, description="SHA-256 de um PDF já armazenado (criar/editar)")
+
+    @model_validator(mode="after")
+    def _campos_da_operacao(self):
+        if self.op != "criar" and self.id is None:
+            raise ValueError(f"A operação '{self.op}' exige 'id'")
+        if self.op != "remover" and self.artigo is None:
+            raise ValueError(f"A operação '{self.op}' exige 'artigo'")
+        return self
+
+class LoteArtigosSchema(BaseModel):
+    modo: Literal["tudo_ou_nada", "melhor_esforco"] = Field(
+        "tudo_ou_nada", description="tudo_ou_nada: qualquer operação inválida cancela o lote; "
+                                    "melhor_esforco: aplica as válidas e relata as demais")
+    operacoes: List[OperacaoArtigoSchema] = Field(..., min_length=1, max_length=MAX_OPERACOES_LOTE)
+
+
 class SubscriberSchema(BaseModel):
     nome: str = Field(..., description="Nome do assinante, ex: Silva, Pedro ou Pedro Silva")
     email: EmailStr
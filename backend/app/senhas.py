@@ -0,0 +1,62 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+from main import bcrypt_context
+
+# O bcrypt libera o GIL, então um pool de threads basta para tirar o custo (~200ms
+# por chamada) do event loop sem bloquear as outras rotas.
+TRABALHADORES = int(os.getenv('SENHAS_TRABALHADORES', str(min(4, os.cpu_count() or 1))))
+FILA_MAXIMA = int(os.getenv('SENHAS_FILA_MAX', '32'))   # chamadas esperando além das em execução
+# Regrava o hash no login quando o custo salvo difere de BCRYPT_ROUNDS
+REHASH_NO_LOGIN = os.getenv('SENHAS_REHASH_LOGIN', '0').lower() in ('1', 'true', 'sim')
+
+
+class PoolSenhas:
+    """
+    Executa hash/verificação de senha em threads dedicadas, com limite de fila.
+    Quando há mais de `trabalhadores + fila_maxima` chamadas pendentes, recusa
+    com 503 em vez de acumular requisições indefinidamente.
+    Usada apenas a partir do event loop, por isso o contador dispensa lock.
+    """
+
+    def __init__(self, trabalhadores: int = TRABALHADORES, fila_maxima: int = FILA_MAXIMA):
+        self.trabalhadores = max(1, trabalhadores)
+        self.limite = self.trabalhadores + max(0, fila_maxima)
+        self.pendentes = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def _executar(self, funcao, *args):
+        if self.pendentes >= self.limite:
+            raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente em instantes",
+                                headers={"Retry-After": "1"})
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.trabalhadores, thread_name_prefix="bcrypt")
+        self.pendentes += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, funcao, *args)
+        finally:
+            self.pendentes -= 1
+
+    async def gerar_hash(self, senha: str) -> str:
+        return await self._executar(bcrypt_context.hash, senha)
+
+    async def verificar(self, senha: str, hash_senha: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica a senha. Com SENHAS_REHASH_LOGIN ligado e o hash fora do custo
+        configurado, devolve também o novo hash a ser gravado (senão None).
+        """
+        if not REHASH_NO_LOGIN:
+            return await self._executar(bcrypt_context.verify, senha, hash_senha), None
+        return await self._executar(bcrypt_context.verify_and_update, senha, hash_senha)
+
+    def encerrar(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+pool_senhas = PoolSenhas()
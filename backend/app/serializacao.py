@@ -0,0 +1,68 @@
+"""
+Serialização rápida das respostas JSON.
+
+RespostaJSON é a classe de resposta padrão da API (main.py): escreve com orjson
+e só recorre ao jsonable_encoder do FastAPI para o que o orjson não conhece
+(modelos Pydantic, objetos ORM). As rotas de artigos selecionam tuplas de
+colunas (COLUNAS_ARTIGO) em vez de objetos ORM e montam os dicts com
+linhas_para_dicts, sem passar pelo Pydantic a cada linha. O parâmetro `fields`
+(campos_artigo) restringe essas colunas no próprio SQL.
+"""
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from metricas import registrar_serializacao
+from models import Artigo
+from schemas import ResponseArtigoSchema
+
+# Mesmos campos e mesma ordem de ResponseArtigoSchema
+CAMPOS_ARTIGO = tuple(ResponseArtigoSchema.model_fields)
+COLUNAS_ARTIGO = [getattr(Artigo, campo) for campo in CAMPOS_ARTIGO]
+
+
+def campos_artigo(
+    fields: Optional[str] = Query(None, description="Campos do artigo a devolver, separados por vírgula "
+                                                     f"(ex: 'id,titulo,autores,ano'). Válidos: {', '.join(CAMPOS_ARTIGO)}. Se omitido, devolve todos"),
+) -> Tuple[str, ...]:
+    """
+    Dependência das listagens de artigos ("sparse fieldsets"). Retorna os campos
+    pedidos na ordem de ResponseArtigoSchema, para que 'ano,titulo' e
+    'titulo,ano' gerem o mesmo SQL e a mesma chave de cache.
+    """
+    if not fields or not fields.strip():
+        return CAMPOS_ARTIGO
+    pedidos = {f.strip() for f in fields.split(",") if f.strip()}
+    invalidos = pedidos - set(CAMPOS_ARTIGO)
+    if invalidos:
+        raise HTTPException(status_code=400, detail=f"Campo(s) inválido(s) em fields: {', '.join(sorted(invalidos))}. "
+                                                    f"Use: {', '.join(CAMPOS_ARTIGO)}")
+    return tuple(c for c in CAMPOS_ARTIGO if c in pedidos)
+
+
+def colunas_artigo(campos: Sequence[str]) -> List[Any]:
+    return [getattr(Artigo, campo) for campo in campos]
+
+
+def _padrao(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return jsonable_encoder(obj)
+
+
+class RespostaJSON(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        inicio = perf_counter()
+        corpo = orjson.dumps(content, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+        registrar_serializacao(perf_counter() - inicio)   # "serialize" do Server-Timing
+        return corpo
+
+
+def linhas_para_dicts(linhas: Iterable[Sequence], campos: Sequence[str] = CAMPOS_ARTIGO) -> List[Dict[str, Any]]:
+    """Tuplas de colunas -> dicts na ordem de `campos` (sem hidratar objetos ORM)."""
+    return [dict(zip(campos, linha)) for linha in linhas]
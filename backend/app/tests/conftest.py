@@ -0,0 +1,45 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# Os módulos da API são importados pelo nome (como em main.py), a partir de backend/app
+PASTA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PASTA_APP not in sys.path:
+    sys.path.insert(0, PASTA_APP)
+
+# banco.py e importacoes.py leem estas variáveis ao serem importados: os testes
+# usam uma pasta temporária, nunca o banco.db e as importações do repositório
+PASTA_TESTES = tempfile.mkdtemp(prefix="testes_api_")
+os.environ["BANCO_ARQUIVO"] = os.path.join(PASTA_TESTES, "banco.db")
+os.environ["IMPORTACOES_PASTA"] = os.path.join(PASTA_TESTES, "importacoes")
+
+
+def migrar_copia(destino) -> str:
+    """
+    Copia o banco.db do repositório para `destino` e migra até head (as
+    migrações antigas não criam o esquema a partir do zero). Devolve a URL.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    shutil.copyfile(os.path.join(PASTA_APP, "banco.db"), destino)
+    url = f"sqlite:///{destino}"
+    # Sem o alembic.ini: o fileConfig do env.py desligaria os loggers já criados
+    config = Config()
+    config.set_main_option("script_location", os.path.join(PASTA_APP, "alembic"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+    return url
+
+
+@pytest.fixture(scope="session")
+def banco_migrado() -> str:
+    """O banco de BANCO_ARQUIVO (usado pelos engines de banco.py), migrado uma vez por sessão."""
+    return migrar_copia(os.environ["BANCO_ARQUIVO"])
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(PASTA_TESTES, ignore_errors=True)
@@ -0,0 +1,72 @@
+"""
+Índice FTS5 dos artigos (busca.py, migração b7e2c91d4a10): os triggers mantêm
+'artigos_fts' em dia com INSERT/UPDATE/DELETE em 'artigos', e 'campo:termo'
+restringe o termo às colunas do campo. Cada teste roda numa transação desfeita
+no fim (os triggers disparam dentro dela).
+"""
+import pytest
+from sqlalchemy.orm import Session
+
+from busca import filtrar_por_fts, montar_consulta_fts
+from models import Artigo
+
+
+@pytest.fixture
+def sessao(banco_migrado):
+    from banco import db
+    with Session(db) as sessao:
+        yield sessao
+        sessao.rollback()
+
+
+@pytest.fixture
+def artigo(sessao):
+    artigo = Artigo("Quasarologia aplicada a testes", "Quimeraldo Fonseca and Ana Souza", "Evento Zirconico")
+    sessao.add(artigo)
+    sessao.flush()
+    return artigo
+
+
+def _buscar(sessao, q, campos=None):
+    return [id_artigo for id_artigo, in filtrar_por_fts(sessao.query(Artigo.id), montar_consulta_fts(q, campos), Artigo.id)]
+
+
+def test_migracao_indexa_os_artigos_existentes(sessao):
+    id_artigo, titulo = sessao.query(Artigo.id, Artigo.titulo).order_by(Artigo.id).first()
+    palavra = max(titulo.split(), key=len).strip(".,:;!?()")
+    assert id_artigo in _buscar(sessao, palavra)
+
+
+def test_insert_entra_no_indice(sessao, artigo):
+    assert _buscar(sessao, "quasarolog") == [artigo.id]
+    assert _buscar(sessao, "zirconico") == [artigo.id]
+
+
+def test_update_troca_os_termos(sessao, artigo):
+    artigo.titulo = "Blorptastica revisitada"
+    sessao.flush()
+    assert _buscar(sessao, "quasarologia") == []
+    assert _buscar(sessao, "blorptastica") == [artigo.id]
+
+
+def test_delete_sai_do_indice(sessao, artigo):
+    sessao.delete(artigo)
+    sessao.flush()
+    assert _buscar(sessao, "quasarologia") == []
+
+
+def test_busca_por_campo(sessao, artigo):
+    assert _buscar(sessao, "autor:quimeraldo") == [artigo.id]
+    assert _buscar(sessao, "titulo:quimeraldo") == []
+    assert _buscar(sessao, "quimeraldo", campos=["titulo"]) == []
+    assert _buscar(sessao, "evento:zirconico quasar") == [artigo.id]
+
+
+@pytest.mark.parametrize("q, campos, esperado", [
+    ("valente", None, '("valente"*)'),
+    ("autor:valente smell", None, '("smell"*) AND (autores : ("valente"*))'),
+    ("smell", ["evento"], '({nome_evento booktitle} : ("smell"*))'),
+    ('" autor:', None, None),
+])
+def test_montar_consulta_fts(q, campos, esperado):
+    assert montar_consulta_fts(q, campos) == esperado
@@ -0,0 +1,82 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import diagnostico_consultas
+from diagnostico_consultas import MiddlewareDiagnostico, OrcamentoConsultasExcedido, escopo, instrumentar_engine
+
+
+@pytest.fixture
+def estrito(monkeypatch):
+    # O modo vem de DIAGNOSTICO_CONSULTAS na importação; aqui é ligado só para o teste
+    monkeypatch.setattr(diagnostico_consultas, "ATIVO", True)
+    monkeypatch.setattr(diagnostico_consultas, "ESTRITO", True)
+    monkeypatch.setattr(diagnostico_consultas, "MAX_REPETICOES", 5)
+    monkeypatch.setattr(diagnostico_consultas, "MAX_CONSULTAS", 0)
+
+
+@pytest.fixture
+def engine():
+    # Uma conexão só: o banco em memória precisa ser o mesmo na thread da rota
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    instrumentar_engine(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE itens (id INTEGER PRIMARY KEY, nome TEXT)"))
+        conn.execute(text("INSERT INTO itens (nome) VALUES (:nome)"), [{"nome": f"item {i}"} for i in range(10)])
+    return engine
+
+
+def _uma_por_item(engine, quantidade: int) -> None:
+    with engine.connect() as conn:
+        for i in range(1, quantidade + 1):
+            conn.execute(text("SELECT nome FROM itens WHERE id = :id"), {"id": i})
+
+
+def test_estrito_acusa_n_mais_1(estrito, engine, caplog):
+    with caplog.at_level(logging.WARNING, logger="diagnostico_consultas"):
+        with pytest.raises(OrcamentoConsultasExcedido, match="6x a mesma consulta"):
+            with escopo("bloco de teste"):
+                _uma_por_item(engine, 6)
+    assert "N+1? 6x" in caplog.text
+
+
+def test_estrito_aceita_consulta_em_lote(estrito, engine):
+    with escopo("bloco de teste") as relatorio:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT nome FROM itens WHERE id IN (1, 2, 3, 4, 5, 6)")).all()
+    assert relatorio.total == 1
+    assert relatorio.problemas() == []
+
+
+def test_estrito_acusa_limite_de_consultas(estrito, engine, monkeypatch):
+    monkeypatch.setattr(diagnostico_consultas, "MAX_CONSULTAS", 3)
+    with pytest.raises(OrcamentoConsultasExcedido, match="4 consultas"):
+        with escopo("bloco de teste"):
+            with engine.connect() as conn:
+                for tabela in ("itens", "sqlite_master", "itens", "sqlite_master"):
+                    conn.execute(text(f"SELECT count(*) FROM {tabela}"))
+
+
+def test_estrito_falha_a_requisicao(estrito, engine):
+    app = FastAPI()
+
+    @app.get("/itens")
+    def listar():
+        _uma_por_item(engine, 8)
+        return []
+
+    app.add_middleware(MiddlewareDiagnostico)
+    with TestClient(app) as cliente:
+        with pytest.raises(OrcamentoConsultasExcedido, match="GET /itens"):
+            cliente.get("/itens")
+
+
+def test_desligado_nao_registra(engine, monkeypatch):
+    monkeypatch.setattr(diagnostico_consultas, "ATIVO", False)
+    with escopo("bloco de teste") as relatorio:
+        _uma_por_item(engine, 8)
+    assert relatorio is None
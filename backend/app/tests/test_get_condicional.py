@@ -0,0 +1,74 @@
+"""
+GET condicional (versoes.py): o ETag de uma rota só muda com escritas nas
+tabelas de que ela depende. Escritas em outras tabelas continuam dando 304;
+escritas nas dela dão 200 com o dado novo (o cache de respostas também é
+invalidado).
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+@pytest.fixture(scope="module")
+def cliente(banco_migrado):
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def admin(cliente):
+    email = f"admin-{uuid.uuid4().hex[:8]}@example.com"
+    resposta = cliente.post("/auth/criar_conta", json={"nome": "Admin Testes", "email": email,
+                                                       "senha": "senha-teste", "admin": True})
+    assert resposta.status_code == 200, resposta.text
+    token = cliente.post("/auth/login", json={"email": email, "senha": "senha-teste"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def evento(cliente, admin):
+    nome = f"Evento Condicional {uuid.uuid4().hex[:8]}"
+    assert cliente.post("/evento/", json={"nome": nome}, headers=admin).status_code == 200
+    return next(e for e in cliente.get("/evento/recentes").json() if e["nome"] == nome)
+
+
+def _condicional(cliente, rota, etag):
+    return cliente.get(rota, headers={"If-None-Match": etag})
+
+
+def test_escrita_em_outra_tabela_mantem_o_304(cliente, admin, evento):
+    recentes = cliente.get("/evento/recentes")
+    pagina_evento = cliente.get(f"/evento/{evento['nome']}")
+    assert _condicional(cliente, "/evento/recentes", recentes.headers["ETag"]).status_code == 304
+
+    # Nova edição: muda 'edicoes', não 'eventos'
+    resposta = cliente.post("/evento/edicao/", json={"ano": 2024, "id_evento": evento["id"]}, headers=admin)
+    assert resposta.status_code == 200, resposta.text
+
+    assert _condicional(cliente, "/evento/recentes", recentes.headers["ETag"]).status_code == 304
+    # A página do evento lista as edições: essa muda
+    depois = _condicional(cliente, f"/evento/{evento['nome']}", pagina_evento.headers["ETag"])
+    assert depois.status_code == 200
+    assert [e["ano"] for e in depois.json()["edicoes"]] == [2024]
+
+
+def test_escrita_na_tabela_da_rota_da_200(cliente, admin, evento):
+    recentes = cliente.get("/evento/recentes")
+    assert _condicional(cliente, "/evento/recentes", recentes.headers["ETag"]).status_code == 304
+
+    nome = f"Outro Evento Condicional {uuid.uuid4().hex[:8]}"
+    assert cliente.post("/evento/", json={"nome": nome}, headers=admin).status_code == 200
+
+    depois = _condicional(cliente, "/evento/recentes", recentes.headers["ETag"])
+    assert depois.status_code == 200
+    assert depois.headers["ETag"] != recentes.headers["ETag"]
+    assert depois.json()[0]["nome"] == nome
+
+
+def test_if_modified_since(cliente):
+    recentes = cliente.get("/evento/recentes")
+    resposta = cliente.get("/evento/recentes", headers={"If-Modified-Since": recentes.headers["Last-Modified"]})
+    assert resposta.status_code == 304
+    assert resposta.headers["ETag"] == recentes.headers["ETag"]
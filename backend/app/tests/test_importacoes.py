@@ -0,0 +1,100 @@
+"""
+Jobs de importação BibTeX (importacoes.py): retomada de um job interrompido no
+meio, a partir do último bloco gravado, e a reserva por um único UPDATE
+condicional (cada job pendente vai para um só consumidor). Os workers usam
+sessões próprias com commit, sobre o banco temporário dos testes.
+"""
+import asyncio
+import threading
+import uuid
+from io import BytesIO
+
+import pytest
+from sqlalchemy.orm import Session
+
+import armazenamento
+import importacoes
+from benchmarks.catalogo import gerar_bibtex, gerar_zip_pdfs
+from models import Artigo, EdicaoEvento, Evento, ImportacaoBibtex
+
+
+@pytest.fixture
+def sessao(banco_migrado, tmp_path, monkeypatch):
+    from banco import db
+    # Os PDFs importados vão para uma pasta temporária, não para a pdfs/ do repositório
+    monkeypatch.setattr(armazenamento, "PDF_UPLOAD_DIR", str(tmp_path / "pdfs"))
+    with Session(db) as sessao:
+        yield sessao
+
+
+@pytest.fixture
+def edicao(sessao):
+    evento = Evento(f"Evento Importacao {uuid.uuid4().hex[:8]}")
+    sessao.add(evento)
+    sessao.flush()
+    sessao.add(EdicaoEvento(2024, evento.id))
+    sessao.commit()
+    return evento.nome, 2024
+
+
+def _novo_job(sessao, arquivo="entrada.bib") -> int:
+    job = importacoes.nova_importacao(None, arquivo)
+    sessao.add(job)
+    sessao.commit()
+    return job.id
+
+
+def test_job_interrompido_continua_do_ultimo_bloco(sessao, edicao):
+    prefixo = f"ret{uuid.uuid4().hex[:6]}"
+    bibtex, chaves = gerar_bibtex(*edicao, 20, prefixo)
+    id_job = _novo_job(sessao)
+    importacoes.gravar_arquivos(id_job, BytesIO(bibtex), BytesIO(gerar_zip_pdfs(chaves)))
+
+    # Primeira execução: dois blocos de 7 e o processo "cai" antes do terceiro
+    worker = importacoes.WorkerImportacoes(tamanho_lote=7)
+    assert worker._reservar() == id_job
+    execucao = worker._abrir(id_job)
+    worker._processar_bloco(execucao)
+    worker._processar_bloco(execucao)
+    execucao.fechar()
+
+    job = sessao.get(ImportacaoBibtex, id_job)
+    assert (job.status, job.processadas, job.cadastrados) == ("processando", 14, 14)
+    assert 0 < job.bytes_lidos <= job.tamanho_bibtex
+
+    # Nova subida: o job volta para a fila e segue da entrada 14
+    retomada = importacoes.WorkerImportacoes(tamanho_lote=7)
+    retomada._recuperar_interrompidas()
+    assert asyncio.run(retomada.processar_pendentes()) == 1
+
+    sessao.expire_all()
+    job = sessao.get(ImportacaoBibtex, id_job)
+    assert (job.status, job.processadas, job.total_entradas) == ("concluida", 20, 20)
+    assert (job.cadastrados, job.pulados) == (20, 0)
+    titulos = [t for t, in sessao.query(Artigo.titulo).filter(Artigo.titulo.like(f"% {prefixo} %"))]
+    assert len(titulos) == len(set(titulos)) == 20
+
+
+def test_reserva_entrega_cada_job_a_um_so_worker(sessao):
+    ids = {_novo_job(sessao, "concorrente.bib") for _ in range(3)}
+    workers = [importacoes.WorkerImportacoes() for _ in range(6)]
+    largada = threading.Barrier(len(workers))
+    reservados = []
+
+    def reservar(worker):
+        largada.wait()
+        reservados.append(worker._reservar())
+
+    threads = [threading.Thread(target=reservar, args=(w,)) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(i for i in reservados if i is not None) == sorted(ids)
+    assert reservados.count(None) == 3
+    for id_job in ids:
+        job = sessao.get(ImportacaoBibtex, id_job)
+        assert job.status == "processando" and job.iniciado_em is not None
+    # Fila vazia: nada mais a reservar
+    assert workers[0]._reservar() is None
@@ -0,0 +1,57 @@
+import io
+
+import bibtexparser
+import pytest
+from bibtexparser.bparser import BibTexParser
+
+import leitor_bibtex
+
+BIBTEX = """﻿% comentário solto { sem fechar
+@string{sbes = "Simpósio Brasileiro de Engenharia de Software"}
+@inproceedings{e1,\r
+  title = {Primeiro artigo do arquivo},\r
+  author = {Ana Souza and Bruno Lima},\r
+  booktitle = sbes,\r
+  year = 2024, month = jan, pages = {10--20},\r
+}
+@comment{qualquer {coisa}}
+@inproceedings{e2,
+\ttitle = {Segundo artigo
+   @ com arroba no início de uma linha},
+  author = {Carla Dias}, booktitle = {SBES}, year = {2023}
+}
+@inproceedings{e3, title = {Ano que não é número}, author = {Davi}, booktitle = {SBES}, year = {vinte}}
+@inproceedings{e4, title = {Chave que não fecha, author = {Davi},
+@inproceedings{e5, title = {Último artigo do arquivo}, author = {Eva}, booktitle = sbes # { 2021}, year = 2021}
+"""
+
+
+def _ler(texto: str, monkeypatch, bloco: int, leitura: int = 7):
+    monkeypatch.setattr(leitor_bibtex, "TAMANHO_BLOCO", bloco)
+    monkeypatch.setattr(leitor_bibtex, "TAMANHO_LEITURA", leitura)
+    return list(leitor_bibtex.iterar_artigos(io.BytesIO(texto.encode()), pool=None))
+
+
+@pytest.mark.parametrize("bloco", [10 ** 6, 200])
+def test_mesmas_entradas_que_o_bibtexparser(monkeypatch, bloco):
+    referencia = bibtexparser.loads(BIBTEX.lstrip("﻿"), BibTexParser(common_strings=True)).entries
+    artigos = _ler(BIBTEX, monkeypatch, bloco)
+    assert [chave for _, chave in artigos] == [e["ID"] for e in referencia] == ["e1", "e2", "e3", "e5"]
+    e1, e2, e3, e5 = (artigo for artigo, _ in artigos)
+    assert (e1.nome_evento, e1.ano, e1.pagina_inicial, e1.pagina_final) == (
+        "Simpósio Brasileiro de Engenharia de Software", 2024, 10, 20)
+    assert e2.titulo.endswith("com arroba no início de uma linha")
+    assert e3 is None
+    assert e5.nome_evento == "Simpósio Brasileiro de Engenharia de Software 2021"
+
+
+def test_string_nao_definida_pula_so_a_entrada(monkeypatch):
+    texto = BIBTEX.replace("booktitle = {SBES}, year = {2023}", "booktitle = naodefinida, year = {2023}")
+    artigos = _ler(texto, monkeypatch, 10 ** 6)
+    assert [(chave, artigo is None) for artigo, chave in artigos] == [
+        ("e1", False), ("e2", True), ("e3", True), ("e5", False)]
+
+
+def test_elementos_cortados_fora_de_chaves():
+    elementos = list(leitor_bibtex.ler_elementos(["lixo {\n@a{x,\n t = {1\n@ 2}}\n", "  @b{y, t = 3}"]))
+    assert elementos == ["lixo {\n", "@a{x,\n t = {1\n@ 2}}\n  ", "@b{y, t = 3}"]
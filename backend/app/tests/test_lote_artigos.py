@@ -0,0 +1,103 @@
+"""
+Lote de operações de artigos (_aplicar_lote, rota POST /artigo/batch): modos
+tudo_ou_nada e melhor_esforco e a validação das edições. Cada teste roda numa
+transação desfeita no fim; _aplicar_lote não faz commit.
+"""
+import pytest
+from sqlalchemy.orm import Session
+
+import main  # noqa: F401 (as rotas importam main; ele vem primeiro, como na aplicação)
+from cache_respostas import tag_edicao
+from models import Artigo, EdicaoEvento, Evento
+from router.artigo_router import _aplicar_lote
+from schemas import ArtigoSchema, OperacaoArtigoSchema
+
+
+@pytest.fixture
+def sessao(banco_migrado):
+    from banco import db
+    with Session(db) as sessao:
+        yield sessao
+        sessao.rollback()
+
+
+@pytest.fixture
+def dados(sessao):
+    evento = Evento("Evento dos Testes de Lote")
+    sessao.add(evento)
+    sessao.flush()
+    edicoes = {ano: EdicaoEvento(ano, evento.id) for ano in (2023, 2024)}
+    sessao.add_all(edicoes.values())
+    sessao.flush()
+    artigos = {titulo: Artigo(titulo, "Ana Souza", evento.nome, 2023, id_edicao=edicoes[2023].id)
+               for titulo in ("Artigo A do lote", "Artigo B do lote")}
+    sessao.add_all(artigos.values())
+    sessao.flush()
+    return evento, edicoes, artigos
+
+
+def _artigo(titulo: str, ano: int = 2023) -> ArtigoSchema:
+    return ArtigoSchema(titulo=titulo, autores="Ana Souza and Bruno Lima",
+                        nome_evento="Evento dos Testes de Lote", ano=ano)
+
+
+def _aplicar(sessao, operacoes, modo):
+    return _aplicar_lote(sessao, [OperacaoArtigoSchema(**op) for op in operacoes], modo == "tudo_ou_nada")
+
+
+def test_edicao_troca_de_edicao_pelo_ano(sessao, dados):
+    _, edicoes, artigos = dados
+    a = artigos["Artigo A do lote"]
+    efeitos = _aplicar(sessao, [{"op": "editar", "id": a.id, "artigo": _artigo(a.titulo, 2024)}], "tudo_ou_nada")
+    assert efeitos["resultados"][0]["status"] == "ok"
+    assert a.id_edicao == edicoes[2024].id
+    # A página das duas edições muda
+    assert {tag_edicao(edicoes[2023].id), tag_edicao(edicoes[2024].id)} <= efeitos["tags"]
+
+
+@pytest.mark.parametrize("artigo, motivo", [
+    (_artigo("Artigo B do lote"), "já cadastrado"),
+    (_artigo("Artigo A do lote", 1999), "Não existe edição"),
+])
+def test_edicao_invalida_e_recusada(sessao, dados, artigo, motivo):
+    a = dados[2]["Artigo A do lote"]
+    efeitos = _aplicar(sessao, [{"op": "editar", "id": a.id, "artigo": artigo}], "melhor_esforco")
+    assert efeitos["resultados"][0]["status"] == "erro"
+    assert motivo in efeitos["resultados"][0]["erro"]
+    assert (a.titulo, a.ano) == ("Artigo A do lote", 2023)
+
+
+def test_edicao_mantendo_o_titulo_nao_e_duplicata(sessao, dados):
+    a = dados[2]["Artigo A do lote"]
+    efeitos = _aplicar(sessao, [{"op": "editar", "id": a.id, "artigo": _artigo(a.titulo)}], "tudo_ou_nada")
+    assert efeitos["resultados"][0]["status"] == "ok"
+
+
+def _lote_com_uma_invalida(artigos):
+    return [
+        {"op": "criar", "artigo": _artigo("Artigo C do lote")},
+        {"op": "editar", "id": artigos["Artigo A do lote"].id, "artigo": _artigo("Artigo B do lote")},
+    ]
+
+
+def test_tudo_ou_nada_nao_aplica_nada(sessao, dados):
+    efeitos = _aplicar(sessao, _lote_com_uma_invalida(dados[2]), "tudo_ou_nada")
+    assert [r["status"] for r in efeitos["resultados"]] == ["nao_aplicada", "erro"]
+    assert (efeitos["aplicadas"], efeitos["rejeitadas"]) == (0, 1)
+    assert sessao.query(Artigo).filter(Artigo.titulo == "Artigo C do lote").count() == 0
+
+
+def test_melhor_esforco_aplica_as_validas(sessao, dados):
+    efeitos = _aplicar(sessao, _lote_com_uma_invalida(dados[2]), "melhor_esforco")
+    assert [r["status"] for r in efeitos["resultados"]] == ["ok", "erro"]
+    assert (efeitos["aplicadas"], efeitos["rejeitadas"]) == (1, 1)
+    novo = sessao.get(Artigo, efeitos["resultados"][0]["id"])
+    assert (novo.titulo, novo.id_edicao) == ("Artigo C do lote", dados[1][2023].id)
+
+
+def test_titulo_repetido_dentro_do_lote(sessao, dados):
+    efeitos = _aplicar(sessao, [
+        {"op": "editar", "id": dados[2]["Artigo A do lote"].id, "artigo": _artigo("Artigo D do lote")},
+        {"op": "criar", "artigo": _artigo("Artigo D do lote")},
+    ], "melhor_esforco")
+    assert [r["status"] for r in efeitos["resultados"]] == ["ok", "erro"]
@@ -0,0 +1,198 @@
+"""
+Envio das notificações (notificacoes.py): EntregadorSMTP contra um servidor
+SMTP mínimo local e o WorkerNotificacoes (reserva, backoff exponencial e
+limite de tentativas) sobre um outbox num SQLite temporário.
+"""
+import asyncio
+import logging
+import smtplib
+import socketserver
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+
+import notificacoes
+from models import NotificacaoOutbox
+
+
+class _ServidorSMTP(socketserver.ThreadingTCPServer):
+    """Só o necessário para o smtplib: EHLO, MAIL, RCPT, DATA, RSET, NOOP e QUIT."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, derrubar_apos=None):
+        super().__init__(("127.0.0.1", 0), _Sessao)
+        self.derrubar_apos = derrubar_apos   # mensagens por conexão antes de fechá-la
+        self.conexoes = 0
+        self.mensagens = []
+
+
+class _Sessao(socketserver.StreamRequestHandler):
+    def _responder(self, linha: str) -> None:
+        self.wfile.write(linha.encode() + b"\r\n")
+
+    def handle(self):
+        servidor = self.server
+        servidor.conexoes += 1
+        enviadas = 0
+        self._responder("220 teste")
+        for bruta in self.rfile:
+            comando = bruta.decode().strip().upper()
+            if comando.startswith(("EHLO", "HELO")):
+                self._responder("250 teste")
+            elif comando == "DATA":
+                self._responder("354 fim com <CRLF>.<CRLF>")
+                linhas = []
+                for linha in self.rfile:
+                    if linha.rstrip(b"\r\n") == b".":
+                        break
+                    linhas.append(linha.decode())
+                servidor.mensagens.append("".join(linhas))
+                self._responder("250 ok")
+                enviadas += 1
+                if servidor.derrubar_apos and enviadas >= servidor.derrubar_apos:
+                    return
+            elif comando == "QUIT":
+                self._responder("221 tchau")
+                return
+            else:
+                self._responder("250 ok")
+
+
+@pytest.fixture
+def servidor_smtp(monkeypatch):
+    def iniciar(derrubar_apos=None):
+        servidor = _ServidorSMTP(derrubar_apos)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        servidores.append(servidor)
+        monkeypatch.setenv("SMTP_HOST", "127.0.0.1")
+        monkeypatch.setenv("SMTP_PORT", str(servidor.server_address[1]))
+        return servidor
+
+    servidores = []
+    monkeypatch.delenv("SMTP_USER", raising=False)
+    monkeypatch.delenv("SMTP_PASS", raising=False)
+    yield iniciar
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_reutiliza_a_conexao(servidor_smtp):
+    servidor = servidor_smtp()
+    entregador = notificacoes.EntregadorSMTP()
+    entregador.enviar("ana@example.com", "Novo artigo: A", "corpo A")
+    entregador.enviar("bruno@example.com", "Novo artigo: B", "corpo B")
+    entregador.fechar()
+    assert servidor.conexoes == 1
+    assert len(servidor.mensagens) == 2
+    assert "To: bruno@example.com" in servidor.mensagens[1]
+    assert "Subject: Novo artigo: B" in servidor.mensagens[1]
+
+
+def test_reconecta_quando_o_servidor_derruba(servidor_smtp):
+    servidor = servidor_smtp(derrubar_apos=1)
+    entregador = notificacoes.EntregadorSMTP()
+    entregador.enviar("ana@example.com", "Primeira", "corpo")
+    entregador.enviar("ana@example.com", "Segunda", "corpo")
+    entregador.fechar()
+    assert servidor.conexoes == 2
+    assert ["Subject: Segunda" in m for m in servidor.mensagens] == [False, True]
+
+
+def test_sem_smtp_so_registra_no_log(monkeypatch, caplog):
+    monkeypatch.delenv("SMTP_HOST", raising=False)
+    monkeypatch.delenv("SMTP_PORT", raising=False)
+    with caplog.at_level(logging.INFO, logger="notificacoes"):
+        notificacoes.EntregadorSMTP().enviar("ana@example.com", "Assunto", "corpo")
+    assert "[NOTIFY] Enviado email para ana@example.com: Assunto" in caplog.text
+
+
+# --- WorkerNotificacoes ---
+
+class _EntregadorFalso:
+    """Falha para os emails em `falhar`; registra os enviados."""
+    falhar = set()
+    enviados = []
+
+    def enviar(self, email, assunto, corpo):
+        if email in self.falhar:
+            raise smtplib.SMTPRecipientsRefused({email: (550, b"caixa inexistente")})
+        self.enviados.append(email)
+
+    def fechar(self):
+        pass
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [datetime(2026, 1, 1, 12, 0, 0)]
+    monkeypatch.setattr(notificacoes, "_agora", lambda: agora[0])
+    return agora
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch, relogio):
+    monkeypatch.setattr(notificacoes, "EntregadorSMTP", _EntregadorFalso)
+    monkeypatch.setattr(_EntregadorFalso, "falhar", {"falha@example.com"})
+    monkeypatch.setattr(_EntregadorFalso, "enviados", [])
+    monkeypatch.setattr(notificacoes, "MAX_TENTATIVAS", 3)
+    monkeypatch.setattr(notificacoes, "BACKOFF_BASE", 10.0)
+    monkeypatch.setattr(notificacoes, "BACKOFF_MAX", 15.0)
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    NotificacaoOutbox.__table__.create(engine)
+    worker = notificacoes.WorkerNotificacoes(engine, concorrencia=1)
+    with worker.Session() as session:
+        for email in ("ok@example.com", "falha@example.com"):
+            notificacoes.enfileirar_notificacao(session, email, "Assunto", "corpo")
+        session.commit()
+    yield worker
+    engine.dispose()
+
+
+def _estado(worker, email):
+    with worker.Session() as session:
+        n = session.query(NotificacaoOutbox).filter(NotificacaoOutbox.email == email).one()
+        return n.status, n.tentativas, n.proxima_tentativa, n.ultimo_erro
+
+
+def test_envio_com_sucesso(worker, relogio):
+    assert asyncio.run(worker.processar_lote()) == 2
+    status, tentativas, _, erro = _estado(worker, "ok@example.com")
+    assert (status, tentativas, erro) == ("enviado", 0, None)
+    assert _EntregadorFalso.enviados == ["ok@example.com"]
+
+
+def test_backoff_exponencial_ate_o_limite(worker, relogio):
+    inicio = relogio[0]
+    asyncio.run(worker.processar_lote())
+    status, tentativas, proxima, erro = _estado(worker, "falha@example.com")
+    assert (status, tentativas, proxima) == ("pendente", 1, inicio + timedelta(seconds=10))
+    assert erro.startswith("SMTPRecipientsRefused")
+
+    # Antes do prazo nada é reservado
+    assert asyncio.run(worker.processar_lote()) == 0
+
+    relogio[0] = proxima
+    assert asyncio.run(worker.processar_lote()) == 1
+    status, tentativas, proxima, _ = _estado(worker, "falha@example.com")
+    # 2 * 10 s, limitado por BACKOFF_MAX
+    assert (status, tentativas, proxima) == ("pendente", 2, relogio[0] + timedelta(seconds=15))
+
+    relogio[0] = proxima
+    asyncio.run(worker.processar_lote())
+    status, tentativas, _, _ = _estado(worker, "falha@example.com")
+    assert (status, tentativas) == ("falhou", 3)
+
+    # Esgotadas as tentativas, a mensagem não volta para a fila
+    relogio[0] += timedelta(days=1)
+    assert asyncio.run(worker.processar_lote()) == 0
+
+
+def test_reservas_interrompidas_voltam_para_a_fila(worker):
+    assert [item[1] for item in worker._reservar_lote()] == ["ok@example.com", "falha@example.com"]
+    assert worker._reservar_lote() == []
+    worker._recuperar_reservas()
+    assert len(worker._reservar_lote()) == 2
@@ -0,0 +1,31 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from paginacao import codificar_cursor, decodificar_cursor
+
+
+def _cursor(valores) -> str:
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip("=")
+
+
+def test_cursor_ida_e_volta():
+    valores = ["Título", 2024, 1.5, None, 42]
+    assert decodificar_cursor(codificar_cursor(valores), len(valores)) == valores
+
+
+@pytest.mark.parametrize("cursor", [
+    _cursor([{}, 1]),
+    _cursor([[1], 2]),
+    _cursor([1]),          # quantidade errada
+    _cursor({"a": 1}),
+    "nao-e-base64!!",
+    _cursor("texto")[:-1],
+])
+def test_cursor_malformado_da_400(cursor):
+    with pytest.raises(HTTPException) as erro:
+        decodificar_cursor(cursor, 2)
+    assert erro.value.status_code == 400
+    assert erro.value.detail == "Cursor inválido"
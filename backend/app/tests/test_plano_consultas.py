@@ -0,0 +1,23 @@
+"""
+Regressão dos índices (plano_consultas.py): as consultas críticas não podem
+cair em SCAN completo de tabela. Roda numa cópia do banco.db do repositório
+migrada até head (as migrações antigas não criam o esquema a partir do zero).
+"""
+import pytest
+from sqlalchemy import create_engine
+
+from conftest import migrar_copia
+from plano_consultas import CONSULTAS_CRITICAS, verificar_indices
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(migrar_copia(tmp_path_factory.mktemp("plano") / "banco.db"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("descricao", [descricao for descricao, _ in CONSULTAS_CRITICAS])
+def test_consulta_usa_indice(engine, descricao):
+    usa_indice, detalhes = verificar_indices(engine)[descricao]
+    assert usa_indice, f"{descricao}: " + "; ".join(detalhes)
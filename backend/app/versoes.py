@@ -0,0 +1,73 @@
+"""
+Versão por tabela para GETs condicionais (ETag / Last-Modified).
+
+As rotas de escrita chamam registrar_escrita() antes do commit, na mesma
+transação da alteração. As rotas de leitura chamam ler_versoes() antes da
+consulta principal e, se o cliente já tem a versão atual, respondem 304 sem
+consultar nem serializar nada:
+
+    versoes = await ler_versoes(session, "artigos")
+    if requisicao_nao_modificada(request, versoes.etag, versoes.ultima_modificacao):
+        return Response(status_code=304, headers=versoes.headers())
+
+A versão fica no banco (tabela versoes_tabelas), então vale para todos os
+workers e sobrevive a reinícios.
+
+Todo código que escreve em artigos, eventos ou edicoes, não só as rotas (ex: o
+worker de importacoes.py, scripts de manutenção), precisa incrementar a versão
+na mesma transação: registrar_escrita() na sessão assíncrona, ou
+session.execute(comando_incremento(...)) na síncrona. Sem isso os clientes
+continuam recebendo 304 com dados velhos.
+"""
+from datetime import datetime, timezone
+from typing import Dict, NamedTuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache_http import http_date
+from models import VersaoTabela
+
+TABELA_ARTIGOS = "artigos"
+TABELA_EVENTOS = "eventos"
+TABELA_EDICOES = "edicoes"
+
+
+class Versoes(NamedTuple):
+    etag: str
+    ultima_modificacao: float   # timestamp Unix da escrita mais recente
+
+    def headers(self) -> Dict[str, str]:
+        # no-cache: o navegador guarda, mas revalida a cada navegação (304 é barato)
+        return {"ETag": self.etag, "Last-Modified": http_date(self.ultima_modificacao), "Cache-Control": "no-cache"}
+
+
+def comando_incremento(*tabelas: str):
+    """UPDATE que incrementa a versão das tabelas; para sessões síncronas (run_sync)."""
+    agora = datetime.now(timezone.utc).replace(tzinfo=None)
+    return (
+        update(VersaoTabela)
+        .where(VersaoTabela.tabela.in_(tabelas))
+        .values(versao=VersaoTabela.versao + 1, atualizado_em=agora)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def registrar_escrita(session: AsyncSession, *tabelas: str) -> None:
+    """Incrementa a versão das tabelas alteradas. Chamar antes do commit da escrita."""
+    await session.execute(comando_incremento(*tabelas))
+
+
+async def ler_versoes(session: AsyncSession, *tabelas: str) -> Versoes:
+    """
+    Versões atuais das tabelas de que uma resposta depende. O ETag é fraco
+    (W/): a mesma versão dos dados pode ser serializada de formas equivalentes.
+    """
+    linhas = (await session.execute(
+        select(VersaoTabela.tabela, VersaoTabela.versao, VersaoTabela.atualizado_em)
+        .where(VersaoTabela.tabela.in_(tabelas))
+    )).all()
+    por_tabela = {tabela: (versao, atualizado_em) for tabela, versao, atualizado_em in linhas}
+    etag = 'W/"' + ".".join(str(por_tabela.get(t, (0,))[0]) for t in tabelas) + '"'
+    ultima = max((a for _, a in por_tabela.values()), default=datetime(1970, 1, 1))
+    return Versoes(etag, ultima.replace(tzinfo=timezone.utc).timestamp())
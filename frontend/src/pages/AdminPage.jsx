@@ -226,25 +226,28 @@ function AdminPage() {
         fd.append('bibtex_file', bib);
         fd.append('pdf_zip_file', zip);
         try {
-          const res = await fetch('http://localhost:8000/artigo/importar-bibtex', {
+          const headers = { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` };
+          const res = await fetch('http://localhost:8000/artigo/artigo/importar-bibtex', {
             method: 'POST',
-            headers: {
-              'Authorization': `Bearer ${localStorage.getItem('access_token')}`
-            },
+            headers,
             body: fd
           });
-          const body = await res.json();
-          // Backend returns notificacoes: [ { titulo, notificacoes: [..] }, ... ]
-          if (body.notificacoes && Array.isArray(body.notificacoes)) {
-            const flat = [];
-            for (const item of body.notificacoes) {
-              if (item.notificacoes && Array.isArray(item.notificacoes)) {
-                flat.push(...item.notificacoes);
-              }
-            }
-            if (flat.length) setNotifications((cur) => [...flat, ...cur]);
-            if (flat.length) flat.forEach(n => addToast(n));
+          const job = await res.json();
+          if (!res.ok) {
+            setError(job.detail || 'Falha ao importar pacotes de artigos');
+            return;
           }
+          // A importação roda em segundo plano; acompanha o job até terminar
+          addToast('Importação iniciada. Os artigos aparecem conforme são processados.');
+          let body = job;
+          while (body.status !== 'concluida' && body.status !== 'falhou') {
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+            const resJob = await fetch(`http://localhost:8000${job.url}`, { headers });
+            body = await resJob.json();
+            if (!resJob.ok) throw new Error(body.detail);
+          }
+          if (body.status === 'falhou') setError(body.mensagem);
+          else addToast(body.mensagem);
           // refresh article list
           const res2 = await getRecentArticles();
           setArticles(res2.data || []);